@@ -0,0 +1,35 @@
+from database import engine
+from sqlalchemy import text
+
+# Add the registry artifact columns to the job_descriptions table
+COLUMNS = [
+    ('normalized_title', 'VARCHAR(100) NULL'),
+    ('content_hash', 'VARCHAR(64) NULL'),
+    ('embedding', 'JSON NULL'),
+    ('required_skills', 'JSON NULL'),
+    ('preferred_skills', 'JSON NULL'),
+]
+
+with engine.connect() as conn:
+    for name, ddl in COLUMNS:
+        try:
+            conn.execute(text(f'ALTER TABLE job_descriptions ADD COLUMN {name} {ddl}'))
+            conn.commit()
+            print(f'✓ Column {name} added successfully to job_descriptions table')
+        except Exception as e:
+            if '1060' in str(e):  # Duplicate column error
+                print(f'✓ Column {name} already exists')
+            else:
+                print(f'✗ Error: {e}')
+                raise
+
+    try:
+        conn.execute(text('CREATE UNIQUE INDEX ix_job_descriptions_content_hash ON job_descriptions (content_hash)'))
+        conn.commit()
+        print('✓ Index ix_job_descriptions_content_hash created')
+    except Exception as e:
+        if '1061' in str(e):  # Duplicate key name
+            print('✓ Index ix_job_descriptions_content_hash already exists')
+        else:
+            print(f'✗ Error: {e}')
+            raise
@@ -0,0 +1,15 @@
+from database import engine
+from sqlalchemy import text
+
+# Add the heartbeat_at column to the screening_jobs table (stale-job detection)
+with engine.connect() as conn:
+    try:
+        conn.execute(text('ALTER TABLE screening_jobs ADD COLUMN heartbeat_at DATETIME NULL AFTER finished_at'))
+        conn.commit()
+        print('✓ Column heartbeat_at added successfully to screening_jobs table')
+    except Exception as e:
+        if '1060' in str(e):  # Duplicate column error
+            print('✓ Column heartbeat_at already exists')
+        else:
+            print(f'✗ Error: {e}')
+            raise
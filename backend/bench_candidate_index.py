@@ -0,0 +1,99 @@
+"""
+Benchmark: ranking the whole candidate pool against one JD.
+
+  chroma-per-resume  one filtered Chroma query per candidate (the screen_resume
+                     fallback pattern); timed on --sample candidates and
+                     extrapolated to the full pool
+  chroma-top-k       one HNSW query over a collection of per-candidate vectors
+  numpy-index        services.candidate_index: memmapped matrix, one matvec +
+                     argpartition (exact)
+
+Synthetic clustered 384-d unit vectors; everything is written to temp dirs.
+
+Usage:
+    python bench_candidate_index.py                       # 10k and 100k candidates
+    python bench_candidate_index.py --sizes 10000 --top-k 100
+"""
+import argparse
+import tempfile
+import time
+import uuid
+import numpy as np
+import chromadb
+from services.candidate_index import CandidateIndex
+
+DIM = 384
+
+def synthetic_pool(n, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, 64, size=n)] + 0.6 * rng.normal(size=(n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def best_of(fn, rounds):
+    best, result = None, None
+    for _ in range(rounds):
+        t0 = time.time()
+        result = fn()
+        elapsed = time.time() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def bench(n, args):
+    pool = synthetic_pool(n)
+    ids = np.arange(1, n + 1)
+    queries = synthetic_pool(args.queries, seed=1)
+    print(f"\n{n} candidates, top-{args.top_k}, {args.queries} JD queries")
+
+    # NumPy index
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CandidateIndex("bench", tmp)
+        t0 = time.time()
+        for start in range(0, n, 5000):
+            index.upsert({int(c): v for c, v in zip(ids[start:start + 5000], pool[start:start + 5000])})
+        build = time.time() - t0
+        index.rank(queries[0], args.top_k) # Load snapshot
+        elapsed, _ = best_of(lambda: [index.rank(q, args.top_k) for q in queries], args.rounds)
+        exact = [[c for c, _ in index.rank(q, args.top_k)] for q in queries]
+        print(f"{'numpy-index':>18}: build {build:.1f}s, {1000 * elapsed / len(queries):.2f} ms/JD, "
+              f"{pool.nbytes / 1e6:.0f} MB matrix")
+
+    # Chroma
+    client = chromadb.EphemeralClient()
+    col = client.create_collection(name=f"bench_{uuid.uuid4().hex[:8]}", embedding_function=None)
+    t0 = time.time()
+    max_batch = client.get_max_batch_size()
+    for start in range(0, n, max_batch):
+        end = min(start + max_batch, n)
+        col.add(ids=[str(c) for c in ids[start:end]], embeddings=pool[start:end].tolist(),
+                metadatas=[{"candidate_id": int(c)} for c in ids[start:end]])
+    build = time.time() - t0
+
+    def topk():
+        return col.query(query_embeddings=queries.tolist(), n_results=args.top_k, include=["distances"])
+    elapsed, res = best_of(topk, args.rounds)
+    recall = np.mean([len(set(int(i) for i in got) & set(want)) / args.top_k for got, want in zip(res["ids"], exact)])
+    print(f"{'chroma-top-k':>18}: build {build:.1f}s, {1000 * elapsed / len(queries):.2f} ms/JD, "
+          f"recall@{args.top_k} vs exact {recall:.3f}")
+
+    sample = ids[:min(args.sample, n)]
+    t0 = time.time()
+    for c in sample:
+        col.query(query_embeddings=[queries[0].tolist()], n_results=1, where={"candidate_id": int(c)}, include=["distances"])
+    per_query = (time.time() - t0) / len(sample)
+    print(f"{'chroma-per-resume':>18}: {1000 * per_query:.2f} ms/candidate -> ~{per_query * n:.1f} s/JD "
+          f"(extrapolated from {len(sample)})")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.sizes:
+        bench(n, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: legacy 500-char windows vs the section-aware chunker.
+
+Fixture set: synthetic resumes that each contain one distinctive project
+("the needle") among generic bullets, plus one paraphrased query per needle.
+A query is answered by ranking resumes on their best-matching chunk, so the
+relevant resume for each query is known.
+
+Reports chunks per resume, estimated tokens per chunk, chunks over MiniLM's
+256-token window, and retrieval quality (recall@1/@5, MRR).
+
+Usage:
+    python bench_chunking.py
+    python bench_chunking.py --count 40 --budget 160
+"""
+import argparse
+import random
+import time
+import numpy as np
+from bench_embedding import SKILLS
+from services.rag_service import RAGService
+from services import chunking, embeddings
+
+NEEDLES = [
+    ("Built a real-time card fraud detection engine scoring payments in under 20ms.",
+     "engineer who built payment fraud detection systems"),
+    ("Designed a genomics variant-calling pipeline processing 5,000 whole genomes a month.",
+     "bioinformatics pipelines for DNA sequencing data"),
+    ("Led the migration of a monolithic ad-bidding platform to an event-driven architecture.",
+     "ad tech real-time bidding platform migration"),
+    ("Implemented an offline-first mobile banking app used by 2M customers.",
+     "mobile banking application developer"),
+    ("Created a computer-vision defect inspection system for a car assembly line.",
+     "machine vision for manufacturing quality inspection"),
+    ("Maintained the flight-booking search service handling seasonal traffic spikes.",
+     "airline reservation search backend"),
+    ("Built an ETL warehouse for hospital patient records with HIPAA audit trails.",
+     "healthcare data warehouse with compliance requirements"),
+    ("Developed a multiplayer game server with authoritative physics at 60Hz.",
+     "online game backend networking"),
+    ("Wrote firmware for battery management in electric scooters.",
+     "embedded firmware for EV batteries"),
+    ("Shipped a recommendation engine for an e-commerce catalogue of 3M products.",
+     "product recommendation systems for online retail"),
+    ("Automated legal contract review with NLP clause extraction.",
+     "natural language processing for legal documents"),
+    ("Operated a Kubernetes platform for 400 microservices across three regions.",
+     "running large multi-region Kubernetes clusters"),
+]
+
+def fixture_resume(i, needle):
+    rng = random.Random(i)
+    lines = [f"Candidate {i}", f"candidate{i}@example.com", "", "SUMMARY",
+             "Software engineer with a track record of delivering reliable systems. " * 2, "", "EXPERIENCE"]
+    jobs = rng.randint(3, 5)
+    needle_job = rng.randrange(jobs)
+    for job in range(jobs):
+        lines.append(f"Software Engineer at Company {rng.randint(1, 500)} ({2010 + 2 * job} - {2012 + 2 * job})")
+        bullets = [f"- Worked on services using {', '.join(rng.sample(SKILLS, 3))} for {rng.randint(1, 900)}k users."
+                   for _ in range(rng.randint(4, 7))]
+        if job == needle_job:
+            bullets.insert(rng.randrange(len(bullets) + 1), f"- {needle}")
+        lines += bullets
+        lines.append("")
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, 10)), "", "EDUCATION", "B.Tech Computer Science, 2010"]
+    return "\n".join(lines)
+
+def evaluate(name, chunker, resumes, queries):
+    chunk_texts, owners = [], []
+    for idx, text in enumerate(resumes):
+        for chunk in chunker(text):
+            chunk_texts.append(chunk)
+            owners.append(idx)
+    owners = np.asarray(owners)
+
+    t0 = time.time()
+    chunk_vecs = np.asarray(embeddings.local_encode(chunk_texts), dtype=np.float32)
+    encode_seconds = time.time() - t0
+    query_vecs = np.asarray(embeddings.local_encode(queries), dtype=np.float32)
+    chunk_vecs /= np.linalg.norm(chunk_vecs, axis=1, keepdims=True)
+    query_vecs /= np.linalg.norm(query_vecs, axis=1, keepdims=True)
+
+    scores = query_vecs @ chunk_vecs.T
+    ranks = []
+    for q, row in enumerate(scores):
+        # Resume score = best chunk score
+        best = np.full(len(resumes), -1.0)
+        np.maximum.at(best, owners, row)
+        order = np.argsort(-best)
+        ranks.append(int(np.where(order == q)[0][0]) + 1)
+    ranks = np.asarray(ranks)
+
+    tokens = [chunking.estimate_tokens(c) for c in chunk_texts]
+    print(f"{name:>10}: {len(chunk_texts) / len(resumes):.1f} chunks/resume, "
+          f"{np.mean(tokens):.0f} est. tokens/chunk, {sum(t > 256 for t in tokens)} over 256, "
+          f"encode {encode_seconds:.2f}s | recall@1 {np.mean(ranks == 1):.3f}, "
+          f"recall@5 {np.mean(ranks <= 5):.3f}, MRR {np.mean(1.0 / ranks):.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=len(NEEDLES))
+    parser.add_argument("--budget", type=int, default=chunking.CHUNK_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    pairs = [NEEDLES[i % len(NEEDLES)] for i in range(args.count)]
+    resumes = [fixture_resume(i, needle) for i, (needle, _) in enumerate(pairs)]
+    queries = [query for _, query in pairs]
+    embeddings.local_encode(["warm up"])
+
+    print(f"Fixture: {len(resumes)} resumes, {len(queries)} queries")
+    evaluate("windows", RAGService.chunk_text, resumes, queries)
+    evaluate("sections", lambda text: chunking.iter_chunks(text, args.budget), resumes, queries)
+
+if __name__ == "__main__":
+    main()
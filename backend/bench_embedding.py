@@ -0,0 +1,90 @@
+"""
+Benchmark: per-resume ingest (old path) vs cross-resume batched ingest.
+
+Usage:
+    python bench_embedding.py                      # synthetic corpus of 50 resumes
+    python bench_embedding.py --pdf-dir media/resumes --batch-size 128
+
+Both paths write to a throwaway in-memory Chroma collection, never to chroma_db.
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+import chromadb
+from services.rag_service import RAGService
+from services import embeddings
+
+SKILLS = ["Python", "FastAPI", "Django", "React", "Kubernetes", "Docker", "AWS", "PostgreSQL",
+          "Go", "Java", "Spring Boot", "TensorFlow", "PyTorch", "Redis", "Kafka", "GraphQL"]
+
+def synthetic_resume(i):
+    rng = random.Random(i)
+    lines = [f"Candidate {i}", f"candidate{i}@example.com", "", "EXPERIENCE"]
+    for job in range(rng.randint(2, 5)):
+        lines.append(f"Software Engineer at Company {rng.randint(1, 500)} ({2010 + job} - {2012 + job})")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"- Built services with {', '.join(rng.sample(SKILLS, 3))} serving {rng.randint(1, 900)}k users.")
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EDUCATION", "B.Tech Computer Science"]
+    return "\n".join(lines)
+
+def load_corpus(pdf_dir, count):
+    if pdf_dir:
+        paths = [os.path.join(pdf_dir, f) for f in sorted(os.listdir(pdf_dir)) if f.lower().endswith(".pdf")]
+        return [RAGService.parse_resume(p).text for p in paths[:count]]
+    return [synthetic_resume(i) for i in range(count)]
+
+def fresh_collection():
+    client = chromadb.EphemeralClient()
+    return client, client.create_collection(name=f"bench_{uuid.uuid4().hex[:8]}")
+
+def per_resume(texts):
+    _, col = fresh_collection()
+    chunks_total = 0
+    t0 = time.time()
+    for n, text in enumerate(texts):
+        chunks = RAGService.chunk_text(text)
+        # Old path: one encode + one collection.add per resume
+        vectors = embeddings.local_encode(chunks)
+        col.add(ids=[f"r{n}_{i}" for i in range(len(chunks))], embeddings=vectors, documents=chunks)
+        chunks_total += len(chunks)
+    return chunks_total, time.time() - t0
+
+def batched(texts, batch_size):
+    client, col = fresh_collection()
+    documents, ids = [], []
+    for n, text in enumerate(texts):
+        chunks = RAGService.chunk_text(text)
+        documents.extend(chunks)
+        ids.extend(f"r{n}_{i}" for i in range(len(chunks)))
+    t0 = time.time()
+    vectors = RAGService.embed_texts(documents, batch_size=batch_size)
+    max_batch = client.get_max_batch_size()
+    for start in range(0, len(ids), max_batch):
+        col.upsert(ids=ids[start:start + max_batch], embeddings=vectors[start:start + max_batch],
+                   documents=documents[start:start + max_batch])
+    return len(documents), time.time() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf-dir", default=None)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.pdf_dir, args.count)
+    embeddings.encode(["warm up"]) # Exclude model load + first-call overhead
+
+    print(f"Corpus: {len(texts)} resumes")
+    for label, fn in [("per-resume", lambda: per_resume(texts)),
+                      (f"batched(bs={args.batch_size})", lambda: batched(texts, args.batch_size))]:
+        best = None
+        for _ in range(args.rounds):
+            chunks, elapsed = fn()
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{label:>20}: {chunks} chunks in {best:.2f}s -> {chunks / best:.1f} chunks/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: embedding backends (torch vs onnx vs onnx-int8) for the same model.
+
+Each backend runs in its own process so RSS is not shared. Reports load time,
+throughput (chunks/sec), RSS after encoding, and retrieval agreement with the
+first backend: mean top-k overlap of chunk search results for a set of JD-like
+queries, plus mean cosine between the two backends' vectors.
+
+Usage:
+    python bench_embedding_backends.py                                  # synthetic corpus
+    python bench_embedding_backends.py --pdf-dir media/resumes --backends torch onnx-int8 --top-k 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from bench_embedding import load_corpus, SKILLS
+from services.rag_service import RAGService
+
+QUERIES = [f"Backend engineer with {a} and {b} experience" for a, b in zip(SKILLS, SKILLS[1:] + SKILLS[:1])]
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def child(args):
+    # Runs one backend; writes chunk + query vectors to args.out and prints stats as JSON
+    from services import embeddings
+
+    chunks = json.load(open(args.chunks))
+    t0 = time.time()
+    backend = embeddings.create_backend(args.backend)
+    load_seconds = time.time() - t0
+    backend.encode(["warm up"])
+
+    best = None
+    for _ in range(args.rounds):
+        t0 = time.time()
+        vectors = backend.encode(chunks, batch_size=args.batch_size)
+        elapsed = time.time() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    queries = backend.encode(QUERIES)
+    np.savez(args.out, chunks=vectors, queries=queries)
+    print(json.dumps({"load_seconds": load_seconds, "chunks_per_sec": len(chunks) / best, "rss_mb": rss_mb()}))
+
+def top_k(chunk_vecs, query_vecs, k):
+    chunk_vecs = chunk_vecs / np.linalg.norm(chunk_vecs, axis=1, keepdims=True)
+    query_vecs = query_vecs / np.linalg.norm(query_vecs, axis=1, keepdims=True)
+    scores = query_vecs @ chunk_vecs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--pdf-dir", default=None)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=10)
+    # Internal: child mode
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--chunks", default=None)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    if args.backend:
+        child(args)
+        return
+
+    chunks = [c for text in load_corpus(args.pdf_dir, args.count) for c in RAGService.chunk_text(text)]
+    print(f"Corpus: {len(chunks)} chunks, {len(QUERIES)} queries, top-{args.top_k}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chunks_path = os.path.join(tmp, "chunks.json")
+        json.dump(chunks, open(chunks_path, "w"))
+
+        reference = None
+        for name in args.backends:
+            out = os.path.join(tmp, f"{name}.npz")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--backend", name, "--chunks", chunks_path, "--out", out,
+                 "--batch-size", str(args.batch_size), "--rounds", str(args.rounds)],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{name:>10}: failed\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ''}")
+                continue
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            data = np.load(out)
+
+            agreement = ""
+            if reference is None:
+                reference = (name, data["chunks"], top_k(data["chunks"], data["queries"], args.top_k))
+            else:
+                ref_name, ref_chunks, ref_top = reference
+                ours = top_k(data["chunks"], data["queries"], args.top_k)
+                overlap = np.mean([len(set(a) & set(b)) / args.top_k for a, b in zip(ref_top, ours)])
+                a = ref_chunks / np.linalg.norm(ref_chunks, axis=1, keepdims=True)
+                b = data["chunks"] / np.linalg.norm(data["chunks"], axis=1, keepdims=True)
+                cosine = float(np.mean(np.sum(a * b, axis=1)))
+                agreement = f", top-{args.top_k} overlap vs {ref_name} {overlap:.3f}, mean cosine {cosine:.4f}"
+
+            print(f"{name:>10}: load {stats['load_seconds']:.1f}s, {stats['chunks_per_sec']:.1f} chunks/sec, "
+                  f"RSS {stats['rss_mb']:.0f} MB{agreement}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: per-worker embedding models vs one shared embedding server.
+
+Simulates --workers gunicorn workers, each embedding --requests screening
+batches concurrently, and reports wall-clock encodes/sec and total RSS
+(workers + server) for both layouts.
+
+Usage:
+    python bench_embedding_server.py                         # 4 workers, synthetic resumes
+    python bench_embedding_server.py --workers 4 --requests 8 --resumes-per-request 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from bench_embedding import synthetic_resume
+from services.rag_service import RAGService
+from services import embedding_server
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def read_tagged(proc, tag):
+    # Workers also print model-load logs to stdout; skip to the tagged line
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"worker {proc.pid} exited before {tag}")
+        if line.startswith(tag):
+            return line.split()[1:]
+
+def worker_main(args):
+    # One simulated API worker: --requests batches, each one encode call
+    from services import embeddings
+    embeddings.encode(["warm up"])
+    print("READY", flush=True)
+    sys.stdin.readline() # Start signal, so all workers encode concurrently
+    chunks = 0
+    for r in range(args.requests):
+        texts = []
+        for i in range(args.resumes_per_request):
+            texts.extend(RAGService.chunk_text(synthetic_resume(args.seed * 1000 + r * 100 + i)))
+        embeddings.encode(texts)
+        chunks += len(texts)
+    print(f"DONE {chunks} {rss_mb(os.getpid()):.1f}", flush=True)
+    sys.stdin.readline() # Stay alive until the parent has sampled RSS
+
+def run_layout(args, socket_path=None):
+    env = dict(os.environ)
+    env.pop("EMBEDDING_SERVER_SOCKET", None)
+    server = None
+    if socket_path:
+        server = subprocess.Popen([sys.executable, "-m", "services.embedding_server", "--socket", socket_path,
+                                   "--max-wait-ms", str(args.max_wait_ms)], env=env)
+        deadline = time.time() + 300
+        while not os.path.exists(socket_path):
+            if time.time() > deadline or server.poll() is not None:
+                raise RuntimeError("embedding server did not start")
+            time.sleep(0.2)
+        env["EMBEDDING_SERVER_SOCKET"] = socket_path
+        env["EMBEDDING_SERVER_FALLBACK"] = "false"
+
+    workers = [
+        subprocess.Popen([sys.executable, __file__, "--role", "worker", "--seed", str(n),
+                          "--requests", str(args.requests), "--resumes-per-request", str(args.resumes_per_request)],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env)
+        for n in range(args.workers)
+    ]
+    try:
+        for w in workers:
+            read_tagged(w, "READY")
+        t0 = time.time()
+        for w in workers:
+            w.stdin.write("go\n")
+            w.stdin.flush()
+        chunks = 0
+        for w in workers:
+            count, _ = read_tagged(w, "DONE")
+            chunks += int(count)
+        elapsed = time.time() - t0
+
+        total_rss = sum(rss_mb(w.pid) for w in workers)
+        if server:
+            total_rss += rss_mb(server.pid)
+            stats = embedding_server.server_stats(socket_path)
+            print(f"  server: {stats['requests']} requests in {stats['batches']} batches")
+        return chunks, elapsed, total_rss
+    finally:
+        for w in workers:
+            try:
+                w.stdin.write("exit\n")
+                w.stdin.close()
+            except OSError:
+                pass
+            w.wait()
+        if server:
+            server.terminate()
+            server.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--role", default="parent")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--resumes-per-request", type=int, default=10)
+    parser.add_argument("--max-wait-ms", type=float, default=embedding_server.EMBED_SERVER_MAX_WAIT_MS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--socket", default="/tmp/hiringai-embed-bench.sock")
+    args = parser.parse_args()
+
+    if args.role == "worker":
+        worker_main(args)
+        return
+
+    print(f"{args.workers} workers x {args.requests} batches x {args.resumes_per_request} resumes")
+    for label, socket_path in [("per-worker model", None), ("shared server", args.socket)]:
+        chunks, elapsed, total_rss = run_layout(args, socket_path)
+        print(f"{label:>18}: {chunks} chunks in {elapsed:.2f}s -> {chunks / elapsed:.1f} encodes/sec, "
+              f"total RSS {total_rss:.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark: every LLM-dependent path, offline, against groq_standin.py.
+
+Runs --calls calls spread round-robin over the call sites below on --threads
+threads, through the real service functions (prompt building, llm_client
+retries/backoff, rate limiting, response parsing and fallbacks), with the
+stand-in's latency distribution and injected errors. Reports per site: calls,
+degraded results (the caller fell back to its failure value), p50/p95/p99
+latency; overall calls/sec, llm_client retries, response cache hit rates
+(services/llm_cache.py, cold temporary cache per run) and what the stand-in
+served. --distinct N makes the inputs repeat every N calls per site, like
+candidates re-running the same error or recruiters reusing a focus area.
+
+  screening             RAGService.call_groq_api
+  contact               RAGService.extract_with_llm (_inner_extract_with_llm)
+  contact_batch         RAGService.extract_with_llm_batch (8 resumes)
+  jd_skills             RAGService.extract_jd_skills
+  questions             ai_generator.generate_questions (aptitude, via call_llm)
+  interview_questions   ai_generator.generate_interview_questions
+  analyze_error         ai_generator.analyze_error
+  interview_evaluation  interview_evaluation.evaluate_interview_transcript
+
+Usage:
+    python bench_llm_pipeline.py
+    python bench_llm_pipeline.py --latency lognormal:0.8,0.6 --errors 429=0.05,503=0.02,malformed=0.02
+    python bench_llm_pipeline.py --rpm 30 --tpm 6000 --period 6   # Groq free-tier quota, 10x faster clock
+    python bench_llm_pipeline.py --distinct 10                     # repeated inputs: response cache at work
+    python bench_llm_pipeline.py --distinct 10 --no-cache
+"""
+import argparse
+import os
+import tempfile
+import time
+import concurrent.futures
+from collections import defaultdict
+import numpy as np
+from groq_standin import StandIn
+
+JD = (
+    "ROLE: Backend Developer\n"
+    "We are hiring a backend engineer to build Python and FastAPI services on AWS, "
+    "with PostgreSQL, Redis and Kafka. Docker and Kubernetes experience required; "
+    "GraphQL is a plus. Bachelor's degree in Computer Science."
+)
+TRANSCRIPT = [
+    {"speaker": "ai", "text": "How would you design a rate limiter for an API?"},
+    {"speaker": "candidate", "text": "I would use a token bucket per client in Redis, refilled at the quota rate, "
+                                     "and return 429 with Retry-After when it is empty."},
+    {"speaker": "ai", "text": "How do you keep it consistent across several servers?"},
+    {"speaker": "candidate", "text": "Keep the bucket state in Redis and update it atomically with a Lua script."},
+]
+ERROR_OUTPUT = "Traceback (most recent call last):\n  File \"main.py\", line 3, in solve\nTypeError: unsupported operand type(s) for +: 'int' and 'str'"
+
+def sites(synthetic_resume, RAGService, ai_generator, interview_evaluation):
+    """
+    -> {site: fn(i) -> degraded?}
+    """
+    def screening(i):
+        return bool(RAGService.call_groq_api(JD, synthetic_resume(i), "offline").get("ai_failed"))
+
+    def contact(i):
+        return not RAGService.extract_with_llm(synthetic_resume(i)[:3000]).get("email")
+
+    def contact_batch(i):
+        headers = {j: synthetic_resume(j)[:3000] for j in range(i, i + 8)}
+        return len(RAGService.extract_with_llm_batch(headers)) < len(headers)
+
+    def jd_skills(i):
+        return not RAGService.extract_jd_skills(f"{JD}\nReq #{i}")["required_skills"]
+
+    def questions(i):
+        return not ai_generator.generate_questions("aptitude", {"qCount": 10, "topics": [f"Topic {i % 7}"]})
+
+    def interview_questions(i):
+        starters = ai_generator.generate_interview_questions({"focus_area": f"Distributed Systems {i}"})
+        return len(starters) < 2 # a single canned question is the fallback
+
+    def analyze_error(i):
+        feedback = ai_generator.analyze_error(f"def solve(nums):\n    return nums[0] + '{i}'", ERROR_OUTPUT)
+        return feedback in ("Check your syntax and logic.", "Analysis unavailable.")
+
+    def evaluation(i):
+        result = interview_evaluation.evaluate_interview_transcript(TRANSCRIPT, f"Candidate {i}", "Backend Developer")
+        return result["feedback"].startswith("Evaluation failed")
+
+    return {
+        "screening": screening, "contact": contact, "contact_batch": contact_batch, "jd_skills": jd_skills,
+        "questions": questions, "interview_questions": interview_questions, "analyze_error": analyze_error,
+        "interview_evaluation": evaluation
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=240)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", default="lognormal:0.6,0.5", help="stand-in latency distribution")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--errors", default="429=0.02,500=0.02,malformed=0.02")
+    parser.add_argument("--rpm", type=int, default=0, help="stand-in quota per window (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0)
+    parser.add_argument("--period", type=float, default=60.0, help="quota window in seconds")
+    parser.add_argument("--sites", default=None, help="comma-separated subset of sites")
+    parser.add_argument("--distinct", type=int, default=0, help="distinct inputs per site (0 = every call distinct)")
+    parser.add_argument("--no-cache", action="store_true", help="disable the LLM response cache")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    standin = StandIn(latency=args.latency, tokens_per_second=args.tokens_per_second, errors=args.errors,
+                      rpm=args.rpm, tpm=args.tpm, period=args.period, seed=args.seed)
+    os.environ["GROQ_BASE_URL"] = standin.start()
+    os.environ["GROQ_API_KEY"] = "offline"
+    # Admission control only when the stand-in enforces a quota; it then starts from the same quota
+    os.environ["LLM_RATE_LIMIT"] = "true" if args.rpm or args.tpm else "false"
+    os.environ["GROQ_RPM"] = str(args.rpm or 30)
+    os.environ["GROQ_TPM"] = str(args.tpm or 6000)
+    os.environ["LLM_CACHE"] = "false" if args.no_cache else "true"
+    os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-llm-cache-")
+
+    # Imported only now: llm_client and llm_rate_limiter read their settings at import
+    from bench_embedding import synthetic_resume
+    from services.rag_service import RAGService
+    from services import ai_generator, interview_evaluation, llm_client, llm_rate_limiter
+    if args.period != 60.0:
+        llm_rate_limiter.controller = llm_rate_limiter.AdmissionController(period=args.period)
+    calls = sites(synthetic_resume, RAGService, ai_generator, interview_evaluation)
+    if args.sites:
+        calls = {name: calls[name] for name in args.sites.split(",")}
+    names = list(calls)
+    print(f"Stand-in: latency {args.latency}, errors {args.errors or 'none'}, "
+          f"quota {args.rpm or 'unlimited'} req / {args.tpm or 'unlimited'} tokens per {args.period:.0f}s; "
+          f"{args.calls} calls over {len(names)} sites on {args.threads} threads")
+
+    def one(i):
+        site = names[i % len(names)]
+        item = i // len(names) % args.distinct if args.distinct else i
+        t0 = time.perf_counter()
+        degraded = calls[site](item)
+        return site, time.perf_counter() - t0, degraded
+
+    latencies, degraded = defaultdict(list), defaultdict(int)
+    t0 = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for site, latency, failed in pool.map(one, range(args.calls)):
+            latencies[site].append(latency)
+            degraded[site] += failed
+    elapsed = time.perf_counter() - t0
+
+    print(f"\n{'site':>21} {'calls':>6} {'degraded':>9} {'p50':>7} {'p95':>7} {'p99':>7}")
+    for site in names:
+        p50, p95, p99 = np.percentile(latencies[site], [50, 95, 99])
+        print(f"{site:>21} {len(latencies[site]):6d} {degraded[site]:9d} {p50:6.2f}s {p95:6.2f}s {p99:6.2f}s")
+    everything = [l for values in latencies.values() for l in values]
+    p50, p95, p99 = np.percentile(everything, [50, 95, 99])
+    print(f"{'all':>21} {len(everything):6d} {sum(degraded.values()):9d} {p50:6.2f}s {p95:6.2f}s {p99:6.2f}s")
+    print(f"\nThroughput: {len(everything) / elapsed:.2f} calls/s in {elapsed:.1f}s")
+
+    client = llm_client.stats()
+    print("llm_client retries:", {site: m["retries"] for site, m in client["sites"].items()},
+          "errors:", {site: m["errors"] for site, m in client["sites"].items()})
+    cache = client["cache"]
+    print("Cache:", "off" if not cache["enabled"] else
+          {site: f"{c['hit_rate']:.0%} ({c['memory_hits']}+{c['disk_hits']} hits)" for site, c in cache["sites"].items()} or "no opted-in sites")
+    served = standin.stats()
+    print("Stand-in served:", served["by_status"], "injected:", served["injected"], "rate limited:", served["rate_limited"])
+    standin.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: LLM throughput against a rate-limited local Groq stand-in.
+
+groq_standin.py enforces a requests/tokens quota per window (token
+buckets, like Groq), answers 429 with Retry-After when it is exceeded and sends
+the x-ratelimit-* headers on every response. The quota window is shortened to
+--period seconds so a "minute" of quota passes quickly.
+
+  single       1 thread, no admission control (today's safe setting)
+  unguarded    --threads threads, no admission control (retry/backoff only)
+  controlled   --threads threads through services/llm_rate_limiter
+
+Reports completed/failed calls, 429s served, calls/sec and p50/p95 latency.
+
+Usage:
+    python bench_llm_rate_limit.py
+    python bench_llm_rate_limit.py --threads 32 --calls 300 --tpm 40000
+"""
+import argparse
+import os
+import time
+import concurrent.futures
+import numpy as np
+from groq_standin import StandIn
+
+def run(label, llm_client, calls, threads, prompt, quota):
+    latencies, failures = [], 0
+    rejected_before = quota.rejected
+
+    def one(_):
+        t0 = time.time()
+        try:
+            llm_client.chat("screening", [{"role": "user", "content": prompt}], json_mode=True)
+            return time.time() - t0
+        except llm_client.LLMError:
+            return None
+
+    t0 = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        for latency in pool.map(one, range(calls)):
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+    elapsed = time.time() - t0
+    p50, p95 = (np.percentile(latencies, [50, 95]) if latencies else (0.0, 0.0))
+    print(f"{label:>11}: {len(latencies)} ok, {failures} failed, {quota.rejected - rejected_before} x 429 in {elapsed:.1f}s "
+          f"-> {len(latencies) / elapsed:.2f} calls/s, p50 {p50:.2f}s, p95 {p95:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=120)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=120, help="requests per window")
+    parser.add_argument("--tpm", type=int, default=30000, help="tokens per window")
+    parser.add_argument("--period", type=float, default=6.0, help="quota window in seconds (Groq: 60)")
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in response time in seconds")
+    parser.add_argument("--prompt-chars", type=int, default=4000)
+    args = parser.parse_args()
+
+    standin = StandIn(latency=f"fixed:{args.latency}", rpm=args.rpm, tpm=args.tpm, period=args.period)
+    quota = standin.quota
+    os.environ["GROQ_BASE_URL"] = standin.start()
+    os.environ.setdefault("GROQ_API_KEY", "bench")
+    os.environ["LLM_BACKOFF_BASE"] = str(args.period / 30) # backoff in the same shortened time scale
+    os.environ["LLM_BACKOFF_MAX"] = str(args.period / 6)
+
+    from services import llm_client, llm_rate_limiter
+    prompt = "x" * args.prompt_chars
+    per_call = args.prompt_chars // 4 + 5 # the stand-in's answer to an unrecognised prompt is ~5 tokens
+    print(f"Quota: {args.rpm} requests / {args.tpm} tokens per {args.period:.0f}s window, "
+          f"~{per_call} tokens per call -> at most {min(args.rpm, args.tpm / per_call) / args.period:.2f} calls/s sustained")
+
+    modes = [
+        ("single", 1, False),
+        ("unguarded", args.threads, False),
+        ("controlled", args.threads, True),
+    ]
+    for label, threads, enabled in modes:
+        time.sleep(args.period) # let the stand-in's quota refill between modes
+        quota.reset()
+        llm_rate_limiter.controller = llm_rate_limiter.AdmissionController(
+            rpm=args.rpm, tpm=args.tpm, max_concurrency=threads, enabled=enabled, period=args.period
+        )
+        calls = max(args.calls // 4, 10) if threads == 1 else args.calls
+        run(label, llm_client, calls, threads, prompt, quota)
+    standin.stop()
+
+if __name__ == "__main__":
+    main()
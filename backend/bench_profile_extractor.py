@@ -0,0 +1,125 @@
+"""
+Benchmark: legacy contact heuristic (first email + first short line of five)
+vs services/profile_extractor.py.
+
+Fixture corpus: synthetic resumes with the header layouts the legacy heuristic
+gets wrong or sends to Groq (pipe-separated contact lines, "RESUME" banners,
+job titles above the name, "Name:" labels, "[at]"-obfuscated emails, names
+only in the email or LinkedIn URL), with known names/emails. Reports name/email accuracy, the share of resumes
+that would still need the LLM fallback, per-resume extraction latency, and
+the path that resolved each name.
+
+Usage:
+    python bench_profile_extractor.py
+    python bench_profile_extractor.py --pdf-dir media/resumes   # fallback rate + latency only
+"""
+import argparse
+import random
+import re
+import time
+from collections import Counter
+import numpy as np
+from bench_embedding import SKILLS, load_corpus
+from services import profile_extractor
+
+FIRST = ["Aarav", "Priya", "John", "Maria", "Wei", "Fatima", "Lucas", "Ananya", "Omar", "Sofia"]
+LAST = ["Sharma", "Iyer", "Smith", "Garcia", "Chen", "Khan", "Silva", "Reddy", "Haddad", "Rossi"]
+
+def _body(rng):
+    lines = ["", "SUMMARY", "Backend engineer focused on reliable, well-tested services.", "", "EXPERIENCE"]
+    year = rng.randint(2008, 2016)
+    for _ in range(rng.randint(2, 4)):
+        span = rng.randint(1, 3)
+        lines.append(f"Software Engineer, Company {rng.randint(1, 99)}  Jan {year} - Mar {year + span}")
+        lines += [f"- Built services with {', '.join(rng.sample(SKILLS, 3))}." for _ in range(3)]
+        year += span
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, 8)), "", "EDUCATION", "B.Tech Computer Science"]
+    return lines
+
+def fixture(i):
+    """
+    -> (text, name, email, layout)
+    """
+    rng = random.Random(i)
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    name, email = f"{first} {last}", f"{first.lower()}.{last.lower()}@example.com"
+    phone = f"+91 98{rng.randint(10000000, 99999999)}"
+    layouts = {
+        "plain": [name, email, phone],
+        "caps": [name.upper(), f"{email} | {phone}"],
+        "pipes": [f"{name} | {email} | {phone} | linkedin.com/in/{first.lower()}-{last.lower()}"],
+        "banner": ["RESUME", name, f"Email: {email}", f"Phone: {phone}"],
+        "title_first": ["Senior Software Engineer", name, email],
+        "label": ["CURRICULUM VITAE", f"Name: {name}", f"E-mail: {email}", f"Mobile: {phone}"],
+        "email_only": [f"Contact: {email} / {phone}", "Bangalore 560001"],
+        "obfuscated": [name, f"{first.lower()}.{last.lower()} [at] example [dot] com", phone],
+        "linkedin_only": [f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{rng.randint(100, 999)}",
+                          phone, email.replace(".", "", 1)],
+    }
+    layout = list(layouts)[i % len(layouts)]
+    header = layouts[layout]
+    if layout == "linkedin_only":
+        email = email.replace(".", "", 1)
+    return "\n".join(header + _body(rng)), name, email, layout
+
+def legacy(text):
+    # Pre-profile_extractor heuristic from RAGService.extract_candidate_info
+    info = {"name": "Unknown Candidate", "email": None}
+    match = re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
+    if match:
+        info["email"] = match.group(0)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    for i in range(min(5, len(lines))):
+        potential_name = lines[i]
+        if (1 <= len(potential_name.split()) <= 4 and len(potential_name) < 50 and
+                "@" not in potential_name and not any(char.isdigit() for char in potential_name)):
+            info["name"] = potential_name.title()
+            break
+    return info
+
+def needs_llm(info):
+    return not info["email"] or info["name"] == "Unknown Candidate"
+
+def run(label, fn, corpus, rounds):
+    best = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        infos = [fn(text) for text, *_ in corpus]
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+
+    fallback = np.mean([needs_llm(info) for info in infos])
+    line = f"{label:>10}: {1e6 * best / len(corpus):7.1f} us/resume, LLM fallback {fallback:.0%}"
+    if corpus[0][1] is not None:
+        names = np.mean([info["name"] == name for info, (_, name, _, _) in zip(infos, corpus)])
+        emails = np.mean([info["email"] == email for info, (_, _, email, _) in zip(infos, corpus)])
+        line += f", name accuracy {names:.0%}, email accuracy {emails:.0%}"
+    print(line)
+    return infos
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf-dir", default=None)
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pdf_dir:
+        corpus = [(text, None, None, "pdf") for text in load_corpus(args.pdf_dir, args.count)]
+    else:
+        corpus = [fixture(i) for i in range(args.count)]
+    print(f"Corpus: {len(corpus)} resumes")
+
+    run("legacy", legacy, corpus, args.rounds)
+    infos = run("profile", profile_extractor.extract, corpus, args.rounds)
+
+    print("Name resolved by:", dict(Counter(info["sources"].get("name", "unresolved") for info in infos)))
+    if corpus[0][1] is not None:
+        by_layout = Counter()
+        for info, (_, name, _, layout) in zip(infos, corpus):
+            by_layout[layout] += info["name"] != name
+        misses = {layout: n for layout, n in by_layout.items() if n}
+        print("Name misses by layout:", misses or "none")
+
+if __name__ == "__main__":
+    main()
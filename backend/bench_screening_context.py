@@ -0,0 +1,94 @@
+"""
+Benchmark: whole resume (truncated at 25k chars) vs the token-budgeted,
+JD-relevant screening context (services/screening_context.py).
+
+Reports context tokens per resume. With GROQ_API_KEY set, also screens every
+fixture both ways and reports Groq latency and score agreement
+(mean |score difference|, share within 5 points). Without it, only the
+context sizes are reported.
+
+Usage:
+    python bench_screening_context.py                            # synthetic long resumes
+    python bench_screening_context.py --pdf-dir media/resumes --jd jd.txt --budget 1500
+"""
+import argparse
+import os
+import time
+import numpy as np
+from bench_chunking import NEEDLES, fixture_resume
+from bench_embedding import SKILLS, load_corpus
+from services.rag_service import RAGService
+from services import chunking, embeddings, screening_context
+
+DEFAULT_JD = (
+    "Senior Backend Engineer. We are looking for an engineer with 5+ years building "
+    "distributed systems in Python and Go, running services on Kubernetes and AWS, "
+    "with Kafka, PostgreSQL and Redis. Experience with payment fraud detection or "
+    "other real-time scoring systems is a strong plus. Bachelor's degree in Computer Science."
+)
+
+def long_resume(i, needle):
+    # The bench_chunking fixture, padded with earlier roles so it exceeds the budget
+    text = fixture_resume(i, needle)
+    earlier = ["EARLIER EXPERIENCE"]
+    for job in range(20):
+        earlier.append(f"Developer at Agency {job} ({2000 + job} - {2001 + job})")
+        earlier += [f"- Maintained internal tools in {SKILLS[(i + job + k) % len(SKILLS)]} for the operations team."
+                    for k in range(6)]
+        earlier.append("")
+    return text.replace("\nSKILLS\n", "\n" + "\n".join(earlier) + "\nSKILLS\n", 1)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf-dir", default=None)
+    parser.add_argument("--jd", default=None, help="file with the job description text")
+    parser.add_argument("--count", type=int, default=len(NEEDLES))
+    parser.add_argument("--budget", type=int, default=screening_context.SCREENING_CONTEXT_TOKENS)
+    args = parser.parse_args()
+
+    if args.pdf_dir:
+        resumes = load_corpus(args.pdf_dir, args.count)
+    else:
+        resumes = [long_resume(i, NEEDLES[i % len(NEEDLES)][0]) for i in range(args.count)]
+    jd_text = open(args.jd).read() if args.jd else DEFAULT_JD
+    jd = {"title": "Benchmark", "description": jd_text, "embedding": embeddings.encode([jd_text])[0]}
+    brief = RAGService.build_jd_brief(jd)
+
+    contexts = []
+    for text in resumes:
+        compact, stats = screening_context.build_context(text, jd["embedding"], args.budget)
+        contexts.append((text[:25000], compact))
+        print(f"  ~{chunking.estimate_tokens(text[:25000]):>5} -> ~{stats['tokens']:>5} tokens "
+              f"({stats['kept'] or '-'}/{stats['chunks'] or '-'} chunks)")
+
+    full_tokens = [chunking.estimate_tokens(full) for full, _ in contexts]
+    compact_tokens = [chunking.estimate_tokens(compact) for _, compact in contexts]
+    print(f"Corpus: {len(resumes)} resumes, budget {args.budget}: "
+          f"{np.mean(full_tokens):.0f} -> {np.mean(compact_tokens):.0f} est. context tokens/resume")
+
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        print("GROQ_API_KEY not set: skipping latency and score agreement")
+        return
+
+    rows = []
+    for full, compact in contexts:
+        row = []
+        for context in (full, compact):
+            t0 = time.time()
+            analysis = RAGService.call_groq_api(brief, context, api_key)
+            row.append((analysis.get("score", 0), time.time() - t0, analysis.get("ai_failed", False)))
+        rows.append(row)
+
+    ok = [r for r in rows if not r[0][2] and not r[1][2]]
+    if not ok:
+        print("Every Groq call failed")
+        return
+    diffs = np.asarray([abs(full[0] - compact[0]) for full, compact in ok])
+    print(f"{'full':>8}: {np.mean([r[0][1] for r in ok]):.2f}s/resume")
+    print(f"{'compact':>8}: {np.mean([r[1][1] for r in ok]):.2f}s/resume")
+    print(f"Score agreement over {len(ok)} resumes: mean |diff| {diffs.mean():.1f}, "
+          f"within 5 points {np.mean(diffs <= 5):.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from services.rag_service import get_collection, RAGService
+from services import candidate_index, embeddings
+from services.vector_retention import SCAN_PAGE_SIZE
+
+# Backfill the whole-pool candidate index from chunks already linked to candidates
+# (new screenings keep it in sync on their own). Only chunks embedded by the
+# current embedder: the index is per embedder, vectors of other models don't mix.
+index = candidate_index.get_index()
+linked = {"$and": [{"candidate_id": {"$gte": 0}}, {"embedder": embeddings.embedder_tag()}]}
+linked_embeddings, linked_metadatas = [], []
+
+offset = 0
+while True:
+    page = get_collection().get(where=linked, include=["metadatas", "embeddings"], limit=SCAN_PAGE_SIZE, offset=offset)
+    if not page["ids"]:
+        break
+    for emb, meta in zip(page["embeddings"], page["metadatas"]):
+        if meta:
+            linked_embeddings.append(emb)
+            linked_metadatas.append(meta)
+    offset += len(page["ids"])
+
+vectors = RAGService.pool_by(linked_embeddings, linked_metadatas, "candidate_id")
+index.upsert(vectors)
+print(f'✓ Indexed {len(vectors)} candidates from {len(linked_metadatas)} chunks')
+print(f'✓ Reclaimed {index.compact()} stale rows')
+print(f'✓ Index stats: {index.stats()}')
@@ -0,0 +1,472 @@
+"""
+Offline Groq stand-in: a local OpenAI/Groq-compatible chat completions server
+for benchmarks and manual testing without network access or an API key quota.
+
+Point the backend at it through the base-URL setting llm_client already reads:
+
+    python groq_standin.py --port 8787
+    GROQ_BASE_URL=http://127.0.0.1:8787/openai/v1 GROQ_API_KEY=offline uvicorn main:app
+
+Every prompt the backend sends is recognised by its wording and answered with
+deterministic canned JSON of the shape the caller parses (same prompt -> same
+answer): screening (call_groq_api), contact extraction single/batched,
+JD skills, aptitude/coding/interview question generation (call_llm), code
+evaluation, analyze_error and interview transcript evaluation. Unknown prompts
+get {"result": "ok"}.
+
+Knobs (all optional):
+    --latency lognormal:0.8,0.5   fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA (seconds)
+    --tokens-per-second 500       adds completion_tokens / rate to every response
+    --errors 429=0.05,500=0.02,malformed=0.01
+                                  injected failure probabilities; kinds are HTTP
+                                  statuses, "malformed" (200 with truncated JSON)
+                                  and "timeout" (answers after --timeout-seconds)
+    --rpm 30 --tpm 6000           enforce a Groq-style quota (token buckets over
+                                  --period seconds): 429 + Retry-After when
+                                  exceeded, x-ratelimit-* headers on every response
+
+GET /stats returns request counts per prompt kind and per status.
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = int(os.getenv("GROQ_STANDIN_PORT", 8787))
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+YEARS_RE = re.compile(r'(\d{1,2})\+?\s*(?:years|yrs)', re.IGNORECASE)
+DEGREE_RE = re.compile(r'\b(?:b\.?\s?tech|b\.?\s?e\b|b\.?\s?s\b|m\.?\s?tech|m\.?\s?s\b|bachelor|master|ph\.?d|degree)', re.IGNORECASE)
+BLOCK_RE = re.compile(r'=== RESUME (r\d+) ===\n(.*?)(?=\n\s*=== RESUME |\n\s*OUTPUT JSON ONLY)', re.DOTALL)
+
+# Vocabulary used to fake skill matching in screening / JD skill answers
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "C++", "SQL", "MySQL", "PostgreSQL", "MongoDB",
+    "Redis", "Kafka", "Docker", "Kubernetes", "AWS", "GCP", "Azure", "Terraform", "Linux", "Git",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring", "GraphQL", "REST",
+    "Microservices", "CI/CD", "Jenkins", "Pandas", "NumPy", "PyTorch", "TensorFlow", "Machine Learning",
+    "Spark", "Airflow"
+]
+_SKILL_RES = [(skill, re.compile(rf'(?<![\w+#]){re.escape(skill)}(?![\w+#])', re.IGNORECASE)) for skill in SKILLS]
+
+class Quota:
+    """
+    Groq-style per-window quota: requests and tokens token buckets refilled
+    continuously over `period` seconds. A limit of 0 disables that bucket.
+    """
+    def __init__(self, rpm=0, tpm=0, period=60.0):
+        self.lock = threading.Lock()
+        self.limits = {k: v for k, v in (("requests", rpm), ("tokens", tpm)) if v}
+        self.levels = dict(self.limits)
+        self.period = period
+        self.updated = time.monotonic()
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return bool(self.limits)
+
+    def reset(self):
+        with self.lock:
+            self.levels = dict(self.limits)
+            self.updated = time.monotonic()
+
+    def take(self, tokens):
+        """
+        -> (ok, retry_after, remaining)
+        """
+        with self.lock:
+            now = time.monotonic()
+            for key, limit in self.limits.items():
+                self.levels[key] = min(limit, self.levels[key] + (now - self.updated) * limit / self.period)
+            self.updated = now
+            need = {"requests": 1, "tokens": tokens}
+            short = [(min(need[k], self.limits[k]) - self.levels[k]) * self.period / self.limits[k]
+                     for k in self.limits if self.levels[k] < min(need[k], self.limits[k])]
+            if short:
+                self.rejected += 1
+                return False, max(short), dict(self.levels)
+            for key in self.limits:
+                self.levels[key] -= need[key]
+            return True, 0.0, dict(self.levels)
+
+    def headers(self, remaining, retry_after):
+        out = {}
+        for key, limit in self.limits.items():
+            level = remaining.get(key, limit)
+            out[f"x-ratelimit-limit-{key}"] = str(limit)
+            out[f"x-ratelimit-remaining-{key}"] = str(int(max(level, 0)))
+            out[f"x-ratelimit-reset-{key}"] = f"{max(retry_after, (limit - level) * self.period / limit):.2f}s"
+        return out
+
+def parse_latency(spec: str):
+    """
+    "fixed:0.3" / "0.3" / "uniform:0.2,1.5" / "lognormal:0.8,0.5" -> fn(rng) -> seconds
+    """
+    kind, _, params = (spec or "0").partition(":")
+    if not params:
+        kind, params = "fixed", kind
+    values = [float(v) for v in params.split(",")]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        # median, sigma of the underlying normal: p95 ~= median * e^(1.645 sigma)
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def parse_errors(spec: str):
+    """
+    "429=0.05,503=0.01,malformed=0.02" -> [(kind, probability)]
+    """
+    errors = []
+    for part in filter(None, (spec or "").split(",")):
+        kind, _, prob = part.partition("=")
+        kind = kind.strip()
+        if kind not in ("malformed", "timeout") and not kind.isdigit():
+            raise ValueError(f"Unknown error kind: {kind}")
+        errors.append((kind, float(prob)))
+    return errors
+
+# --- Canned answers, keyed by prompt wording ---
+
+def _section(prompt, start, end=None):
+    head = prompt.split(start, 1)[1] if start in prompt else ""
+    return head.split(end, 1)[0] if end and end in head else head
+
+def _group(pattern, prompt, default):
+    match = re.search(pattern, prompt)
+    return match.group(1).strip() if match else default
+
+def _digest(text):
+    return int(hashlib.sha1(text.encode("utf-8", "ignore")).hexdigest()[:8], 16)
+
+def _skills_in(text):
+    return [skill for skill, pattern in _SKILL_RES if pattern.search(text)]
+
+def _guess_name(text):
+    for line in (l.strip() for l in text.split("\n")):
+        if not line or "@" in line or any(ch.isdigit() for ch in line):
+            continue
+        words = line.replace("Name:", "").split()
+        if 1 <= len(words) <= 4 and all(w.replace(".", "").replace("-", "").isalpha() for w in words):
+            return " ".join(w.title() for w in words)
+        break
+    return None
+
+def _contact(text):
+    email = EMAIL_RE.search(text)
+    return {"name": _guess_name(text), "email": email.group(0) if email else None}
+
+def answer_screening(prompt):
+    jd = _section(prompt, "JOB DESCRIPTION:", "CANDIDATE RESUME:")
+    resume = _section(prompt, "CANDIDATE RESUME:", "TASK:")
+    wanted = _skills_in(jd) or SKILLS[:5]
+    have = set(_skills_in(resume))
+    matched = [s for s in wanted if s in have]
+    years = max([int(y) for y in YEARS_RE.findall(resume)] or [0])
+    h = _digest(jd + resume)
+    components = {
+        "skills": round(40 * len(matched) / len(wanted)),
+        "experience": min(25, 5 * years) if years else 5 + h % 11,
+        "projects": 8 + h % 13,
+        "education": 10 if DEGREE_RE.search(resume) else 4,
+        "bonus": (h >> 4) % 6
+    }
+    return {
+        "score": sum(components.values()),
+        "component_scores": components,
+        "key_skills_match": matched,
+        "missing_skills": [s for s in wanted if s not in have],
+        "reasoning": f"Matches {len(matched)} of {len(wanted)} requested skills. "
+                     f"{'Relevant experience of about ' + str(years) + ' years.' if years else 'Experience level unclear.'}",
+        "extracted_role": _group(r'ROLE:\s*(.+)', jd, "Software Engineer")
+    }
+
+def answer_contact(prompt):
+    return _contact(_section(prompt, "TEXT:", "OUTPUT JSON ONLY"))
+
+def answer_contact_batch(prompt):
+    return {"candidates": [{"id": item_id, **_contact(text)} for item_id, text in BLOCK_RE.findall(prompt)]}
+
+def answer_jd_skills(prompt):
+    skills = _skills_in(_section(prompt, "JOB DESCRIPTION:", "OUTPUT JSON ONLY"))
+    cut = (len(skills) + 1) // 2 + 1
+    return {"required_skills": skills[:cut], "preferred_skills": skills[cut:]}
+
+def answer_aptitude(prompt):
+    count = int(_group(r'Generate (\d+) multiple-choice', prompt, 10))
+    h = _digest(prompt)
+    questions = []
+    for i in range(1, count + 1):
+        a, b = 3 + (h + 7 * i) % 40, 2 + (h + 11 * i) % 25
+        correct = (h + i) % 4
+        options = [str(a + b + d) for d in (-2, -1, 1, 2)]
+        options[correct] = str(a + b)
+        questions.append({"id": i, "question": f"What is {a} + {b}?", "options": options, "correct": correct})
+    return questions
+
+def answer_coding(prompt):
+    count = int(_group(r'Generate (\d+) UNIQUE', prompt, 1))
+    tests = int(_group(r'Exactly (\d+) test cases', prompt, 3))
+    problems = []
+    for i in range(1, count + 1):
+        cases = [{"id": t, "input": {"nums": list(range(t, t + i + 2))}, "expected": sum(range(t, t + i + 2))}
+                 for t in range(1, tests + 1)]
+        problems.append({
+            "id": i,
+            "title": f"Array Sum {i}",
+            "description": "Given an integer array nums, return the sum of its elements.",
+            "constraints": ["1 <= nums.length <= 10^4", "-10^4 <= nums[i] <= 10^4"],
+            "starterCode": {
+                "java": "class Solution {\n    public int solve(int[] nums) {\n        \n    }\n}",
+                "python": "def solve(nums):\n    pass"
+            },
+            "testCases": cases,
+            "examples": [{"input": json.dumps(c["input"]), "output": str(c["expected"]),
+                          "explanation": "Add every element."} for c in cases[:2]]
+        })
+    return problems
+
+def answer_interview_starters(prompt):
+    topic = _group(r'Topic:\s*(.+)', prompt, "General Technical")
+    return [f"Walk me through a recent project where you used {topic}.",
+            f"What trade-offs matter most when designing with {topic}?",
+            f"How do you debug a production issue in a {topic} system?",
+            f"Explain a core concept of {topic} to a new teammate.",
+            f"How would you test a feature built with {topic}?"]
+
+def answer_code_evaluation(prompt):
+    ids = [int(i) for i in re.findall(r'"id":\s*(\d+)', _section(prompt, "Test Cases to Evaluate", "Instructions:"))]
+    return {"syntax_valid": True, "error_message": "",
+            "results": [{"id": i, "status": "passed", "output": "", "expected": ""} for i in ids],
+            "feedback": "Logic looks correct for the given test cases."}
+
+def answer_error_analysis(prompt):
+    error = _section(prompt, "Error Output:", "Task:").strip().split("\n")
+    last = next((line.strip() for line in reversed(error) if line.strip()), "an error")
+    return {"feedback": f"The program stopped with: {last[:120]}. Check the line it points to and the types of the values used there."}
+
+def answer_interview_evaluation(prompt):
+    transcript = _section(prompt, "TRANSCRIPT:", "Analyze the candidate")
+    answers = [l for l in transcript.split("\n") if l.startswith("Candidate:")]
+    words = sum(len(l.split()) for l in answers)
+    h = _digest(transcript)
+    base = min(90, 40 + words // 10)
+    scores = {
+        "technical_accuracy": base + h % 10,
+        "communication_clarity": base + (h >> 4) % 10,
+        "problem_solving": base + (h >> 8) % 10,
+        "depth_of_knowledge": base + (h >> 12) % 10
+    }
+    overall = (0.40 * scores["technical_accuracy"] + 0.25 * scores["communication_clarity"]
+               + 0.20 * scores["problem_solving"] + 0.15 * scores["depth_of_knowledge"])
+    return {**scores, "overall_score": round(overall, 2),
+            "feedback": f"Gave {len(answers)} answers ({words} words). Clear on fundamentals; could go deeper on trade-offs."}
+
+# (kind, marker in the prompt, answer builder); first match wins
+PROMPT_KINDS = [
+    ("screening", "Senior Technical Recruiter evaluation engine", answer_screening),
+    ("contact_batch", "=== RESUME r", answer_contact_batch),
+    ("contact", "Extract the **Candidate Name** and **Email Address**", answer_contact),
+    ("jd_skills", "List the skills requested by the Job Description", answer_jd_skills),
+    ("aptitude", "multiple-choice aptitude questions", answer_aptitude),
+    ("coding", "coding challenge problem", answer_coding),
+    ("interview_questions", "interview discussion starters", answer_interview_starters),
+    ("code_evaluation", "Act as a Code Execution Engine", answer_code_evaluation),
+    ("error_analysis", "Analyze this Code Execution Error", answer_error_analysis),
+    ("interview_evaluation", "evaluating an interview transcript", answer_interview_evaluation),
+]
+
+def answer(prompt: str):
+    """
+    -> (kind, content string)
+    """
+    for kind, marker, build in PROMPT_KINDS:
+        if marker in prompt:
+            return kind, json.dumps(build(prompt))
+    return "other", json.dumps({"result": "ok"})
+
+class StandIn:
+    """
+    The stand-in server. start() runs it on a background thread (benchmarks),
+    serve_forever() in the foreground (python groq_standin.py).
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0.05", tokens_per_second=0.0,
+                 errors="", rpm=0, tpm=0, period=60.0, timeout_seconds=60.0, seed=0):
+        self.latency = parse_latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.errors = parse_errors(errors)
+        self.quota = Quota(rpm, tpm, period)
+        self.timeout_seconds = timeout_seconds
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "by_kind": {}, "by_status": {}, "injected": {}}
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def _draw(self):
+        """
+        -> (latency seconds, injected error kind or None)
+        """
+        with self._rng_lock:
+            delay = max(self.latency(self._rng), 0.0)
+            roll = self._rng.random()
+        for kind, prob in self.errors:
+            if roll < prob:
+                return delay, kind
+            roll -= prob
+        return delay, None
+
+    def _count(self, kind, status, injected=None):
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["by_kind"][kind] = self._stats["by_kind"].get(kind, 0) + 1
+            self._stats["by_status"][str(status)] = self._stats["by_status"].get(str(status), 0) + 1
+            if injected:
+                self._stats["injected"][injected] = self._stats["injected"].get(injected, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            out = json.loads(json.dumps(self._stats))
+        out["rate_limited"] = self.quota.rejected
+        return out
+
+    def complete(self, body: dict):
+        """
+        -> (status, payload dict, headers dict, delay seconds) for one chat completion request.
+        """
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages if isinstance(m, dict))
+        kind, content = answer(prompt)
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = max(len(content) // 4, 1)
+        delay, injected = self._draw()
+
+        ok, retry_after, remaining = self.quota.take(prompt_tokens + completion_tokens) if self.quota.enabled else (True, 0.0, {})
+        headers = self.quota.headers(remaining, retry_after) if self.quota.enabled else {}
+        if not ok:
+            headers["retry-after"] = f"{max(retry_after, 0.01):.2f}"
+            self._count(kind, 429)
+            return 429, _error("Rate limit reached for model (stand-in quota)", "tokens", "rate_limit_exceeded"), headers, 0.0
+
+        if injected and injected.isdigit():
+            status = int(injected)
+            if status == 429:
+                headers["retry-after"] = "1"
+            self._count(kind, status, injected)
+            return status, _error(f"Injected {status}", "server_error" if status >= 500 else "invalid_request_error", "injected"), headers, delay
+        if injected == "malformed":
+            content = content[:max(len(content) // 2, 1)]
+        elif injected == "timeout":
+            delay = self.timeout_seconds
+        if self.tokens_per_second:
+            delay += completion_tokens / self.tokens_per_second
+
+        self._count(kind, 200, injected)
+        payload = {
+            "id": f"chatcmpl-standin-{_digest(prompt):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "standin"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        }
+        return 200, payload, headers, delay
+
+def _error(message, error_type, code):
+    return {"error": {"message": message, "type": error_type, "code": code}}
+
+def _make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                return self._send(200, {"object": "list", "data": [{"id": "standin", "object": "model"}]})
+            if self.path.rstrip("/") == "/stats":
+                return self._send(200, standin.stats())
+            self._send(404, _error("Not found", "invalid_request_error", "not_found"))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length)
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._send(404, _error("Not found", "invalid_request_error", "not_found"))
+            if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                return self._send(401, _error("Invalid API Key", "invalid_request_error", "invalid_api_key"))
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                return self._send(400, _error("Request body is not valid JSON", "invalid_request_error", "bad_request"))
+            status, payload, headers, delay = standin.complete(body)
+            if delay:
+                time.sleep(delay)
+            self._send(status, payload, headers)
+
+        def _send(self, status, payload, headers=None):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Groq-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--errors", default="", help="e.g. 429=0.05,500=0.02,malformed=0.01,timeout=0.01")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per window (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="tokens per window (0 = unlimited)")
+    parser.add_argument("--period", type=float, default=60.0, help="quota window in seconds")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    standin = StandIn(args.host, args.port, args.latency, args.tokens_per_second, args.errors,
+                      args.rpm, args.tpm, args.period, args.timeout_seconds, args.seed)
+    print(f"Groq stand-in listening on {standin.base_url} (latency {args.latency}, errors {args.errors or 'none'}, "
+          f"quota {args.rpm or 'unlimited'} req / {args.tpm or 'unlimited'} tokens per {args.period:.0f}s)")
+    print(f"  GROQ_BASE_URL={standin.base_url} GROQ_API_KEY=offline")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
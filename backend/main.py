@@ -4,6 +4,7 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import models, database
 from routers import auth, assessments, resume, dashboard, settings, interview
+from services import vector_retention, embeddings, screening_jobs
 import os
 # Suppress TensorFlow Warnings
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
@@ -45,6 +46,40 @@ app.include_router(dashboard.router)
 app.include_router(settings.router)
 app.include_router(interview.router)
 
+# Periodic retention for the resume_chunks vector collection
+@app.on_event("startup")
+def start_background_workers():
+    # Fail now, not on the first screening, when the embedding backend's packages are missing
+    if embeddings.encodes_locally():
+        embeddings.check_backend()
+    vector_retention.start_worker()
+    # Load + warm the embedding model off the boot path
+    embeddings.start_warm_up()
+    # Screening jobs left queued/running by a previous process will never finish
+    db = database.SessionLocal()
+    try:
+        screening_jobs.fail_stale_jobs(db)
+    except Exception as e:
+        print(f"Failed to check for interrupted screening jobs: {e}")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    vector_retention.stop_worker()
+
 @app.get("/")
 def read_root():
     return {"message": "HiringAI Backend is running on FastAPI!"}
+
+@app.get("/ready")
+def readiness():
+    """
+    Readiness probe: the API is always up; "embeddings" tells whether the
+    screening model is loaded and warmed up yet.
+    """
+    state = embeddings.status()
+    return JSONResponse(
+        status_code=200 if state["ready"] else 503,
+        content={"status": "ready" if state["ready"] else "warming_up", "embeddings": state}
+    )
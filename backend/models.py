@@ -73,6 +73,12 @@ class JobDescription(Base):
     description = Column(Text)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     target_capacity = Column(Integer, default=50)
+    # Artifacts computed once at creation (see services/jd_registry.py)
+    normalized_title = Column(String(100), nullable=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=True)
+    embedding = Column(JSON, nullable=True) # MiniLM vector of the description
+    required_skills = Column(JSON, nullable=True)
+    preferred_skills = Column(JSON, nullable=True)
 
 class Candidate(Base):
     __tablename__ = "candidates"
@@ -91,6 +97,55 @@ class Candidate(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class ScreeningJobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class ScreeningJob(Base):
+    __tablename__ = "screening_jobs"
+    id = Column(String(36), primary_key=True, index=True) # UUID
+    status = Column(String(50), default=ScreeningJobStatus.queued)
+    role = Column(String(100), nullable=True) # Normalized JD Title
+    job_description_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=True)
+    job_description = Column(Text)
+    total_files = Column(Integer, default=0)
+    processed_files = Column(Integer, default=0)
+    failed_files = Column(Integer, default=0)
+    files = Column(JSON, default=[]) # Per-file progress
+    results = Column(JSON, nullable=True) # Final per-file results (without full_text)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True) # Last progress write (stale-job detection)
+
+class ResumeDocument(Base):
+    # Content-addressed cache of a parsed resume, keyed by SHA-256 of the uploaded bytes
+    __tablename__ = "resume_documents"
+    sha256 = Column(String(64), primary_key=True, index=True)
+    filename = Column(String(255), nullable=True)
+    full_text = Column(Text)
+    page_count = Column(Integer, default=0)
+    contact_info = Column(JSON, nullable=True) # {"name": ..., "email": ...}
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ScreeningCacheEntry(Base):
+    # Groq screening results keyed by (resume text hash, JD hash, model, prompt version)
+    __tablename__ = "screening_cache"
+    cache_key = Column(String(64), primary_key=True, index=True) # sha256 of the 4-tuple
+    resume_hash = Column(String(64), index=True)
+    jd_hash = Column(String(64), index=True)
+    model = Column(String(100))
+    prompt_version = Column(String(50), index=True)
+    analysis = Column(JSON)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True) # LRU order
+
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
     id = Column(Integer, primary_key=True, index=True)
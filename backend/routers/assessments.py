@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import string
@@ -8,7 +8,7 @@ import copy
 import schemas, models, utils, database
 import schemas, models, utils, database
 from .auth import get_current_user
-from services import ai_generator, email_templates, piston_service
+from services import ai_generator, assessment_questions, email_templates, piston_service
 
 router = APIRouter(
     prefix="/api/assessments",
@@ -210,6 +210,7 @@ def get_my_pending_assessments(
 
 @router.get("/my-status/", response_model=Optional[schemas.AssessmentResponse])
 def get_my_latest_assessment(
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(database.get_db)
 ):
@@ -220,25 +221,14 @@ def get_my_latest_assessment(
         ).order_by(models.Assessment.created_at.desc()).first()
         
         if assessment:
-            # Check if questions need to be generated (Lazy Generation)
-            # Optimization: Skip for 'interview' as it uses VAPI dynamic generation
-            if not assessment.config.get("generated_questions") and assessment.type != "interview":
-                print(f"Generating questions for Assessment {assessment.id} ({assessment.type})...")
-                
-                # Call AI Service
-                questions = ai_generator.generate_questions(assessment.type, assessment.config)
-                
-                if questions:
-                    # Update Config with Questions
-                    new_config = dict(assessment.config)
-                    new_config["generated_questions"] = questions
-                    assessment.config = new_config
-                    
-                    db.commit()
-                    db.refresh(assessment)
-                    print(f"Generated {len(questions)} questions successfully.")
-                else:
-                    print("Failed to generate questions from AI service.")
+            # Lazy Generation, at most one in flight per assessment across workers
+            # (skips 'interview', which uses VAPI dynamic generation)
+            assessment, generating = assessment_questions.ensure_questions(db, assessment)
+            if generating:
+                # Another request is still generating: report it instead of starting a second LLM run
+                response.status_code = status.HTTP_202_ACCEPTED
+                body = schemas.AssessmentResponse.model_validate(assessment)
+                return body.model_copy(update={"questions_status": assessment_questions.GENERATING})
 
         return assessment
     except Exception as e:
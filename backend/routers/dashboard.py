@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from typing import List
 import schemas, models, database
+from services import llm_client
 
 router = APIRouter(
     prefix="/api/dashboard",
@@ -43,3 +44,11 @@ def mark_notification_read(id: int, db: Session = Depends(database.get_db)):
         note.is_read = True
         db.commit()
     return {"status": "success"}
+
+@router.get("/llm-metrics/")
+def get_llm_metrics():
+    """
+    Per call-site LLM counters for this worker process: calls, errors,
+    retries, prompt/completion tokens and latency.
+    """
+    return llm_client.stats()
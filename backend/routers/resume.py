@@ -1,11 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-import shutil
-import os
 from datetime import datetime, timedelta
 import schemas, models, database
-from services.rag_service import RAGService
 # from .auth import get_current_user # Optional if public or protected
 
 router = APIRouter(
@@ -14,249 +12,118 @@ router = APIRouter(
 )
 
 import time
-import concurrent.futures
+import json
+from services import screening_service, screening_jobs, screening_cache, jd_registry, vector_retention
+from services import embeddings, embedding_cache, candidate_search, candidate_index
+from services.rag_service import RAGService, SCREENING_PROMPT_VERSION
 
-def process_single_resume(file_path: str, filename: str, job_description: str, upload_dir: str):
+def resolve_job_description(db: Session, job_description: Optional[str], job_description_id: Optional[int]):
     """
-    Helper function to process a single resume:
-    1. Ingest (OCR/Embed)
-    2. Extract Info
-    3. AI Screen (Groq)
-    Returns a dict with results or error.
-    Does NOT touch the DB to avoid thread safety issues.
+    Screening requests reference a registered JD by id; raw text is still
+    accepted and registered (or matched by content hash) on the fly.
     """
-    start_time = time.time()
-    result = {
-        "file": filename, 
-        "status": "failed", 
-        "error": None,
-        "score": 0,
-        "reasoning": "N/A",
-        "analysis": {},
-        "candidate_info": {},
-        "timings": {}
-    }
-    
+    if job_description_id:
+        jd = jd_registry.get(db, job_description_id)
+        if not jd:
+            raise HTTPException(status_code=404, detail="Job Description not found")
+        return jd
+
+    if not job_description or not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job Description is required.")
     try:
-        # 1. Ingest
-        t0 = time.time()
-        resume_id = f"temp_{filename}"
-        user_id = 1 
-        RAGService.ingest_resume(user_id, resume_id, file_path)
-        t1 = time.time()
-        result["timings"]["ingest"] = t1 - t0
-        
-        # 2. Extract & Screen
-        full_text = RAGService.extract_text_from_pdf(file_path)
-        candidate_info = RAGService.extract_candidate_info(full_text, filename)
-        result["candidate_info"] = candidate_info
-        result["full_text"] = full_text
-        
-        # 3. Screen (Pass full_text directly)
-        t2 = time.time()
-        analysis = RAGService.screen_resume(job_description, resume_id, full_text)
-        t3 = time.time()
-        result["timings"]["ai"] = t3 - t2
-        
-        result["analysis"] = analysis
-        result["score"] = analysis.get('score', 0)
-        result["role"] = analysis.get('extracted_role') # Capture AI extracted role
-        result["reasoning"] = analysis.get('reasoning', "N/A")
-        result["status"] = "success"
-        
-    except Exception as e:
-        print(f"Error in worker for {filename}: {e}")
-        result["error"] = str(e)
-        
-    result["total_time"] = time.time() - start_time
-    return result
+        return jd_registry.get_or_create(db, job_description)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/job-descriptions/", response_model=schemas.JobDescriptionResponse)
+def create_job_description(payload: schemas.JobDescriptionCreate, db: Session = Depends(database.get_db)):
+    try:
+        return jd_registry.get_or_create(db, payload.description, title=payload.title, target_capacity=payload.target_capacity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/job-descriptions/", response_model=List[schemas.JobDescriptionResponse])
+def list_job_descriptions(db: Session = Depends(database.get_db)):
+    return db.query(models.JobDescription).order_by(models.JobDescription.uploaded_at.desc()).all()
+
+@router.get("/job-descriptions/{jd_id}/", response_model=schemas.JobDescriptionResponse)
+def get_job_description(jd_id: int, db: Session = Depends(database.get_db)):
+    jd = jd_registry.get(db, jd_id)
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    return jd
+
+@router.get("/job-descriptions/{jd_id}/matches/")
+def match_candidates_to_job_description(
+    jd_id: int,
+    top_k: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Ranks the whole candidate pool against a JD by resume/JD embedding
+    similarity (one in-memory matrix multiply, no LLM calls).
+    """
+    jd = jd_registry.get(db, jd_id)
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    if not jd.embedding:
+        raise HTTPException(status_code=409, detail="Job Description has no embedding yet.")
+
+    index = candidate_index.get_index()
+    ranked = index.rank(jd.embedding, top_k=top_k)
+    candidates = {
+        c.id: c for c in db.query(models.Candidate).filter(models.Candidate.id.in_([cid for cid, _ in ranked])).all()
+    } if ranked else {}
+
+    results = []
+    for candidate_id, similarity in ranked:
+        candidate = candidates.get(candidate_id)
+        if candidate is None:
+            continue
+        results.append({
+            "candidate_id": candidate_id,
+            "name": candidate.name,
+            "email": candidate.email,
+            "role": candidate.role,
+            "stage": candidate.stage,
+            "status": candidate.status,
+            "similarity": similarity
+        })
+    return {"job_description_id": jd_id, "indexed_candidates": index.stats()["candidates"], "results": results}
 
 @router.post("/screen/")
 def screen_resume(
     files: List[UploadFile] = File(...),
     job_description: Optional[str] = Form(None),
+    job_description_id: Optional[int] = Form(None),
+    shortlist_size: Optional[int] = Form(None),
+    min_similarity: Optional[float] = Form(None),
     db: Session = Depends(database.get_db)
 ):
+    """
+    shortlist_size / min_similarity limit the Groq stage to the top-K (or
+    above-threshold) resumes by embedding similarity to the JD; the rest are
+    recorded as not shortlisted.
+    """
     start_total = time.time()
     print(f"--- START PARALLEL SCREENING: {len(files)} files ---")
-    
-    # Normalization Helper
-    def normalize_role(raw_title: str) -> str:
-        # Common prefixes to strip
-        prefixes = [
-            "we are looking for a", "we are looking for an", "we are looking for",
-            "hiring for a", "hiring for an", "hiring for",
-            "seeking candidates for a", "seeking candidates for", "seeking", 
-            "looking for a", "looking for"
-        ]
-        
-        cleaned = raw_title.lower().strip()
-        
-        # 1. Strict Canonical Mapping (Based on User Rules)
-        if any(k in cleaned for k in ["full stack", "fullstack", "mern", "mean"]):
-             return "Full Stack Software Engineer"
-        if any(k in cleaned for k in ["frontend", "front end", "react", "angular", "vue"]):
-             return "Frontend Developer"
-        if any(k in cleaned for k in ["backend", "back end", "node", "django", "fastapi", "java", "spring"]):
-             return "Backend Developer"
-        if any(k in cleaned for k in ["python", "machine learning", "ai", "data scientist"]):
-             return "Python Developer"
-        if any(k in cleaned for k in ["software engineer", "developer", "sde"]):
-             return "Software Engineer"
-
-        # 2. Fallback: Strip noise if no specific keyword match (preserve original intent but clean it)
-        for prefix in prefixes:
-            if cleaned.startswith(prefix):
-                cleaned = cleaned[len(prefix):].strip()
-                break 
-        
-        # Strip noise suffixes
-        noise_phrases = ["to join our development team", "and work on building", "remote", "(remote)", "urgent hiring"]
-        for noise in noise_phrases:
-            cleaned = cleaned.replace(noise, "")
-            
-        return cleaned.title().strip()
-
-    # Extract Title from JD (First line)
-    jd_lines = [l.strip() for l in job_description.split('\n') if l.strip()]
-    if jd_lines:
-        raw_title = jd_lines[0][:100] # Take first line
-        jd_title = normalize_role(raw_title)
-    else:
-        jd_title = "General Candidate"
-    
-    candidate_count = db.query(models.Candidate).count()
-    
-    MAX_CANDIDATES = 50
-    if candidate_count >= MAX_CANDIDATES:
-        return {"message": f"Candidate limit ({MAX_CANDIDATES}) reached.", "status": "limit_exceeded"}
-    
-    if candidate_count + len(files) > MAX_CANDIDATES:
-        allowed = MAX_CANDIDATES - candidate_count
-        return {"message": f"Upload exceeds limit. Allow {allowed} more.", "status": "limit_exceeded"}
 
-    UPLOAD_DIR = "media/resumes"
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    
-    if not job_description or not job_description.strip():
-        raise HTTPException(status_code=400, detail="Job Description is required.")
+    jd = jd_registry.to_artifacts(resolve_job_description(db, job_description, job_description_id))
+
+    limit_error = screening_service.check_candidate_capacity(db, len(files))
+    if limit_error:
+        return limit_error
 
     # 1. Save all files to disk first (Fast IO)
-    saved_files = [] 
-    results = []
-    
-    for file in files:
-        if not file.filename.lower().endswith(('.pdf', '.docx', '.doc')):
-            results.append({"file": file.filename, "error": "Unsupported format.", "status": "failed"})
-            continue
-            
-        file_location = f"{UPLOAD_DIR}/{file.filename}"
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-        
-        saved_files.append((file_location, file.filename))
+    saved_files, results = screening_service.save_uploads(files)
+
+    # 2. Parallel Processing (Heavy CPU/Network) on the shared worker pool
+    processed_data = list(screening_service.iter_screening_results(
+        saved_files, jd, shortlist_size=shortlist_size, min_similarity=min_similarity
+    ))
 
-    # 2. Parallel Processing (Heavy CPU/Network)
-    processed_data = []
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future_to_file = {
-            executor.submit(process_single_resume, loc, name, job_description, UPLOAD_DIR): name 
-            for loc, name in saved_files
-        }
-        
-        for future in concurrent.futures.as_completed(future_to_file):
-            data = future.result()
-            processed_data.append(data)
-            
-            # Print logs immediately as they finish
-            if data["status"] == "success":
-                print(f"Finished {data['file']} in {data['total_time']:.2f}s "
-                      f"(Ingest: {data['timings'].get('ingest',0):.2f}s, AI: {data['timings'].get('ai',0):.2f}s)")
-            else:
-                print(f"Failed {data['file']}: {data['error']}")
-    
     # 3. Sequential DB Writes (Main Thread - Safe)
-    for data in processed_data:
-        if data["status"] == "failed":
-            results.append(data)
-            continue
-            
-        # Extract data for DB
-        info = data["candidate_info"]
-        email = info.get('email')
-        score = data["score"]
-        
-        if not email:
-            data["error"] = "Could not extract email."
-            data["status"] = "failed"
-            results.append(data)
-            continue
-            
-        # DB Upsert
-        candidate = db.query(models.Candidate).filter(models.Candidate.email == email).first()
-        
-        # STRICT ROLE ENFORCEMENT: Always use the Normalized JD Title
-        target_role = jd_title
-        
-        if not candidate:
-            print(f"DEBUG: Creating NEW candidate for {email}")
-            candidate = models.Candidate(
-                name=info.get('name', 'Unknown'),
-                email=email,
-                role=target_role, # STRICT: Use normalized JD Title
-                status=models.CandidateStatus.Applied,
-                stage=models.CandidateStage.Resume_Screening,
-                resume_file=data["file"],
-                full_text=data["full_text"], # Save to SQL
-                score=score,
-                analysis_data=data["analysis"]
-            )
-            db.add(candidate)
-            db.commit() 
-            db.refresh(candidate)
-            
-            # Log
-            log = models.ActivityLog(user_id=1, action="screened", target=candidate.name, details=f"Score: {score}/100")
-            db.add(log)
-        else:
-            print(f"DEBUG: Found EXISTING candidate: {candidate.name}")
-            # FIX: Aggressively update metadata if we found better info
-            # This fixes "Unknown Candidate" persistence
-            new_name = info.get('name', 'Unknown')
-            if new_name and new_name not in ["Unknown", "Unknown Candidate", "Candidate", "Resume", "CV"]:
-                print(f"DEBUG: Updating Name to: {new_name}")
-                candidate.name = new_name
-                info["name"] = new_name # Update response data too
-            else:
-                print(f"DEBUG: Skipping name update. New Name: '{new_name}'")
-            
-            # STRICT ROLE UPDATE: Enforce the current batch's role
-            # This ensures if we re-screen for a NEW role, they get updated.
-            if candidate.role != target_role:
-                 print(f"DEBUG: Updating Role from '{candidate.role}' to '{target_role}'")
-                 candidate.role = target_role
-            
-            candidate.score = score
-            candidate.analysis_data = data["analysis"] # Save full breakdown
-            candidate.full_text = data["full_text"] # Update text too
-            candidate.status = models.CandidateStatus.Applied # Reset to valid status
-            candidate.stage = models.CandidateStage.Resume_Screening
-            log = models.ActivityLog(user_id=1, action="re-screened", target=candidate.name, details=f"Score: {score}/100")
-            db.add(log)
-        db.commit()
-        print("DEBUG: DB Commit Successful")
-        
-        # FINAL FIX: Inject the structure the Frontend expects!
-        # Frontend looks for: res.candidate.name
-        data["candidate"] = {
-            "name": candidate.name,
-            "email": candidate.email,
-            "id": candidate.id,
-            "role": candidate.role
-        }
-        
-        results.append(data)
+    results += screening_service.persist_screening_results(db, processed_data, jd["title"])
 
     total_time = time.time() - start_total
     print(f"--- BATCH COMPLETE in {total_time:.2f}s ---")
@@ -264,9 +131,129 @@ def screen_resume(
     return {
         "message": "Screening Complete",
         "results": results,
+        "cache": screening_service.summarize_cache_hits(processed_data),
+        "shortlist": screening_service.summarize_shortlist(processed_data),
         "status": "completed"
     }
 
+@router.post("/screen/stream/")
+def screen_resume_stream(
+    files: List[UploadFile] = File(...),
+    job_description: Optional[str] = Form(None),
+    job_description_id: Optional[int] = Form(None),
+    shortlist_size: Optional[int] = Form(None),
+    min_similarity: Optional[float] = Form(None),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Same as /screen/ but responds with NDJSON: one {"event": "result"} line per
+    resume as soon as it is screened and saved, then one {"event": "summary"} line.
+    """
+    jd = jd_registry.to_artifacts(resolve_job_description(db, job_description, job_description_id))
+
+    limit_error = screening_service.check_candidate_capacity(db, len(files))
+    if limit_error:
+        return limit_error
+
+    saved_files, rejected = screening_service.save_uploads(files)
+    print(f"--- START STREAMING SCREENING: {len(files)} files ---")
+
+    def ndjson():
+        for event in screening_service.stream_screening_events(
+            saved_files, jd, rejected, shortlist_size=shortlist_size, min_similarity=min_similarity
+        ):
+            yield json.dumps(event, default=str) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.post("/screen/jobs/", status_code=status.HTTP_202_ACCEPTED)
+def create_screening_job(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    job_description: Optional[str] = Form(None),
+    job_description_id: Optional[int] = Form(None),
+    shortlist_size: Optional[int] = Form(None),
+    min_similarity: Optional[float] = Form(None),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Async variant of /screen/: saves the uploads, queues a screening job and
+    returns its id immediately. Poll /screen/jobs/{job_id}/ for progress.
+    """
+    jd = resolve_job_description(db, job_description, job_description_id)
+
+    limit_error = screening_service.check_candidate_capacity(db, len(files))
+    if limit_error:
+        # Not 202: nothing was queued
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=limit_error)
+
+    saved_files, rejected = screening_service.save_uploads(files)
+
+    job = screening_jobs.create_job(db, saved_files, jd, rejected)
+    background_tasks.add_task(
+        screening_jobs.run_job, job.id, saved_files, jd_registry.to_artifacts(jd),
+        shortlist_size=shortlist_size, min_similarity=min_similarity
+    )
+
+    return schemas.ScreeningJobCreated(
+        job_id=job.id,
+        status=job.status,
+        total_files=job.total_files,
+        rejected=rejected
+    )
+
+@router.get("/screen/jobs/{job_id}/", response_model=schemas.ScreeningJobResponse)
+def get_screening_job(job_id: str, db: Session = Depends(database.get_db)):
+    job = screening_jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Screening job not found")
+    return job
+
+@router.get("/screening-cache/")
+def get_screening_cache_stats():
+    stats = screening_cache.stats()
+    stats["prompt_version"] = SCREENING_PROMPT_VERSION
+    return stats
+
+@router.delete("/screening-cache/")
+def invalidate_screening_cache(stale_only: bool = True):
+    """
+    Explicit invalidation after a rubric change. By default only drops entries
+    from older prompt versions; stale_only=false clears everything.
+    """
+    keep = SCREENING_PROMPT_VERSION if stale_only else None
+    deleted = screening_cache.invalidate(keep_prompt_version=keep)
+    return {"message": f"Removed {deleted} cached screening result(s).", "deleted": deleted}
+
+@router.get("/search/", response_model=schemas.CandidateSearchResponse)
+def search_candidates(
+    q: str = Query(..., min_length=2, max_length=500),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Semantic search over screened resumes, e.g. ?q=kubernetes and go.
+    Candidates are ranked by their best-matching resume chunk.
+    """
+    return candidate_search.search(db, q, page=page, page_size=page_size)
+
+@router.get("/embedding-cache/")
+def get_embedding_cache_stats():
+    # Hit/miss counters are per worker process; sizes are shared on disk
+    return embedding_cache.stats(embeddings.embedder_tag())
+
+@router.get("/vector-store/")
+def get_vector_store_stats():
+    return vector_retention.stats()
+
+@router.post("/vector-store/compact/")
+def compact_vector_store(retention_days: Optional[float] = None):
+    """
+    Runs a retention pass now (orphaned, legacy and expired chunks).
+    """
+    return vector_retention.purge(retention_days)
+
 @router.post("/candidates/", response_model=schemas.CandidateResponse)
 def create_candidate_manual(
     candidate_in: schemas.CandidateCreate,
@@ -371,6 +358,12 @@ def delete_candidate(
         
     db.delete(candidate)
     db.commit()
+
+    # Drop the candidate's resume chunks from the vector store
+    try:
+        RAGService.delete_candidate_chunks([candidate_id])
+    except Exception as e:
+        print(f"Failed to delete chunks for candidate {candidate_id}: {e}")
     
     return None
 
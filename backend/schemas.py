@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import List, Optional, Any, Dict
 from datetime import datetime
 
@@ -47,6 +47,13 @@ class AssessmentResponse(AssessmentBase):
     score: float
     analysis_data: Optional[Dict[str, Any]] = None
     created_at: datetime
+    questions_status: Optional[str] = None # "generating" while my-status answers 202
+
+    @field_validator("config")
+    @classmethod
+    def hide_generation_lease(cls, config):
+        # config["generation"] is the question-generation lease (owner id, expiry): internal only
+        return {key: value for key, value in config.items() if key != "generation"}
 
     class Config:
         from_attributes = True
@@ -94,6 +101,72 @@ class CandidateResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CandidateSearchSnippet(BaseModel):
+    text: str
+    score: float
+
+class CandidateSearchHit(BaseModel):
+    candidate_id: int
+    name: str
+    email: str
+    role: Optional[str] = None
+    stage: Optional[str] = None
+    status: Optional[str] = None
+    score: float
+    matches: int
+    snippets: List[CandidateSearchSnippet] = []
+
+class CandidateSearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    total: int
+    cached: bool
+    results: List[CandidateSearchHit]
+
+class JobDescriptionCreate(BaseModel):
+    description: str
+    title: Optional[str] = None
+    target_capacity: Optional[int] = None
+
+class JobDescriptionResponse(BaseModel):
+    id: int
+    title: Optional[str] = None
+    normalized_title: Optional[str] = None
+    description: str
+    content_hash: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+    preferred_skills: Optional[List[str]] = None
+    target_capacity: Optional[int] = None
+    uploaded_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ScreeningJobCreated(BaseModel):
+    job_id: str
+    status: str
+    total_files: int
+    rejected: List[Dict[str, Any]] = []
+
+class ScreeningJobResponse(BaseModel):
+    id: str
+    status: str
+    role: Optional[str] = None
+    job_description_id: Optional[int] = None
+    total_files: int
+    processed_files: int
+    failed_files: int
+    files: List[Dict[str, Any]]
+    results: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 class StatsResponse(BaseModel):
     metrics: Dict[str, int]
     funnel: Dict[str, int]
@@ -1,12 +1,11 @@
-import requests
 import json
 import os
 import re
 from dotenv import load_dotenv
+from services import llm_client
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 
 def generate_questions(assessment_type: str, config: dict):
     if not GROQ_API_KEY:
@@ -37,7 +36,7 @@ def generate_interview_questions(config: dict):
     """
     
     try:
-        data = call_llm(prompt)
+        data = call_llm(prompt, site="interview_questions")
         # Ensure we return a list of objects expected by frontend/db structure
         # Or if the interview module expects strings, adapt.
         # usually generated_questions storage is flexible JSON.
@@ -320,7 +319,7 @@ def analyze_error(code: str, error_message: str):
     """
     
     try:
-        data = call_llm(prompt)
+        data = call_llm(prompt, site="error_analysis")
         if isinstance(data, dict):
             return data.get("feedback", "Check your syntax.")
     except Exception as e:
@@ -481,47 +480,42 @@ def clean_starter_code(q: dict):
             
             sc['java'] = f"{sig}\n        // TODO: Implement solution\n        " + (f"return {placeholder};" if placeholder else "") + "\n    }\n}"
 
-def call_llm(prompt, retries=2):
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    data = {
-        "model": "llama-3.1-8b-instant", 
-        "messages": [
-            {"role": "system", "content": "You are a helpful AI that generates assessment questions in strict JSON format."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.7
-    }
-
-    for attempt in range(retries):
+def _parse_llm_content(content):
+    # Robust JSON extraction
+    match = re.search(r'\[.*\]', content, re.DOTALL)
+    if match:
+        return json.loads(match.group(0))
+
+    # Fallback parse
+    return llm_client.parse_json(content.strip())
+
+def _parses(content):
+    try:
+        _parse_llm_content(content)
+        return True
+    except Exception:
+        return False
+
+def call_llm(prompt, retries=2, site="question_generation"):
+    # Pooled connection, backoff, per-site metrics and the response cache (for
+    # sites that opt in, e.g. interview_questions / error_analysis) live in
+    # llm_client. retries is the total number of attempts, as before: an
+    # unparseable answer uses one up and asks again (it is never cached), and
+    # llm_client gets the attempts that are left for transport errors.
+    messages = [
+        {"role": "system", "content": "You are a helpful AI that generates assessment questions in strict JSON format."},
+        {"role": "user", "content": prompt}
+    ]
+    for attempt in range(max(retries, 1)):
         try:
-            response = requests.post(GROQ_API_URL, headers=headers, json=data, timeout=30)
-            if response.status_code != 200:
-                print(f"LLM API Error (Attempt {attempt+1}): {response.status_code} - {response.text}")
-                continue # Retry
+            content = llm_client.chat(site, messages, temperature=0.7,
+                                      max_retries=max(retries - attempt - 1, 0), validate=_parses)
+        except llm_client.LLMError as e:
+            print(f"LLM Call Failed: {e}")
+            return []
 
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Robust JSON extraction
-            import re
-            match = re.search(r'\[.*\]', content, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            
-            # Fallback parse
-            content = re.sub(r'```json', '', content)
-            content = re.sub(r'```', '', content)
-            return json.loads(content.strip())
-            
+        try:
+            return _parse_llm_content(content)
         except Exception as e:
-            print(f"LLM Call Failed (Attempt {attempt+1}): {e}")
-            if attempt == retries - 1:
-                return [] # Give up after last retry
-            import time
-            time.sleep(1) # Wait 1s before retry
-            
+            print(f"LLM Response Parse Failed (Attempt {attempt+1}): {e}")
     return []
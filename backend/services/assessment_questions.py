@@ -0,0 +1,163 @@
+import os
+import time
+import uuid
+import threading
+import models
+from services import ai_generator
+
+# Single-flight lazy question generation per assessment.
+# The first request for an assessment without questions takes a lease in
+# config["generation"] under SELECT ... FOR UPDATE, so only one request across
+# all gunicorn workers calls the LLM; the row lock is held only while the lease
+# is read/written, never during the Groq call. Concurrent requests wait for the
+# owner to finish (polling the row; same-worker waiters are woken directly) and
+# report "generating" if it is still running after QUESTION_WAIT_SECONDS.
+# A lease that outlives QUESTION_LEASE_SECONDS (worker killed mid-generation)
+# is taken over by the next request.
+QUESTION_LEASE_SECONDS = float(os.getenv("QUESTION_LEASE_SECONDS", 180))
+QUESTION_WAIT_SECONDS = float(os.getenv("QUESTION_WAIT_SECONDS", 25))
+POLL_SECONDS = 1.0
+
+GENERATING = "generating"
+
+_local_events = {} # assessment id -> threading.Event set when this worker's generation ends
+_local_lock = threading.Lock()
+
+def _needs_questions(assessment) -> bool:
+    # Interview rounds use VAPI dynamic generation
+    return assessment.type != "interview" and not (assessment.config or {}).get("generated_questions")
+
+def _live_lease(config: dict, now: float):
+    lease = (config or {}).get("generation") or {}
+    if lease.get("status") == GENERATING and lease.get("expires_at", 0) > now:
+        return lease
+    return None
+
+def _locked(db, assessment_id):
+    # populate_existing: re-read the row instead of trusting the identity map
+    return db.query(models.Assessment).filter(
+        models.Assessment.id == assessment_id
+    ).populate_existing().with_for_update().first()
+
+def _claim(db, assessment_id):
+    """
+    -> (assessment, owner). owner is the new lease id when this request must
+    generate, else None (questions present or another request holds the lease).
+    """
+    assessment = _locked(db, assessment_id)
+    if not assessment or not _needs_questions(assessment):
+        db.commit()
+        return assessment, None
+    now = time.time()
+    if _live_lease(assessment.config, now):
+        db.commit()
+        return assessment, None
+
+    owner = uuid.uuid4().hex
+    config = dict(assessment.config or {})
+    config["generation"] = {"status": GENERATING, "owner": owner, "started_at": now, "expires_at": now + QUESTION_LEASE_SECONDS}
+    assessment.config = config
+    db.commit()
+    return assessment, owner
+
+def _finish(db, assessment_id, owner, questions, error=None):
+    """
+    Stores the questions (or the failure) if our lease is still the current one.
+    """
+    assessment = _locked(db, assessment_id)
+    if not assessment:
+        db.commit()
+        return None
+    config = dict(assessment.config or {})
+    lease = config.get("generation") or {}
+    if config.get("generated_questions") or lease.get("owner") != owner:
+        # Lease expired and another request took over (or already finished): keep its result
+        print(f"DEBUG: Discarding questions for Assessment {assessment_id}, lease {owner[:8]} was superseded")
+        db.commit()
+        return assessment
+
+    if questions:
+        config["generated_questions"] = questions
+        config["generation"] = {"status": "done", "finished_at": time.time(), "seconds": round(time.time() - lease["started_at"], 2)}
+    else:
+        # No lease left behind, so the next request retries
+        config["generation"] = {"status": "failed", "finished_at": time.time(), "error": error or "no questions returned"}
+    assessment.config = config
+    db.commit()
+    db.refresh(assessment)
+    return assessment
+
+def _generate(db, assessment, owner):
+    assessment_id = assessment.id
+    event = threading.Event()
+    with _local_lock:
+        _local_events[assessment_id] = event
+    assessment_type, config = assessment.type, dict(assessment.config or {})
+    db.commit() # don't hold a transaction open for the length of the LLM call
+    print(f"Generating questions for Assessment {assessment_id} ({assessment_type}), lease {owner[:8]}...")
+    questions, error = [], None
+    try:
+        questions = ai_generator.generate_questions(assessment_type, config)
+    except Exception as e:
+        error = str(e)
+        print(f"ERROR: Question generation for Assessment {assessment_id} failed: {e}")
+    finally:
+        try:
+            assessment = _finish(db, assessment_id, owner, questions, error)
+        finally:
+            with _local_lock:
+                _local_events.pop(assessment_id, None)
+            event.set()
+
+    if questions:
+        print(f"Generated {len(questions)} questions successfully.")
+    else:
+        print("Failed to generate questions from AI service.")
+    return assessment
+
+def _wait(db, assessment_id, timeout):
+    """
+    Waits for another request's generation. -> (assessment, still_generating)
+    """
+    deadline = time.time() + timeout
+    while True:
+        with _local_lock:
+            event = _local_events.get(assessment_id)
+        remaining = deadline - time.time()
+        if event:
+            event.wait(min(POLL_SECONDS, max(remaining, 0)))
+        elif remaining > 0:
+            time.sleep(min(POLL_SECONDS, remaining))
+
+        # End the transaction first: under REPEATABLE READ a reused snapshot never sees the owner's commit
+        db.rollback()
+        assessment = db.query(models.Assessment).filter(
+            models.Assessment.id == assessment_id
+        ).populate_existing().first()
+        if not assessment or not _needs_questions(assessment):
+            return assessment, False
+        live = _live_lease(assessment.config, time.time())
+        if not live:
+            # Owner failed or its lease lapsed: report what is stored, the next request retries
+            return assessment, False
+        if time.time() >= deadline:
+            return assessment, True
+
+def ensure_questions(db, assessment, wait_seconds: float = None):
+    """
+    Makes sure the assessment has generated questions, generating them at most
+    once at a time across workers. -> (assessment, still_generating).
+    """
+    if not _needs_questions(assessment):
+        return assessment, False
+    assessment_id = assessment.id
+    wait_seconds = QUESTION_WAIT_SECONDS if wait_seconds is None else wait_seconds
+
+    assessment, owner = _claim(db, assessment_id)
+    if owner:
+        return _generate(db, assessment, owner), False
+    if not assessment or not _needs_questions(assessment):
+        return assessment, False
+
+    print(f"DEBUG: Questions for Assessment {assessment_id} already being generated, waiting up to {wait_seconds:.0f}s")
+    return _wait(db, assessment_id, wait_seconds)
@@ -0,0 +1,233 @@
+import os
+import re
+import fcntl
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from pathlib import Path
+import numpy as np
+from services import embeddings
+
+# Whole-pool similarity index: one mean-pooled, L2-normalized resume vector per
+# candidate, so "rank every candidate against this JD" is a single matrix-vector
+# product plus a partial sort instead of one filtered Chroma query per resume.
+#
+# Same layout as the embedding cache: vectors are appended to a float32 file
+# (read through np.memmap) and a SQLite index maps candidate_id -> row. Updates
+# append a new row; deletes drop the mapping; compact() rewrites live rows.
+# Kept in sync from RAGService.link_candidates / delete_candidate_chunks.
+CANDIDATE_INDEX_DIR = Path(os.getenv(
+    "CANDIDATE_INDEX_DIR", Path(__file__).resolve().parent.parent / "candidate_index"
+))
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+class CandidateIndex:
+    def __init__(self, tag: str, directory: Path = None):
+        directory = Path(directory or CANDIDATE_INDEX_DIR)
+        safe = re.sub(r"[^A-Za-z0-9._-]+", "_", tag)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = directory / f"{safe}.f32"
+        self.index_path = directory / f"{safe}.sqlite"
+        self.lock_path = directory / f"{safe}.lock"
+        self.vectors_path.touch(exist_ok=True)
+        self._snapshot = None # (generation, ids, matrix)
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS candidates (candidate_id INTEGER PRIMARY KEY, row INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _file_lock(self, exclusive=False):
+        # Appenders share the lock; compact() takes it exclusively so rows are
+        # never renumbered while another worker is between reserve and publish
+        with open(self.lock_path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _meta(self, conn, name, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, conn, name, value):
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def upsert(self, vectors: dict):
+        """
+        vectors: {candidate_id: vector}. Vectors are normalized before storing.
+        """
+        if not vectors:
+            return
+        ids = [int(c) for c in vectors]
+        matrix = np.asarray([vectors[c] for c in vectors], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.ascontiguousarray(matrix / np.where(norms == 0, 1.0, norms))
+        dim = matrix.shape[1]
+
+        with self._file_lock(), closing(self._connect()) as conn:
+            # Reserve rows, write vectors, then publish the mapping (readers never see a torn row)
+            conn.execute("BEGIN IMMEDIATE")
+            stored_dim = self._meta(conn, "dim")
+            if stored_dim is not None and stored_dim != dim:
+                conn.execute("ROLLBACK")
+                raise ValueError(f"candidate index dim {stored_dim} != {dim}")
+            next_row = self._meta(conn, "next_row", 0)
+            self._set_meta(conn, "dim", dim)
+            self._set_meta(conn, "next_row", next_row + len(ids))
+            conn.execute("COMMIT")
+
+            fd = os.open(self.vectors_path, os.O_WRONLY)
+            try:
+                os.pwrite(fd, matrix.tobytes(), next_row * dim * 4)
+            finally:
+                os.close(fd)
+
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO candidates (candidate_id, row) VALUES (?, ?)",
+                [(c, next_row + i) for i, c in enumerate(ids)]
+            )
+            self._set_meta(conn, "generation", self._meta(conn, "generation", 0) + 1)
+            conn.execute("COMMIT")
+
+    def remove(self, candidate_ids):
+        ids = [int(c) for c in candidate_ids]
+        if not ids:
+            return
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM candidates WHERE candidate_id = ?", [(c,) for c in ids])
+            self._set_meta(conn, "generation", self._meta(conn, "generation", 0) + 1)
+            conn.execute("COMMIT")
+
+    def retain(self, live_ids):
+        """
+        Drops every candidate not in live_ids (e.g. deleted outside the API).
+        """
+        live = set(int(c) for c in live_ids)
+        with closing(self._connect()) as conn:
+            stored = [r[0] for r in conn.execute("SELECT candidate_id FROM candidates").fetchall()]
+        stale = [c for c in stored if c not in live]
+        self.remove(stale)
+        return len(stale)
+
+    def generation(self) -> int:
+        # Bumped by every upsert/remove/compact, by any worker
+        with closing(self._connect()) as conn:
+            return self._meta(conn, "generation", 0)
+
+    def _load(self):
+        """
+        Dense (ids, matrix) snapshot of the live rows, rebuilt only when the
+        on-disk generation changes (another worker may have written).
+        """
+        with closing(self._connect()) as conn:
+            generation = self._meta(conn, "generation", 0)
+        with self._lock:
+            if self._snapshot and self._snapshot[0] == generation:
+                return self._snapshot[1], self._snapshot[2]
+
+        # Shared file lock: compact() cannot replace the file and renumber rows
+        # between reading the mapping and reading the vectors. One read
+        # transaction, so generation, dim and the mapping agree.
+        with self._file_lock(), closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            try:
+                generation = self._meta(conn, "generation", 0)
+                dim = self._meta(conn, "dim")
+                pairs = conn.execute("SELECT candidate_id, row FROM candidates ORDER BY row").fetchall()
+            finally:
+                conn.execute("COMMIT")
+
+            if not pairs or dim is None:
+                ids, matrix = np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+            else:
+                ids = np.asarray([p[0] for p in pairs], dtype=np.int64)
+                rows = np.asarray([p[1] for p in pairs], dtype=np.int64)
+                total = os.path.getsize(self.vectors_path) // (4 * dim)
+                stored = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(total, dim))
+                matrix = np.ascontiguousarray(stored[rows])
+                del stored
+        with self._lock:
+            # Keep the newest snapshot if another thread loaded a later generation meanwhile
+            if not self._snapshot or self._snapshot[0] <= generation:
+                self._snapshot = (generation, ids, matrix)
+        return ids, matrix
+
+    def rank(self, query_vector, top_k: int = 50, candidate_ids=None):
+        """
+        -> [(candidate_id, cosine)] best first, over the whole pool (or only
+        candidate_ids). One matrix-vector product + argpartition.
+        """
+        ids, matrix = self._load()
+        if not len(ids):
+            return []
+        if candidate_ids is not None:
+            mask = np.isin(ids, np.asarray(list(candidate_ids), dtype=np.int64))
+            ids, matrix = ids[mask], matrix[mask]
+            if not len(ids):
+                return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), round(float(scores[i]), 4)) for i in top]
+
+    def compact(self):
+        """
+        Rewrites the vector file with live rows only. Returns rows reclaimed.
+        Holds the exclusive file lock and the SQLite write lock for the rewrite.
+        """
+        with self._file_lock(exclusive=True), closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                dim = self._meta(conn, "dim")
+                next_row = self._meta(conn, "next_row", 0)
+                pairs = conn.execute("SELECT candidate_id, row FROM candidates ORDER BY row").fetchall()
+                if dim is None or next_row == len(pairs):
+                    conn.execute("ROLLBACK")
+                    return 0
+                stored = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(next_row, dim))
+                live = np.ascontiguousarray(stored[[p[1] for p in pairs]]) if pairs else np.zeros((0, dim), np.float32)
+                del stored
+                tmp = self.vectors_path.with_suffix(".f32.tmp")
+                live.tofile(tmp)
+                os.replace(tmp, self.vectors_path)
+                conn.executemany(
+                    "UPDATE candidates SET row = ? WHERE candidate_id = ?",
+                    [(i, p[0]) for i, p in enumerate(pairs)]
+                )
+                self._set_meta(conn, "next_row", len(pairs))
+                self._set_meta(conn, "generation", self._meta(conn, "generation", 0) + 1)
+                conn.execute("COMMIT")
+                return next_row - len(pairs)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            return {
+                "candidates": count,
+                "rows": self._meta(conn, "next_row", 0),
+                "dim": self._meta(conn, "dim"),
+                "bytes": os.path.getsize(self.vectors_path)
+            }
+
+def get_index(tag: str = None):
+    tag = tag or embeddings.embedder_tag()
+    with _indexes_lock:
+        if tag not in _indexes:
+            _indexes[tag] = CandidateIndex(tag)
+        return _indexes[tag]
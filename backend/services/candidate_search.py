@@ -0,0 +1,134 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+import models
+from services import embeddings, candidate_index
+from services.rag_service import get_collection
+
+# Semantic candidate search over the resume_chunks collection.
+# One top-k HNSW query over chunks linked to candidates, aggregated per
+# candidate (best chunk similarity, then number of matching chunks).
+# Rankings are cached per normalized query for SEARCH_CACHE_TTL seconds, keyed
+# on the candidate index generation (shared by every worker, bumped whenever
+# candidates are linked, re-screened or deleted), so a change anywhere makes
+# every worker's cached rankings miss; pagination slices the cached ranking.
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", 200))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 120))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 256))
+SNIPPETS_PER_CANDIDATE = 3
+SNIPPET_CHARS = 300
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and time.time() - entry[0] < SEARCH_CACHE_TTL:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry[1]
+        _cache.pop(key, None)
+        _stats["misses"] += 1
+        return None
+
+def _cache_put(key, ranking):
+    with _cache_lock:
+        _cache[key] = (time.time(), ranking)
+        _cache.move_to_end(key)
+        while len(_cache) > SEARCH_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+def _rank(query: str, top_k: int):
+    """
+    -> [{"candidate_id", "score", "matches", "snippets"}] best first.
+    """
+    vector = embeddings.encode([query])[0]
+    results = get_collection().query(
+        query_embeddings=[vector],
+        n_results=top_k,
+        where={"$and": [
+            {"candidate_id": {"$gte": 0}}, # Only chunks linked to a saved candidate
+            {"embedder": embeddings.embedder_tag()} # Same vector space as the query
+        ]},
+        include=["documents", "metadatas", "distances"]
+    )
+    if not results["ids"] or not results["ids"][0]:
+        return []
+
+    per_candidate = {}
+    for doc, meta, distance in zip(results["documents"][0], results["metadatas"][0], results["distances"][0]):
+        # Chroma's default space is squared L2; MiniLM vectors are unit length
+        similarity = max(0.0, 1.0 - distance / 2.0)
+        entry = per_candidate.setdefault(meta["candidate_id"], {
+            "candidate_id": meta["candidate_id"], "score": 0.0, "matches": 0, "snippets": []
+        })
+        entry["score"] = max(entry["score"], similarity)
+        entry["matches"] += 1
+        if len(entry["snippets"]) < SNIPPETS_PER_CANDIDATE:
+            entry["snippets"].append({"text": doc[:SNIPPET_CHARS], "score": round(similarity, 4)})
+
+    ranking = sorted(per_candidate.values(), key=lambda e: (e["score"], e["matches"]), reverse=True)
+    for entry in ranking:
+        entry["score"] = round(entry["score"], 4)
+    return ranking
+
+def search(db, query: str, page: int = 1, page_size: int = 20, top_k: int = SEARCH_TOP_K):
+    """
+    Returns one page of candidates matching a free-text query, with the
+    matched snippets. Candidates deleted since their chunks were indexed are
+    dropped before paging, so total only counts existing ones.
+    """
+    tag = embeddings.embedder_tag()
+    key = (normalize_query(query), top_k, tag, candidate_index.get_index(tag).generation())
+    ranking = _cache_get(key)
+    cached = ranking is not None
+    if not cached:
+        ranking = _rank(normalize_query(query), top_k)
+        _cache_put(key, ranking)
+
+    ranked_ids = [entry["candidate_id"] for entry in ranking]
+    existing = {
+        row[0] for row in db.query(models.Candidate.id).filter(models.Candidate.id.in_(ranked_ids)).all()
+    } if ranked_ids else set()
+    ranking = [entry for entry in ranking if entry["candidate_id"] in existing]
+
+    start = (page - 1) * page_size
+    window = ranking[start:start + page_size]
+    ids = [entry["candidate_id"] for entry in window]
+    candidates = {
+        c.id: c for c in db.query(models.Candidate).filter(models.Candidate.id.in_(ids)).all()
+    } if ids else {}
+
+    results = []
+    for entry in window:
+        candidate = candidates.get(entry["candidate_id"])
+        if candidate is None:
+            continue
+        results.append({
+            **entry,
+            "name": candidate.name,
+            "email": candidate.email,
+            "role": candidate.role,
+            "stage": candidate.stage,
+            "status": candidate.status
+        })
+
+    return {
+        "query": query,
+        "page": page,
+        "page_size": page_size,
+        "total": len(ranking),
+        "cached": cached,
+        "results": results
+    }
+
+def stats():
+    with _cache_lock:
+        return {"entries": len(_cache), "ttl_seconds": SEARCH_CACHE_TTL, **_stats}
@@ -0,0 +1,154 @@
+import os
+import re
+
+# Section-aware resume chunker.
+# Splits on resume structure (section headings, bullet items, paragraphs) and
+# packs whole blocks into chunks under a token budget sized for MiniLM's
+# 256-token window, falling back to sentence and then word boundaries for
+# oversized blocks. Blocks are labelled with their section heading wherever a
+# section starts or a chunk opens, so every chunk carries its own context. Bump CHUNKER_VERSION when the output changes so
+# stored chunks are rebuilt on the next screening.
+CHUNKER_VERSION = "sections-v2"
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", 200)) # headroom under 256 for estimate error
+
+SECTION_WORDS = {
+    "summary", "profile", "objective", "about", "experience", "work experience", "professional experience",
+    "employment", "employment history", "education", "skills", "technical skills", "key skills", "projects",
+    "certifications", "certificates", "achievements", "awards", "publications", "languages", "interests",
+    "internships", "responsibilities", "contact", "personal details", "training", "volunteering"
+}
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪◦‣●○■►–]|\d{1,2}[.)])\s+")
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap WordPiece estimate: one token per punctuation mark, and long words
+    split roughly every 8 characters. Avoids loading the tokenizer here.
+    """
+    return sum(1 + len(tok) // 8 for tok in TOKEN_RE.findall(text))
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > 40 or BULLET_RE.match(line):
+        return False
+    if stripped.lower() in SECTION_WORDS:
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    # Short ALL-CAPS line, or a short line ending with ':'
+    return (len(letters) >= 3 and all(c.isupper() for c in letters) and len(stripped.split()) <= 4) \
+        or (line.strip().endswith(":") and len(stripped.split()) <= 4)
+
+def _iter_blocks(text: str):
+    """
+    Yields (heading, block_text): one block per bullet item or paragraph.
+    A heading-like line with no body before the next heading (a name line
+    such as "JOHN DOE" above "EXPERIENCE") is yielded as text, not dropped.
+    """
+    heading = ""
+    outer = "" # heading in effect before the current one
+    empty = False # current heading has no block yet
+    block = []
+
+    def flush():
+        joined = " ".join(part.strip() for part in block if part.strip())
+        block.clear()
+        return joined
+
+    for line in text.splitlines():
+        if not line.strip():
+            if block:
+                yield heading, flush()
+            continue
+        if _is_heading(line):
+            if block:
+                yield heading, flush()
+            if empty:
+                yield outer, heading
+            else:
+                outer = heading
+            heading, empty = line.strip().rstrip(":").strip(), True
+            continue
+        empty = False
+        if BULLET_RE.match(line):
+            if block:
+                yield heading, flush()
+            block.append(BULLET_RE.sub("- ", line, count=1))
+            continue
+        # Continuation of a bullet or paragraph
+        block.append(line)
+    if block:
+        yield heading, flush()
+    elif empty:
+        yield outer, heading
+
+def _split_words(sentence: str, budget: int):
+    # Words, with any single "word" longer than the budget (e.g. PDF text with
+    # no spaces) cut into budget-sized character runs
+    size = max((budget - 1) * 8, 8)
+    for word in sentence.split():
+        for start in range(0, len(word), size):
+            yield word[start:start + size]
+
+def _split_oversized(block: str, budget: int):
+    """
+    Splits a block that exceeds the budget on sentence boundaries, and any
+    sentence that still exceeds it on word boundaries. Always makes progress.
+    """
+    piece, piece_tokens = [], 0
+    for sentence in SENTENCE_RE.split(block):
+        tokens = estimate_tokens(sentence)
+        if tokens > budget:
+            if piece:
+                yield " ".join(piece)
+                piece, piece_tokens = [], 0
+            words, count = [], 0
+            for word in _split_words(sentence, budget):
+                cost = estimate_tokens(word)
+                if words and count + cost > budget:
+                    yield " ".join(words)
+                    words, count = [], 0
+                words.append(word)
+                count += cost
+            if words:
+                yield " ".join(words)
+            continue
+        if piece and piece_tokens + tokens > budget:
+            yield " ".join(piece)
+            piece, piece_tokens = [], 0
+        piece.append(sentence)
+        piece_tokens += tokens
+    if piece:
+        yield " ".join(piece)
+
+def iter_chunks(text: str, token_budget: int = CHUNK_TOKEN_BUDGET):
+    """
+    Generator over resume chunks. Whole blocks are packed greedily up to
+    token_budget; a block opening a section (or opening a chunk) is labelled
+    "HEADING: ...", so short sections share a chunk without losing context.
+    """
+    current, current_tokens, current_heading = [], 0, None
+
+    for heading, block in _iter_blocks(text):
+        for piece in _fit(block, token_budget - _label_tokens(heading)):
+            labelled = f"{heading}: {piece}" if heading else piece
+            entry = piece if current and current_heading == heading else labelled
+            tokens = estimate_tokens(entry)
+            if current and current_tokens + tokens > token_budget:
+                yield "\n".join(current)
+                current, current_tokens = [], 0
+                entry, tokens = labelled, estimate_tokens(labelled)
+            current.append(entry)
+            current_tokens += tokens
+            current_heading = heading
+    if current:
+        yield "\n".join(current)
+
+def _label_tokens(heading: str) -> int:
+    return estimate_tokens(heading) + 1 if heading else 0
+
+def _fit(block: str, budget: int):
+    budget = max(budget, 16)
+    if estimate_tokens(block) <= budget:
+        return [block]
+    return list(_split_oversized(block, budget))
@@ -0,0 +1,222 @@
+import os
+import re
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+import numpy as np
+
+# On-disk embedding cache: sha256(embedder tag + normalized chunk text) -> float32 vector.
+# Vectors live in one append-only float32 file per embedder (read through np.memmap),
+# and a small SQLite index maps key -> row. Both are safe to share between gunicorn
+# workers: rows are reserved in a SQLite transaction and written with pwrite before
+# their keys become visible, so a reader never sees a half-written vector.
+# When EMBEDDING_CACHE_MAX_ROWS is reached the cache starts a new epoch: the
+# entries are dropped and rows restart in a fresh vector file (the file from two
+# epochs back is deleted), so old vectors are evicted instead of new ones refused.
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "true").lower() not in ("0", "false", "no")
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", 500000))
+EMBEDDING_CACHE_DIR = Path(os.getenv(
+    "EMBEDDING_CACHE_DIR", Path(__file__).resolve().parent.parent / "embedding_cache"
+))
+SQLITE_MAX_VARS = 900
+
+_stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+_stats_lock = threading.Lock()
+_stores = {}
+_stores_lock = threading.Lock()
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+def make_key(tag: str, text: str) -> str:
+    return hashlib.sha256(f"{tag}\0{normalize(text)}".encode("utf-8")).hexdigest()
+
+class _Store:
+    def __init__(self, tag: str):
+        self.safe = re.sub(r"[^A-Za-z0-9._-]+", "_", tag)
+        EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.index_path = EMBEDDING_CACHE_DIR / f"{self.safe}.sqlite"
+        self._map = None # (epoch, memmap)
+        self._map_lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self.vectors_path(self._meta(conn, "epoch") or 0).touch(exist_ok=True)
+
+    def vectors_path(self, epoch: int) -> Path:
+        return EMBEDDING_CACHE_DIR / (f"{self.safe}.f32" if epoch == 0 else f"{self.safe}.{epoch}.f32")
+
+    def _connect(self):
+        return sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None)
+
+    def _meta(self, conn, name):
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn, name, value):
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def _rows(self, epoch, dim, rows):
+        # Remap when the file has grown past the current mapping or the epoch changed
+        needed = (max(rows) + 1) * dim
+        with self._map_lock:
+            if self._map is None or self._map[0] != epoch or self._map[1].shape[0] < needed:
+                path = self.vectors_path(epoch)
+                self._map = (epoch, np.memmap(path, dtype=np.float32, mode="r", shape=(os.path.getsize(path) // 4,)))
+            flat = self._map[1]
+        return np.stack([flat[r * dim:(r + 1) * dim] for r in rows])
+
+    def get_many(self, keys):
+        found = {}
+        with closing(self._connect()) as conn:
+            # One read transaction: the rows belong to the epoch read with them
+            conn.execute("BEGIN")
+            try:
+                dim = self._meta(conn, "dim")
+                epoch = self._meta(conn, "epoch") or 0
+                if dim is None:
+                    return found
+                for start in range(0, len(keys), SQLITE_MAX_VARS):
+                    part = keys[start:start + SQLITE_MAX_VARS]
+                    marks = ",".join("?" * len(part))
+                    found.update(conn.execute(f"SELECT key, row FROM entries WHERE key IN ({marks})", part).fetchall())
+            finally:
+                conn.execute("COMMIT")
+        if not found:
+            return {}
+        keys_found = list(found)
+        vectors = self._rows(epoch, dim, [found[k] for k in keys_found])
+        return dict(zip(keys_found, vectors))
+
+    def _rotate(self, conn, epoch):
+        """
+        Starts epoch + 1 (inside the caller's write transaction): drops every
+        entry and restarts rows in a new file. Returns (new epoch, entries evicted).
+        """
+        evicted = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        conn.execute("DELETE FROM entries")
+        epoch += 1
+        self._set_meta(conn, "epoch", epoch)
+        self._set_meta(conn, "next_row", 0)
+        path = self.vectors_path(epoch)
+        path.unlink(missing_ok=True)
+        path.touch()
+        # A reader may still be on the previous epoch's file; the one before is unused
+        if epoch >= 2:
+            self.vectors_path(epoch - 2).unlink(missing_ok=True)
+        return epoch, evicted
+
+    def put_many(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        if len(keys) > EMBEDDING_CACHE_MAX_ROWS:
+            return 0
+        conn = self._connect()
+        try:
+            # Reserve rows (short write lock), then write vectors, then publish keys
+            conn.execute("BEGIN IMMEDIATE")
+            stored_dim = self._meta(conn, "dim")
+            if stored_dim is not None and stored_dim != dim:
+                conn.execute("ROLLBACK")
+                raise ValueError(f"embedding cache dim {stored_dim} != {dim}")
+            epoch = self._meta(conn, "epoch") or 0
+            next_row = self._meta(conn, "next_row") or 0
+            if next_row + len(keys) > EMBEDDING_CACHE_MAX_ROWS:
+                epoch, evicted = self._rotate(conn, epoch)
+                next_row = 0
+                _count("evicted", evicted)
+                print(f"Embedding cache full ({EMBEDDING_CACHE_MAX_ROWS} rows): evicted {evicted} entries, epoch {epoch}")
+            self._set_meta(conn, "dim", dim)
+            self._set_meta(conn, "next_row", next_row + len(keys))
+            conn.execute("COMMIT")
+
+            fd = os.open(self.vectors_path(epoch), os.O_WRONLY)
+            try:
+                os.pwrite(fd, vectors.tobytes(), next_row * dim * 4)
+            finally:
+                os.close(fd)
+
+            conn.execute("BEGIN IMMEDIATE")
+            if (self._meta(conn, "epoch") or 0) != epoch:
+                # Another worker rotated meanwhile: our rows are in the old file
+                conn.execute("ROLLBACK")
+                return 0
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, row) VALUES (?, ?)",
+                [(k, next_row + i) for i, k in enumerate(keys)]
+            )
+            conn.execute("COMMIT")
+            return len(keys)
+        finally:
+            conn.close()
+
+    def size(self):
+        with closing(self._connect()) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            rows = self._meta(conn, "next_row") or 0
+            epoch = self._meta(conn, "epoch") or 0
+        return {"entries": entries, "rows": rows, "epoch": epoch, "bytes": os.path.getsize(self.vectors_path(epoch))}
+
+def _store(tag: str):
+    with _stores_lock:
+        if tag not in _stores:
+            _stores[tag] = _Store(tag)
+        return _stores[tag]
+
+def _count(name, n):
+    with _stats_lock:
+        _stats[name] += n
+
+def cached_encode(tag: str, texts, encode_fn):
+    """
+    Returns vectors (list of lists) for texts, encoding only cache misses via
+    encode_fn(list_of_texts). Duplicate texts within one call are encoded once.
+    Any cache error degrades to a plain encode.
+    """
+    if not EMBEDDING_CACHE_ENABLED:
+        return encode_fn(texts)
+    try:
+        store = _store(tag)
+        keys = [make_key(tag, t) for t in texts]
+        found = store.get_many(list(set(keys)))
+    except Exception as e:
+        print(f"Embedding cache unavailable: {e}")
+        return encode_fn(texts)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    # Per text: a repeat of a missing text within the call is still a miss
+    hits = sum(1 for key in keys if key in found)
+    _count("hits", hits)
+    _count("misses", len(keys) - hits)
+
+    if missing:
+        miss_keys = list(missing)
+        vectors = np.asarray(encode_fn([missing[k] for k in miss_keys]), dtype=np.float32)
+        found.update(zip(miss_keys, vectors))
+        try:
+            _count("stored", store.put_many(miss_keys, vectors))
+        except Exception as e:
+            print(f"Embedding cache write failed: {e}")
+
+    return [np.asarray(found[k], dtype=np.float32).tolist() for k in keys]
+
+def stats(tag: str = None):
+    with _stats_lock:
+        counters = dict(_stats)
+    lookups = counters["hits"] + counters["misses"]
+    result = {
+        "enabled": EMBEDDING_CACHE_ENABLED,
+        "max_rows": EMBEDDING_CACHE_MAX_ROWS,
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0
+    }
+    if tag and EMBEDDING_CACHE_ENABLED:
+        result["tag"] = tag
+        result.update(_store(tag).size())
+    return result
@@ -0,0 +1,196 @@
+"""
+Shared embedding server: one process owns the model, API workers send
+encode requests over a Unix socket (set EMBEDDING_SERVER_SOCKET in their env).
+
+Requests arriving within EMBED_SERVER_MAX_WAIT_MS of each other are merged
+into one model.encode call (up to EMBED_SERVER_MAX_BATCH texts), so concurrent
+screening batches from different gunicorn workers share forward passes
+instead of contending for the same cores with four model copies.
+
+Run:
+    python -m services.embedding_server --socket /tmp/hiringai-embed.sock
+
+Wire format (both directions): 4-byte big-endian header length, JSON header,
+then an optional binary body. Request header {"texts": [...]}; response
+header {"n": rows, "dim": cols} followed by rows*cols float32 values, or
+{"error": "..."}.
+"""
+import os
+import json
+import queue
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+import time
+import numpy as np
+
+EMBED_SERVER_MAX_WAIT_MS = float(os.getenv("EMBED_SERVER_MAX_WAIT_MS", 5))
+EMBED_SERVER_MAX_BATCH = int(os.getenv("EMBED_SERVER_MAX_BATCH", 256))
+DEFAULT_SOCKET = "/tmp/hiringai-embed.sock"
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        part = sock.recv(size - len(buf))
+        if not part:
+            raise ConnectionError("embedding server connection closed")
+        buf.extend(part)
+    return bytes(buf)
+
+def send_message(sock, header: dict, body: bytes = b""):
+    payload = json.dumps(header).encode("utf-8")
+    sock.sendall(struct.pack(">I", len(payload)) + payload + body)
+
+def recv_header(sock):
+    (size,) = struct.unpack(">I", _recv_exact(sock, 4))
+    return json.loads(_recv_exact(sock, size))
+
+def encode_remote(socket_path: str, texts, timeout: float = 120.0):
+    """
+    Client side: returns a float32 array of shape (len(texts), dim).
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        send_message(sock, {"texts": list(texts)})
+        header = recv_header(sock)
+        if "error" in header:
+            raise RuntimeError(f"embedding server: {header['error']}")
+        n, dim = header["n"], header["dim"]
+        body = _recv_exact(sock, n * dim * 4)
+    return np.frombuffer(body, dtype=np.float32).reshape(n, dim)
+
+def server_stats(socket_path: str):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        send_message(sock, {"stats": True})
+        return recv_header(sock)["stats"]
+
+class _Request:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Single consumer thread: waits for the first request, then keeps collecting
+    for up to max_wait_ms (or until max_batch texts) and encodes them together.
+    """
+    def __init__(self, encode_fn, max_wait_ms=EMBED_SERVER_MAX_WAIT_MS, max_batch=EMBED_SERVER_MAX_BATCH):
+        self.encode_fn = encode_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "encode_seconds": 0.0}
+        threading.Thread(target=self._loop, name="embed-batcher", daemon=True).start()
+
+    def submit(self, texts):
+        req = _Request(texts)
+        self.queue.put(req)
+        req.done.wait()
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def _loop(self):
+        while True:
+            batch = [self.queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(req)
+                size += len(req.texts)
+            self._run(batch)
+
+    def _run(self, batch):
+        texts = [t for req in batch for t in req.texts]
+        t0 = time.time()
+        try:
+            vectors = np.asarray(self.encode_fn(texts), dtype=np.float32) if texts else np.zeros((0, 0), np.float32)
+        except Exception as e:
+            for req in batch:
+                req.error = e
+                req.done.set()
+            return
+        self.stats["requests"] += len(batch)
+        self.stats["texts"] += len(texts)
+        self.stats["batches"] += 1
+        self.stats["encode_seconds"] += time.time() - t0
+
+        start = 0
+        for req in batch:
+            req.result = vectors[start:start + len(req.texts)]
+            start += len(req.texts)
+            req.done.set()
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header = recv_header(self.request)
+            if header.get("stats"):
+                send_message(self.request, {"stats": self.server.batcher.stats})
+                return
+            vectors = self.server.batcher.submit(header["texts"])
+            n = len(header["texts"])
+            dim = vectors.shape[1] if n else 0
+            send_message(self.request, {"n": n, "dim": dim}, np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        except ConnectionError:
+            pass
+        except Exception as e:
+            print(f"Embedding server request failed: {e}")
+            try:
+                send_message(self.request, {"error": str(e)})
+            except OSError:
+                pass
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # Unix sockets refuse (EAGAIN) instead of queueing past the listen backlog
+    request_queue_size = 256
+
+    def __init__(self, socket_path, batcher):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        self.batcher = batcher
+
+def serve(socket_path=DEFAULT_SOCKET, max_wait_ms=EMBED_SERVER_MAX_WAIT_MS, max_batch=EMBED_SERVER_MAX_BATCH):
+    # Import here so clients importing the wire helpers never load the model
+    from services import embeddings
+
+    embeddings.local_encode(["warm up"])
+    batcher = MicroBatcher(embeddings.local_encode, max_wait_ms=max_wait_ms, max_batch=max_batch)
+    server = EmbeddingServer(socket_path, batcher)
+    print(f"Embedding server ({embeddings.EMBEDDING_MODEL_NAME}) listening on {socket_path} "
+          f"(window {max_wait_ms}ms, max batch {max_batch})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", default=os.getenv("EMBEDDING_SERVER_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--max-wait-ms", type=float, default=EMBED_SERVER_MAX_WAIT_MS)
+    parser.add_argument("--max-batch", type=int, default=EMBED_SERVER_MAX_BATCH)
+    args = parser.parse_args()
+    serve(args.socket, args.max_wait_ms, args.max_batch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import os
+import time
+import threading
+import importlib.util
+import numpy as np
+from services import embedding_cache
+
+# Lazily loaded sentence-transformer used for resume chunks and JD embeddings.
+# Importing this module is cheap: torch / sentence_transformers are only
+# imported on first use (or by the background warm-up started at app startup),
+# so workers that never screen resumes never pay for them.
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# CPU backend for the same model: "torch" (full precision), "onnx" or "onnx-int8".
+# Vectors differ slightly between backends, so chunks are tagged with the
+# backend that produced them and re-embedded after a switch.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Quantized export shipped in the model repo (use model_qint8_avx512.onnx on AVX-512 hosts)
+EMBEDDING_ONNX_INT8_FILE = os.getenv("EMBEDDING_ONNX_INT8_FILE", "onnx/model_quint8_avx2.onnx")
+# Encode batch size for cross-resume ingestion (CPU throughput grows with batch size)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+# Optional shared embedding server (services/embedding_server.py). When set, this
+# process never loads the model unless the server is unreachable and fallback is on.
+EMBEDDING_SERVER_SOCKET = os.getenv("EMBEDDING_SERVER_SOCKET", "")
+EMBEDDING_SERVER_FALLBACK = os.getenv("EMBEDDING_SERVER_FALLBACK", "true").lower() not in ("0", "false", "no")
+
+class EmbeddingBackend:
+    """
+    One way of running EMBEDDING_MODEL_NAME on CPU.
+    Subclasses implement load(); encode() returns a float32 (n, dim) array.
+    """
+    name = None
+    requires = () # extra top-level packages, checked at startup (check_backend)
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self.model = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def encode(self, texts, batch_size=EMBED_BATCH_SIZE):
+        vectors = self.model.encode(list(texts), batch_size=batch_size, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+class TorchBackend(EmbeddingBackend):
+    name = "torch"
+
+    def load(self):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(self.model_name)
+
+class OnnxBackend(EmbeddingBackend):
+    # Needs sentence-transformers[onnx] (optimum + onnxruntime): requirements-onnx.txt
+    name = "onnx"
+    requires = ("onnxruntime", "optimum")
+    file_name = None
+
+    def load(self):
+        from sentence_transformers import SentenceTransformer
+        model_kwargs = {"file_name": self.file_name} if self.file_name else None
+        self.model = SentenceTransformer(self.model_name, backend="onnx", model_kwargs=model_kwargs)
+
+class OnnxInt8Backend(OnnxBackend):
+    name = "onnx-int8"
+    file_name = EMBEDDING_ONNX_INT8_FILE
+
+BACKENDS = {b.name: b for b in (TorchBackend, OnnxBackend, OnnxInt8Backend)}
+
+def check_backend(name=EMBEDDING_BACKEND):
+    """
+    Raises RuntimeError if the backend is unknown or its optional packages are
+    not installed. Only looks the packages up, nothing is imported.
+    """
+    if name not in BACKENDS:
+        raise RuntimeError(f"Unknown EMBEDDING_BACKEND '{name}'. Choose from: {', '.join(BACKENDS)}")
+    missing = [pkg for pkg in BACKENDS[name].requires if importlib.util.find_spec(pkg) is None]
+    if missing:
+        raise RuntimeError(
+            f"EMBEDDING_BACKEND={name} needs packages that are not installed: {', '.join(missing)}. "
+            f"Run: pip install -r requirements-onnx.txt (or set EMBEDDING_BACKEND=torch)"
+        )
+
+def encodes_locally() -> bool:
+    # False only when every encode goes to the embedding server
+    return not EMBEDDING_SERVER_SOCKET or EMBEDDING_SERVER_FALLBACK
+
+def create_backend(name=EMBEDDING_BACKEND, model_name=EMBEDDING_MODEL_NAME):
+    check_backend(name)
+    backend = BACKENDS[name](model_name)
+    backend.load()
+    return backend
+
+def embedder_tag():
+    # Stored on every Chroma chunk so vectors from another backend are never mixed in
+    return f"{EMBEDDING_MODEL_NAME}:{EMBEDDING_BACKEND}"
+
+_model = None
+_lock = threading.Lock()
+_state = {"status": "cold", "backend": EMBEDDING_BACKEND, "load_seconds": None, "warmed_up": False, "error": None, "server_ok": None}
+
+def get_model():
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _state["status"] = "loading"
+                t0 = time.time()
+                try:
+                    _model = create_backend()
+                except Exception as e:
+                    _state["status"] = "failed"
+                    _state["error"] = str(e)
+                    raise
+                _state["load_seconds"] = round(time.time() - t0, 2)
+                _state["status"] = "loaded"
+                _state["error"] = None
+                print(f"Embedding model {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND}) loaded in {_state['load_seconds']}s")
+    return _model
+
+def local_encode(texts, batch_size=EMBED_BATCH_SIZE):
+    if not texts:
+        return []
+    return get_model().encode(texts, batch_size=batch_size).tolist()
+
+def encode(texts, batch_size=EMBED_BATCH_SIZE):
+    """
+    Encodes texts, consulting the on-disk embedding cache first
+    (services.embedding_cache); only misses reach the model.
+    """
+    if not texts:
+        return []
+    return embedding_cache.cached_encode(
+        embedder_tag(), list(texts), lambda missing: _encode_uncached(missing, batch_size)
+    )
+
+def _encode_uncached(texts, batch_size=EMBED_BATCH_SIZE):
+    """
+    Encodes via the shared embedding server when EMBEDDING_SERVER_SOCKET is set
+    (the server does its own batching, so batch_size only applies locally).
+    """
+    if EMBEDDING_SERVER_SOCKET:
+        from services.embedding_server import encode_remote
+        try:
+            vectors = encode_remote(EMBEDDING_SERVER_SOCKET, texts).tolist()
+            _state["server_ok"] = True
+            return vectors
+        except (OSError, ConnectionError, RuntimeError) as e:
+            _state["server_ok"] = False
+            if not EMBEDDING_SERVER_FALLBACK:
+                raise
+            print(f"Embedding server unavailable ({e}); encoding locally")
+    return local_encode(texts, batch_size=batch_size)
+
+def warm_up():
+    """
+    Loads the model (or reaches the embedding server) and runs one dummy
+    encode so the first real request does not pay for lazy initialization.
+    """
+    try:
+        encode(["warm up"])
+        _state["warmed_up"] = True
+    except Exception as e:
+        print(f"Embedding warm-up failed: {e}")
+
+def start_warm_up():
+    if os.getenv("EMBEDDING_WARMUP", "true").lower() in ("0", "false", "no"):
+        return
+    threading.Thread(target=warm_up, name="embedding-warmup", daemon=True).start()
+
+def is_ready():
+    if EMBEDDING_SERVER_SOCKET and _state.get("server_ok"):
+        return _state["warmed_up"]
+    return _model is not None and _state["warmed_up"]
+
+def status():
+    mode = "server" if EMBEDDING_SERVER_SOCKET else "local"
+    return {"model": EMBEDDING_MODEL_NAME, "mode": mode, "ready": is_ready(), **_state}
+
+def embedding_function():
+    """
+    Chroma embedding function backed by the lazy model (used for query_texts).
+    Built on demand so chromadb is not imported at module load either.
+    """
+    from chromadb.utils import embedding_functions
+
+    class MiniLMEmbeddingFunction(embedding_functions.EmbeddingFunction):
+        def __call__(self, input):
+            return encode(input)
+
+    return MiniLMEmbeddingFunction()
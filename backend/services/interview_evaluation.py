@@ -1,8 +1,4 @@
-import os
-import json
-from groq import Groq
-
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+from services import llm_client
 
 def evaluate_interview_transcript(transcript: list, candidate_name: str, role: str, resume_summary: str = ""):
     """
@@ -77,17 +73,10 @@ Return ONLY valid JSON in this exact format:
 """
     
     try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": "You are an expert technical interview evaluator. Return only valid JSON."},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-        
-        result = json.loads(response.choices[0].message.content)
+        result = llm_client.chat_json("interview_evaluation", [
+            {"role": "system", "content": "You are an expert technical interview evaluator. Return only valid JSON."},
+            {"role": "user", "content": evaluation_prompt}
+        ], temperature=0.3)
         
         # Ensure all required fields exist with defaults
         return {
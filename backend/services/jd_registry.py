@@ -0,0 +1,154 @@
+import models
+from sqlalchemy.exc import IntegrityError
+from services.rag_service import RAGService
+
+# Job Description registry: every JD is validated, normalized, embedded and
+# skill-parsed ONCE at creation, then reused by every screening batch via its id.
+
+# Column lengths of models.JobDescription.title / normalized_title
+TITLE_MAX_LENGTH = 200
+NORMALIZED_TITLE_MAX_LENGTH = 100
+
+def normalize_role(raw_title: str) -> str:
+    # Common prefixes to strip
+    prefixes = [
+        "we are looking for a", "we are looking for an", "we are looking for",
+        "hiring for a", "hiring for an", "hiring for",
+        "seeking candidates for a", "seeking candidates for", "seeking",
+        "looking for a", "looking for"
+    ]
+
+    cleaned = raw_title.lower().strip()
+
+    # 1. Strict Canonical Mapping (Based on User Rules)
+    if any(k in cleaned for k in ["full stack", "fullstack", "mern", "mean"]):
+         return "Full Stack Software Engineer"
+    if any(k in cleaned for k in ["frontend", "front end", "react", "angular", "vue"]):
+         return "Frontend Developer"
+    if any(k in cleaned for k in ["backend", "back end", "node", "django", "fastapi", "java", "spring"]):
+         return "Backend Developer"
+    if any(k in cleaned for k in ["python", "machine learning", "ai", "data scientist"]):
+         return "Python Developer"
+    if any(k in cleaned for k in ["software engineer", "developer", "sde"]):
+         return "Software Engineer"
+
+    # 2. Fallback: Strip noise if no specific keyword match (preserve original intent but clean it)
+    for prefix in prefixes:
+        if cleaned.startswith(prefix):
+            cleaned = cleaned[len(prefix):].strip()
+            break
+
+    # Strip noise suffixes
+    noise_phrases = ["to join our development team", "and work on building", "remote", "(remote)", "urgent hiring"]
+    for noise in noise_phrases:
+        cleaned = cleaned.replace(noise, "")
+
+    return cleaned.title().strip()[:NORMALIZED_TITLE_MAX_LENGTH].strip()
+
+def derive_jd_title(job_description: str) -> str:
+    # Extract Title from JD (First line)
+    jd_lines = [l.strip() for l in job_description.split('\n') if l.strip()]
+    if jd_lines:
+        raw_title = jd_lines[0][:100] # Take first line
+        return normalize_role(raw_title)
+    return "General Candidate"
+
+def validate_jd_text(text: str):
+    clean_jd = (text or "").strip()
+    if len(clean_jd) < 15 or len(clean_jd.split()) < 3:
+        raise ValueError("Job Description is too vague or invalid (Text too short). Please provide a detailed description.")
+    return clean_jd
+
+def get_or_create(db, description: str, title: str = None, target_capacity: int = None):
+    """
+    Returns the registry row for this JD text (matched by content hash),
+    computing title, embedding and skills only when it is new. An explicit
+    title / target_capacity updates an existing row.
+    Raises ValueError for an invalid JD.
+    """
+    description = validate_jd_text(description)
+    content_hash = RAGService.hash_jd(description)
+
+    jd = db.query(models.JobDescription).filter(models.JobDescription.content_hash == content_hash).first()
+    if jd:
+        return _update_existing(db, jd, title, target_capacity)
+
+    raw_title = title.strip()[:TITLE_MAX_LENGTH] if title and title.strip() else None
+    if raw_title is None:
+        jd_lines = [l.strip() for l in description.split('\n') if l.strip()]
+        raw_title = jd_lines[0][:100]
+
+    print(f"Registering new Job Description ({content_hash[:12]})...")
+    jd = models.JobDescription(title=raw_title, description=description)
+    if target_capacity:
+        jd.target_capacity = target_capacity
+    _compute_artifacts(jd, explicit_title=bool(title))
+    db.add(jd)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Same JD registered concurrently by another request
+        db.rollback()
+        return db.query(models.JobDescription).filter(models.JobDescription.content_hash == content_hash).first()
+    db.refresh(jd)
+    return jd
+
+def _update_existing(db, jd, title=None, target_capacity=None):
+    raw_title = title.strip()[:TITLE_MAX_LENGTH] if title and title.strip() else None
+    changed = False
+    if raw_title and raw_title != jd.title:
+        print(f"DEBUG: Re-titling Job Description {jd.id}: '{jd.title}' -> '{raw_title}'")
+        jd.title = raw_title
+        jd.normalized_title = normalize_role(raw_title)
+        changed = True
+    if target_capacity and target_capacity != jd.target_capacity:
+        jd.target_capacity = target_capacity
+        changed = True
+    if changed:
+        db.commit()
+        db.refresh(jd)
+    return jd
+
+ARTIFACT_COLUMNS = ("normalized_title", "content_hash", "embedding", "required_skills", "preferred_skills")
+
+def _compute_artifacts(jd, explicit_title=False):
+    skills = RAGService.extract_jd_skills(jd.description)
+    jd.normalized_title = normalize_role(jd.title) if explicit_title else derive_jd_title(jd.description)
+    jd.content_hash = RAGService.hash_jd(jd.description)
+    jd.embedding = RAGService.embed_texts([jd.description])[0]
+    jd.required_skills = skills["required_skills"]
+    jd.preferred_skills = skills["preferred_skills"]
+
+def get(db, jd_id: int):
+    jd = db.query(models.JobDescription).filter(models.JobDescription.id == jd_id).first()
+    if jd and jd.embedding is None:
+        # Row predates the registry columns: backfill its artifacts once
+        _compute_artifacts(jd, explicit_title=bool(jd.title))
+        artifacts = {name: getattr(jd, name) for name in ARTIFACT_COLUMNS}
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another row already holds this description's hash (legacy duplicate):
+            # keep this row without it, the other one is what get_or_create matches
+            db.rollback()
+            jd = db.query(models.JobDescription).filter(models.JobDescription.id == jd_id).first()
+            for name, value in artifacts.items():
+                if name != "content_hash":
+                    setattr(jd, name, value)
+            db.commit()
+        db.refresh(jd)
+    return jd
+
+def to_artifacts(jd):
+    """
+    Plain-dict snapshot handed to worker threads (ORM rows stay in their session).
+    """
+    return {
+        "id": jd.id,
+        "title": jd.normalized_title,
+        "description": jd.description,
+        "content_hash": jd.content_hash or RAGService.hash_jd(jd.description), # unset on a legacy duplicate
+        "embedding": jd.embedding,
+        "required_skills": jd.required_skills or [],
+        "preferred_skills": jd.preferred_skills or []
+    }
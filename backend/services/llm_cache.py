@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+
+# Prompt-level response cache for llm_client.
+# Key = sha256(model, temperature, json mode, messages with whitespace collapsed),
+# value = the assistant message content. Two tiers: an in-process LRU and an
+# optional SQLite file shared by every gunicorn worker, so an answer fetched by
+# one worker is never requested from Groq again by another while it is fresh.
+# Only call sites with a TTL are cached (opt-in); LLM_CACHE_TTL_<SITE> sets or
+# overrides it in seconds, 0 turns a site off.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000)) # in-memory, per worker
+LLM_CACHE_DISK = os.getenv("LLM_CACHE_DISK", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", 50000))
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", Path(__file__).resolve().parent.parent / "llm_cache"))
+
+# Sites whose answers are a pure function of the prompt (or where a repeated
+# answer is acceptable): contact fields of a given resume header, the hint for
+# a given compiler error, interview starters for a given focus area.
+DEFAULT_TTLS = {
+    "contact_extraction": 30 * 86400,
+    "error_analysis": 7 * 86400,
+    "interview_questions": 86400,
+}
+
+def _site_ttls():
+    ttls = dict(DEFAULT_TTLS)
+    for name, value in os.environ.items():
+        if name.startswith("LLM_CACHE_TTL_"):
+            try:
+                ttls[name[len("LLM_CACHE_TTL_"):].lower()] = float(value)
+            except ValueError:
+                print(f"DEBUG: Ignoring {name}={value!r} (not a number of seconds)")
+    return {site: ttl for site, ttl in ttls.items() if ttl > 0}
+
+SITE_TTLS = _site_ttls()
+
+def ttl_for(site: str) -> float:
+    """
+    Seconds a response for this call site stays fresh; 0 = not cached.
+    """
+    return SITE_TTLS.get(site, 0) if LLM_CACHE_ENABLED else 0
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+def make_key(model: str, temperature: float, json_mode: bool, messages) -> str:
+    parts = [model, round(float(temperature), 3), bool(json_mode),
+             [[m.get("role"), normalize(m.get("content"))] for m in messages]]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class _Memory:
+    """
+    Thread-safe LRU of key -> (expires_at, content).
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, expires_at, content):
+        with self._lock:
+            self._entries[key] = (expires_at, content)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class _Disk:
+    """
+    SQLite tier shared between workers (WAL, one short transaction per call).
+    """
+    def __init__(self, directory, max_entries):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / "llm_cache.sqlite"
+        self.max_entries = max_entries
+        self._writes = 0
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, site TEXT NOT NULL, content TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_last_used ON responses (last_used_at)")
+
+    def _connect(self):
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def get(self, key, now):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT expires_at, content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            return row
+
+    def put(self, key, site, expires_at, content, now):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, site, content, created_at, expires_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, site, content, now, expires_at, now)
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                return self._evict(conn, now)
+        return 0
+
+    def _evict(self, conn, now):
+        # Expired rows first, then least recently used over the cap
+        expired = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,)).rowcount
+        over = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if over > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used_at LIMIT ?)", (over,)
+            )
+        return expired + max(over, 0)
+
+    def size(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM responses")
+
+_memory = _Memory(LLM_CACHE_MAX_ENTRIES)
+_disk = None
+_disk_lock = threading.Lock()
+_disk_failed = False
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _get_disk():
+    global _disk, _disk_failed
+    if not LLM_CACHE_DISK or _disk_failed:
+        return None
+    if _disk is None:
+        with _disk_lock:
+            if _disk is None and not _disk_failed:
+                try:
+                    _disk = _Disk(LLM_CACHE_DIR, LLM_CACHE_DISK_MAX_ENTRIES)
+                except (OSError, sqlite3.Error) as e:
+                    # Memory tier keeps working without the file
+                    print(f"DEBUG: LLM disk cache unavailable ({e}), using memory only")
+                    _disk_failed = True
+    return _disk
+
+def _count(site, name, n=1):
+    with _stats_lock:
+        site_stats = _stats.setdefault(site, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stored": 0, "evicted": 0})
+        site_stats[name] += n
+
+def get(site: str, key: str):
+    """
+    -> cached content or None. Disk hits are promoted to the memory tier.
+    """
+    now = time.time()
+    entry = _memory.get(key, now)
+    if entry is not None:
+        _count(site, "memory_hits")
+        return entry[1]
+    disk = _get_disk()
+    if disk is not None:
+        try:
+            entry = disk.get(key, now)
+        except sqlite3.Error as e:
+            print(f"DEBUG: LLM disk cache read failed: {e}")
+            entry = None
+        if entry is not None:
+            _count(site, "evicted", _memory.put(key, entry[0], entry[1]))
+            _count(site, "disk_hits")
+            return entry[1]
+    _count(site, "misses")
+    return None
+
+def put(site: str, key: str, content: str):
+    ttl = ttl_for(site)
+    if not ttl or content is None:
+        return
+    now = time.time()
+    evicted = _memory.put(key, now + ttl, content)
+    disk = _get_disk()
+    if disk is not None:
+        try:
+            evicted += disk.put(key, site, now + ttl, content, now)
+        except sqlite3.Error as e:
+            print(f"DEBUG: LLM disk cache write failed: {e}")
+    _count(site, "stored")
+    _count(site, "evicted", evicted)
+
+def clear():
+    _memory.clear()
+    disk = _get_disk()
+    if disk is not None:
+        disk.clear()
+
+def stats():
+    with _stats_lock:
+        sites = {}
+        for site, s in _stats.items():
+            lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+            sites[site] = {**s, "hit_rate": round((s["memory_hits"] + s["disk_hits"]) / lookups, 3) if lookups else 0.0}
+    disk = _get_disk()
+    try:
+        disk_entries = disk.size() if disk is not None else None
+    except sqlite3.Error:
+        disk_entries = None
+    return {
+        "enabled": LLM_CACHE_ENABLED,
+        "ttls": dict(SITE_TTLS),
+        "memory_entries": len(_memory),
+        "disk_entries": disk_entries,
+        "sites": sites
+    }
@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from services import llm_cache, llm_rate_limiter
+
+load_dotenv()
+
+# One Groq (OpenAI-compatible) chat client for every call site.
+# A shared requests.Session keeps TLS connections alive across calls and
+# threads; timeouts, retry/backoff and model names are configured here once,
+# and latency / token / retry counters are kept per call site (per process).
+# Every attempt is admitted by services/llm_rate_limiter.py first; sites that
+# opt in are answered from services/llm_cache.py before any of that.
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16)) # keep-alive connections per worker
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2)) # retries after the first attempt
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 2))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 10))
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Model per call site; LLM_MODEL overrides every default, LLM_MODEL_<SITE> one site.
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+SITES = ["screening", "contact_extraction", "jd_skills", "question_generation", "interview_questions",
+         "error_analysis", "interview_evaluation"]
+MODELS = {site: os.getenv(f"LLM_MODEL_{site.upper()}", DEFAULT_MODEL) for site in SITES}
+
+class LLMError(Exception):
+    """Raised when a call still fails after retries (or cannot be made)."""
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def model_for(site: str) -> str:
+    return MODELS.get(site, DEFAULT_MODEL)
+
+def _record(site, latency, usage=None, retries=0, failed=False):
+    usage = usage or {}
+    with _metrics_lock:
+        m = _metrics.setdefault(site, {
+            "calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "total_latency": 0.0, "max_latency": 0.0
+        })
+        m["calls"] += 1
+        m["errors"] += failed
+        m["retries"] += retries
+        m["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        m["completion_tokens"] += usage.get("completion_tokens") or 0
+        m["total_latency"] += latency
+        m["max_latency"] = max(m["max_latency"], latency)
+
+def _backoff(attempt, response=None):
+    # Honour Retry-After on 429/503, else exponential with jitter
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except (TypeError, ValueError):
+            pass
+    delay = min(LLM_BACKOFF_BASE * (2 ** attempt), LLM_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+def _is_json(content):
+    try:
+        parse_json(content)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+def chat(site: str, messages, temperature: float = 0.1, json_mode: bool = False,
+         max_retries: int = None, read_timeout: float = None, validate=None):
+    """
+    -> assistant message content (str). Raises LLMError once retries are spent.
+    Retries connection errors, timeouts and 408/409/429/5xx; other 4xx fail at once.
+    validate(content) -> bool decides whether an answer may be cached (JSON mode:
+    it must parse), so a malformed response is never served again from the cache.
+    """
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise LLMError("Missing GROQ_API_KEY")
+
+    payload = {"model": model_for(site), "messages": messages, "temperature": temperature}
+    cache_key = None
+    if llm_cache.ttl_for(site):
+        cache_key = llm_cache.make_key(payload["model"], temperature, json_mode, messages)
+        cached = llm_cache.get(site, cache_key)
+        if cached is not None:
+            print(f"DEBUG: LLM {site}: cache hit")
+            return cached
+        validate = validate or (_is_json if json_mode else None)
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    timeout = (LLM_CONNECT_TIMEOUT, read_timeout or LLM_READ_TIMEOUT)
+    max_retries = LLM_MAX_RETRIES if max_retries is None else max_retries
+
+    controller = llm_rate_limiter.controller
+    estimate = llm_rate_limiter.estimate_tokens(messages)
+    t0 = time.time()
+    last_error = None
+    for attempt in range(max_retries + 1):
+        response = None
+        usage = None
+        try:
+            permit = controller.acquire(payload["model"], estimate)
+        except llm_rate_limiter.AdmissionTimeout as e:
+            last_error = str(e)
+            break
+        try:
+            response = get_session().post(f"{GROQ_BASE_URL}/chat/completions", headers=headers, json=payload, timeout=timeout)
+            if response.status_code == 200:
+                data = response.json()
+                usage = data.get("usage") or {}
+                content = data["choices"][0]["message"]["content"]
+                latency = time.time() - t0
+                _record(site, latency, usage, retries=attempt)
+                print(f"DEBUG: LLM {site}: {latency:.2f}s, prompt_tokens={usage.get('prompt_tokens')}, "
+                      f"completion_tokens={usage.get('completion_tokens')}, retries={attempt}")
+                if cache_key and (validate is None or validate(content)):
+                    llm_cache.put(site, cache_key, content)
+                return content
+            last_error = f"HTTP {response.status_code}: {response.text[:200]}"
+            if response.status_code not in RETRY_STATUS:
+                break
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            last_error = str(e)
+        except (ValueError, KeyError, IndexError) as e:
+            last_error = f"Malformed response: {e}"
+            break
+        finally:
+            controller.release(
+                permit,
+                headers=response.headers if response is not None else None,
+                status=response.status_code if response is not None else None,
+                used_tokens=usage.get("total_tokens") if usage else None
+            )
+        if attempt < max_retries:
+            print(f"DEBUG: LLM {site} attempt {attempt + 1} failed ({last_error}), retrying")
+            if controller.enabled and response is not None and response.status_code == 429:
+                continue # the controller pauses this model until the quota resets
+            time.sleep(_backoff(attempt, response))
+
+    _record(site, time.time() - t0, retries=attempt, failed=True)
+    raise LLMError(f"{site}: {last_error}")
+
+def parse_json(content: str):
+    """
+    json.loads that tolerates ```json fences around the payload.
+    """
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return json.loads(re.sub(r"```(?:json)?", "", content).strip())
+
+def chat_json(site: str, messages, temperature: float = 0.1, **kwargs):
+    """
+    chat() in JSON mode, parsed. Raises LLMError on unparseable output.
+    """
+    content = chat(site, messages, temperature=temperature, json_mode=True, **kwargs)
+    try:
+        return parse_json(content)
+    except json.JSONDecodeError as e:
+        raise LLMError(f"{site}: invalid JSON in response: {e}")
+
+def stats():
+    with _metrics_lock:
+        sites = {}
+        for site, m in _metrics.items():
+            sites[site] = {
+                **m,
+                "total_latency": round(m["total_latency"], 3),
+                "max_latency": round(m["max_latency"], 3),
+                "avg_latency": round(m["total_latency"] / m["calls"], 3) if m["calls"] else 0.0
+            }
+    return {
+        "base_url": GROQ_BASE_URL,
+        "models": dict(MODELS),
+        "pool_size": LLM_POOL_SIZE,
+        "sites": sites,
+        "rate_limit": llm_rate_limiter.controller.stats(),
+        "cache": llm_cache.stats()
+    }
@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import threading
+
+# Admission control in front of every llm_client call.
+# Two token buckets per model -- requests/minute and tokens/minute -- start
+# from the configured quota and are corrected from Groq's x-ratelimit-*
+# response headers: the tokens/minute limit is adopted from
+# x-ratelimit-limit-tokens, and both buckets are capped at the
+# organisation-wide remaining budget the headers report. That
+# feedback is what keeps several gunicorn workers (each with its own
+# controller) from overrunning the shared quota. A 429 pauses admissions for
+# the model until Retry-After has passed instead of letting every thread back
+# off on its own.
+LLM_RATE_LIMIT = os.getenv("LLM_RATE_LIMIT", "true").lower() not in ("0", "false", "no")
+GROQ_RPM = int(os.getenv("GROQ_RPM", 30)) # requests per minute per model (free tier defaults)
+GROQ_TPM = int(os.getenv("GROQ_TPM", 6000)) # tokens per minute per model
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8)) # in-flight calls per worker
+LLM_ADMISSION_TIMEOUT = float(os.getenv("LLM_ADMISSION_TIMEOUT", 120))
+COMPLETION_TOKEN_ESTIMATE = 400 # charged up front, corrected from usage afterwards
+RESET_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+class AdmissionTimeout(Exception):
+    """No budget became available within LLM_ADMISSION_TIMEOUT."""
+
+def parse_reset(value):
+    """
+    Groq reset durations ("7.66s", "2m59.56s", "1h2m", "120ms") -> seconds.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = RESET_PART_RE.findall(value)
+    return sum(float(n) * scale[unit] for n, unit in parts) if parts else None
+
+def estimate_tokens(messages):
+    # ~4 characters per token for English prompts, plus the expected completion
+    return sum(len(m.get("content") or "") for m in messages) // 4 + COMPLETION_TOKEN_ESTIMATE
+
+class TokenBucket:
+    """
+    capacity units, refilled continuously at capacity / period. Not thread-safe
+    on its own (ModelBudget holds the lock). level may go negative after a
+    reconcile; admissions then wait for it to refill.
+    """
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        # Requests bigger than the whole bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def resize(self, capacity, now, period=60.0):
+        # Adopt the quota the server reports (x-ratelimit-limit-*)
+        self.refill(now)
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = min(self.level, self.capacity)
+
+    def sync(self, remaining, now):
+        # The server's count covers every worker on the key: never hold more than it reports
+        self.refill(now)
+        self.level = min(self.level, float(remaining))
+
+class ModelBudget:
+    def __init__(self, rpm, tpm, period=60.0):
+        self.lock = threading.Condition()
+        self.period = period
+        self.requests = TokenBucket(rpm, period)
+        self.tokens = TokenBucket(tpm, period)
+        self.paused_until = 0.0
+
+class AdmissionController:
+    def __init__(self, rpm=GROQ_RPM, tpm=GROQ_TPM, max_concurrency=LLM_MAX_CONCURRENCY, enabled=LLM_RATE_LIMIT, period=60.0):
+        # period: length of the quota window in seconds (benchmarks shrink it)
+        self.rpm, self.tpm, self.period = rpm, tpm, period
+        self.enabled = enabled
+        self._budgets = {}
+        self._budgets_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._stats_lock = threading.Lock()
+        self._stats = {"admitted": 0, "waited": 0, "wait_seconds": 0.0, "rate_limited": 0, "header_syncs": 0}
+
+    def _budget(self, model):
+        with self._budgets_lock:
+            if model not in self._budgets:
+                self._budgets[model] = ModelBudget(self.rpm, self.tpm, self.period)
+            return self._budgets[model]
+
+    def acquire(self, model, tokens, timeout=LLM_ADMISSION_TIMEOUT):
+        """
+        Blocks until one request + `tokens` fit the model's budget and a
+        concurrency slot is free. Returns a permit for release().
+        """
+        if not self.enabled:
+            return None
+        deadline = time.monotonic() + timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise AdmissionTimeout(f"no free LLM slot for {model}")
+
+        budget = self._budget(model)
+        waited = 0.0
+        try:
+            with budget.lock:
+                while True:
+                    now = time.monotonic()
+                    budget.requests.refill(now)
+                    budget.tokens.refill(now)
+                    wait = max(budget.paused_until - now, budget.requests.wait_time(1), budget.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        budget.requests.level -= 1
+                        budget.tokens.level -= tokens
+                        break
+                    if now + wait > deadline:
+                        raise AdmissionTimeout(f"LLM budget for {model} not available within {timeout:.0f}s")
+                    budget.lock.wait(wait)
+                    waited += wait
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            self._stats["admitted"] += 1
+            if waited:
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += waited
+        return {"model": model, "tokens": tokens}
+
+    def release(self, permit, headers=None, status=None, used_tokens=None):
+        """
+        Frees the concurrency slot and reconciles the budget with what the
+        call actually cost and what the rate-limit headers report.
+        """
+        if permit is None:
+            return
+        budget = self._budget(permit["model"])
+        headers = headers or {}
+        with budget.lock:
+            now = time.monotonic()
+            if used_tokens is not None:
+                budget.tokens.level += permit["tokens"] - used_tokens
+            limit_tokens = headers.get("x-ratelimit-limit-tokens")
+            if limit_tokens is not None:
+                try:
+                    if float(limit_tokens) > 0 and float(limit_tokens) != budget.tokens.capacity:
+                        budget.tokens.resize(float(limit_tokens), now, budget.period)
+                except ValueError:
+                    pass
+            remaining_requests = headers.get("x-ratelimit-remaining-requests")
+            remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+            synced = False
+            if remaining_tokens is not None:
+                try:
+                    budget.tokens.sync(float(remaining_tokens), now)
+                    synced = True
+                except ValueError:
+                    pass
+            if remaining_requests is not None:
+                # Groq's request counter is per day; only let it tighten, never loosen, the minute bucket
+                try:
+                    if float(remaining_requests) < budget.requests.level:
+                        budget.requests.sync(float(remaining_requests), now)
+                    synced = True
+                except ValueError:
+                    pass
+            if status == 429:
+                pause = parse_reset(headers.get("retry-after")) or parse_reset(headers.get("x-ratelimit-reset-tokens")) or 1.0
+                budget.paused_until = max(budget.paused_until, now + pause)
+            budget.lock.notify_all()
+        self._slots.release()
+
+        with self._stats_lock:
+            self._stats["header_syncs"] += synced
+            self._stats["rate_limited"] += status == 429
+
+    def stats(self):
+        with self._stats_lock:
+            out = {**self._stats, "wait_seconds": round(self._stats["wait_seconds"], 3)}
+        out.update({"enabled": self.enabled, "rpm": self.rpm, "tpm": self.tpm, "max_concurrency": self.max_concurrency})
+        budgets = {}
+        with self._budgets_lock:
+            items = list(self._budgets.items())
+        for model, budget in items:
+            with budget.lock:
+                budget.requests.refill(time.monotonic())
+                budget.tokens.refill(time.monotonic())
+                budgets[model] = {
+                    "requests_available": round(budget.requests.level, 1),
+                    "tokens_available": round(budget.tokens.level),
+                    "tokens_per_minute": round(budget.tokens.capacity),
+                    "paused_for": round(max(budget.paused_until - time.monotonic(), 0.0), 2)
+                }
+        out["models"] = budgets
+        return out
+
+controller = AdmissionController()
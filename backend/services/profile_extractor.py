@@ -0,0 +1,215 @@
+import re
+from datetime import date
+from services.chunking import SECTION_WORDS
+
+# Local contact/profile extraction from resume text.
+# Precompiled patterns only (no model, no network), so it runs in microseconds
+# and resolves most resumes before the Groq fallback in
+# RAGService.extract_candidate_info is needed. Every field records which path
+# resolved it in "sources", so the LLM fallback rate can be measured.
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+# "jane.doe [at] example [dot] com" / "jane (at) example.com"
+OBFUSCATED_EMAIL_RE = re.compile(
+    r'([a-zA-Z0-9._%+-]+)\s*[\[(]\s*at\s*[\])]\s*([a-zA-Z0-9-]+(?:\s*(?:[\[(]\s*dot\s*[\])]|\.)\s*[a-zA-Z0-9-]+)+)',
+    re.IGNORECASE
+)
+DOT_RE = re.compile(r'\s*(?:[\[(]\s*dot\s*[\])]|\.)\s*', re.IGNORECASE)
+PHONE_RE = re.compile(r'(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?)?\d{2,5}(?:[\s.-]?\d{2,5}){1,4}(?![\w])')
+LINKEDIN_RE = re.compile(r'linkedin\.com/in/([A-Za-z0-9_%-]+)', re.IGNORECASE)
+GITHUB_RE = re.compile(r'github\.com/([A-Za-z0-9-]{1,39})(?![A-Za-z0-9-])', re.IGNORECASE)
+NAME_LABEL_RE = re.compile(r'^\s*(?:full\s+)?name\s*[:\-]\s*(.+)$', re.IGNORECASE)
+NAME_TOKEN_RE = re.compile(r"^[A-Za-z][A-Za-z.'-]*$")
+SEPARATOR_RE = re.compile(r'\s*[|•·,\t]\s*|\s{3,}')
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_POINT = rf'(?:{_MONTH}\s*[\'’]?\d{{2,4}}|\d{{1,2}}[/.-]\d{{4}}|\d{{4}})'
+DATE_RANGE_RE = re.compile(
+    rf'\b(?P<start>{_POINT})\s*(?:-|–|—|to|until)\s*(?P<end>{_POINT}|present|current|now|till date|date)',
+    re.IGNORECASE
+)
+TWO_DIGITS_RE = re.compile(r'\d\d')
+TEN_DIGITS_RE = re.compile(r'(?:\d\D{0,3}){10}') # prefilter for lines that may hold a phone number
+NON_DIGIT_RE = re.compile(r'\D')
+YEAR_SUFFIX_RE = re.compile(r'(\d{4}|\d{2})$')
+MONTH_WORD_RE = re.compile(r'[a-z]+')
+NUMERIC_MONTH_RE = re.compile(r'(\d{1,2})[/.-]\d{4}$')
+
+HEADER_LINES = 10
+NOT_NAMES = SECTION_WORDS | {"resume", "curriculum vitae", "curriculum", "cv", "bio data", "biodata", "profile", "contact"}
+# A header line containing one of these is a job title, not a name
+TITLE_WORDS = {
+    "engineer", "developer", "manager", "analyst", "designer", "consultant", "intern", "scientist",
+    "architect", "lead", "senior", "junior", "head", "director", "specialist", "administrator",
+    "officer", "executive", "associate", "tester", "programmer", "fresher", "student", "address"
+}
+PLACEHOLDER_NAME = "Unknown Candidate"
+# Date ranges under these headings are studies, not work experience
+EDUCATION_SECTIONS = {
+    "education", "academics", "academic background", "academic details", "academic qualifications",
+    "educational qualifications", "educational background", "qualifications", "education and training",
+    "certifications", "certificates", "training"
+}
+SECTION_HEADINGS = SECTION_WORDS | EDUCATION_SECTIONS
+
+def _clean_name(raw: str):
+    """
+    Title-cased name if raw looks like 2-4 (or a single) name tokens, else None.
+    """
+    raw = raw.strip().strip(",;:")
+    if not raw or len(raw) >= 50 or raw.lower() in NOT_NAMES:
+        return None
+    tokens = raw.split()
+    if not 1 <= len(tokens) <= 4 or not all(NAME_TOKEN_RE.match(t) for t in tokens):
+        return None
+    if any(t.lower().strip(".") in TITLE_WORDS for t in tokens):
+        return None
+    # Keep mixed-case spellings ("McDonald"); normalize ALL CAPS / lowercase
+    return " ".join(t.title() if t.isupper() or t.islower() else t for t in tokens)
+
+def _name_from_slug(slug: str):
+    # "john.doe", "john_doe42", "john-doe-1a2b3c" -> "John Doe"
+    parts = [p for p in re.split(r'[._-]+', slug) if p.isalpha() and len(p) > 1]
+    if 2 <= len(parts) <= 3:
+        return " ".join(p.title() for p in parts)
+    return None
+
+def _header_name(lines):
+    for line in lines[:HEADER_LINES]:
+        label = NAME_LABEL_RE.match(line)
+        if label:
+            name = _clean_name(SEPARATOR_RE.split(label.group(1))[0])
+            if name:
+                return name
+    for line in lines[:HEADER_LINES]:
+        # "JOHN DOE | john@x.com | +1 555 ..." -> first segment only
+        first = SEPARATOR_RE.split(line.strip())[0]
+        if "@" in first or any(ch.isdigit() for ch in first) or "/" in first:
+            continue
+        name = _clean_name(first)
+        if name:
+            return name
+    return None
+
+def _parse_point(text: str, is_end: bool, today: date):
+    """
+    -> (year, month) or None. Bare years count from January (start) or December (end).
+    """
+    text = text.strip().lower()
+    if text in ("present", "current", "now", "till date", "date"):
+        return today.year, today.month
+    year_match = YEAR_SUFFIX_RE.search(text)
+    if not year_match:
+        return None
+    year = int(year_match.group(1))
+    if year < 100:
+        year += 2000 if year <= today.year % 100 else 1900
+    month = 12 if is_end else 1
+    name = MONTH_WORD_RE.match(text)
+    if name and name.group(0)[:3] in MONTHS:
+        month = MONTHS[name.group(0)[:3]]
+    else:
+        numeric = NUMERIC_MONTH_RE.match(text)
+        if numeric and 1 <= int(numeric.group(1)) <= 12:
+            month = int(numeric.group(1))
+    if not 1950 <= year <= today.year + 1:
+        return None
+    return year, month
+
+def _section_heading(line: str):
+    """
+    Lowercased section name if the line is a section heading ("EDUCATION",
+    "Work Experience:", "Education: B.Tech ..."), else None.
+    """
+    head = line.partition(":")[0]
+    if len(head) > 48: # longer than any heading: skip the normalization
+        return None
+    head = head.strip().lower()
+    return head if head in SECTION_HEADINGS else None
+
+def experience_ranges(text: str):
+    """
+    -> [(start, end)] as (year, month) pairs, in resume order. Ranges under an
+    education heading (degrees, certifications) are skipped.
+    """
+    ranges = []
+    today = date.today()
+    in_education = False
+    for line in text.split('\n'):
+        section = _section_heading(line)
+        if section:
+            in_education = section in EDUCATION_SECTIONS
+        # Cheap prefilter: only lines with a 2+ digit run can hold a date range
+        if in_education or not TWO_DIGITS_RE.search(line):
+            continue
+        for match in DATE_RANGE_RE.finditer(line):
+            start = _parse_point(match.group("start"), False, today)
+            end = _parse_point(match.group("end"), True, today)
+            if start and end and start <= end:
+                ranges.append((start, end))
+    return ranges
+
+def experience_years(ranges):
+    # Union of the ranges, so overlapping roles are not double counted
+    months = set()
+    for (sy, sm), (ey, em) in ranges:
+        start, end = sy * 12 + sm - 1, ey * 12 + em - 1
+        months.update(range(start, end + 1))
+    return round(len(months) / 12, 1)
+
+def extract(text: str):
+    """
+    -> {"name", "email", "phone", "linkedin", "github", "experience_ranges",
+        "experience_years", "sources"}. Missing fields are None
+    (name is "Unknown Candidate"), matching extract_candidate_info's contract.
+    """
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    lowered = text.lower() # substring checks gate the rarer patterns
+    sources = {}
+    profile = {"name": PLACEHOLDER_NAME, "email": None, "phone": None, "linkedin": None, "github": None}
+
+    email = EMAIL_RE.search(text)
+    if email:
+        profile["email"] = email.group(0)
+        sources["email"] = "regex"
+    elif "at" in lowered:
+        obfuscated = OBFUSCATED_EMAIL_RE.search(text)
+        if obfuscated:
+            profile["email"] = f"{obfuscated.group(1)}@{DOT_RE.sub('.', obfuscated.group(2))}".lower()
+            sources["email"] = "obfuscated"
+
+    header = "\n".join(line for line in lines[:HEADER_LINES * 2] if TEN_DIGITS_RE.search(line))
+    phone = next((m.group(0) for m in PHONE_RE.finditer(header)
+                  if 10 <= len(NON_DIGIT_RE.sub("", m.group(0))) <= 15
+                  and not DATE_RANGE_RE.search(m.group(0))), None)
+    if phone:
+        profile["phone"] = phone.strip()
+        sources["phone"] = "regex"
+
+    linkedin = LINKEDIN_RE.search(text) if "linkedin.com/in/" in lowered else None
+    if linkedin:
+        profile["linkedin"] = f"https://www.linkedin.com/in/{linkedin.group(1)}"
+        sources["linkedin"] = "regex"
+    github = GITHUB_RE.search(text) if "github.com/" in lowered else None
+    if github:
+        profile["github"] = f"https://github.com/{github.group(1)}"
+        sources["github"] = "regex"
+
+    # Name: header line, then the email local part, then the LinkedIn slug
+    candidates = [("header", _header_name(lines))]
+    if profile["email"]:
+        candidates.append(("email", _name_from_slug(profile["email"].split("@")[0])))
+    if linkedin:
+        candidates.append(("linkedin", _name_from_slug(linkedin.group(1))))
+    for source, name in candidates:
+        if name:
+            profile["name"] = name
+            sources["name"] = source
+            break
+
+    ranges = experience_ranges(text)
+    profile["experience_ranges"] = [f"{sy:04d}-{sm:02d}/{ey:04d}-{em:02d}" for (sy, sm), (ey, em) in ranges]
+    profile["experience_years"] = experience_years(ranges) if ranges else None
+    profile["sources"] = sources
+    return profile
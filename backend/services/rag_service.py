@@ -1,94 +1,182 @@
 import re
 import os
-import chromadb
-from chromadb.utils import embedding_functions
-from sentence_transformers import SentenceTransformer
 import pypdf
-import requests
-import json
+import io
+import numpy as np
+import hashlib
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import List
 from pathlib import Path
 from dotenv import load_dotenv
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-import requests
+
+from services import screening_cache, embeddings, chunking, candidate_index, screening_context, profile_extractor, llm_client
+from services.profile_extractor import EMAIL_RE
+from services.embeddings import EMBED_BATCH_SIZE
 
 load_dotenv()
 
+# Screening LLM + rubric version. Bump SCREENING_PROMPT_VERSION whenever the
+# call_groq_api prompt/rubric changes so cached scores are not reused.
+SCREENING_MODEL = llm_client.model_for("screening")
+SCREENING_PROMPT_VERSION = "rubric-v2"
+# Max JD description characters sent per screening prompt (skills are sent separately)
+JD_PROMPT_CHARS = int(os.getenv("JD_PROMPT_CHARS", 4000))
+# Contact extraction fallback: resume header chars sent to Groq, and resumes per packed request
+CONTACT_HEADER_CHARS = 3000
+CONTACT_BATCH_SIZE = int(os.getenv("CONTACT_BATCH_SIZE", 8))
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Initialize RAG Components
-# Persistent Client for Chroma
+# RAG Components are initialized lazily (see get_collection / services.embeddings)
+# so importing this module does not load chromadb, torch or the model.
 chroma_path = BASE_DIR / "chroma_db"
-chroma_client = chromadb.PersistentClient(path=str(chroma_path))
+_chroma_client = None
+_collection = None
+_chroma_lock = threading.Lock()
 
-# Embedding Function (All-MiniLM-L6-v2)
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+def get_chroma_client():
+    global _chroma_client
+    if _chroma_client is None:
+        with _chroma_lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=str(chroma_path))
+    return _chroma_client
 
-class MiniLMEmbeddingFunction(embedding_functions.EmbeddingFunction):
-    def __call__(self, input):
-        return embedding_model.encode(input).tolist()
+def get_collection():
+    global _collection
+    if _collection is None:
+        client = get_chroma_client()
+        with _chroma_lock:
+            if _collection is None:
+                _collection = client.get_or_create_collection(
+                    name="resume_chunks",
+                    embedding_function=embeddings.embedding_function()
+                )
+    return _collection
 
-collection = chroma_client.get_or_create_collection(
-    name="resume_chunks",
-    embedding_function=MiniLMEmbeddingFunction()
-)
+@dataclass
+class ParsedResume:
+    """
+    A resume parsed once per screening pass.
+    Built by RAGService.parse_resume and handed to ingest, extraction and screening.
+    """
+    file_path: str
+    text: str
+    pages: List[str] = field(default_factory=list)
+    sha256: str = ""
 
 class RAGService:
 
+    @staticmethod
+    def parse_resume(file_path, raw=None):
+        """
+        Reads the file once, hashes the raw bytes and runs pypdf over them.
+        Pass raw if the bytes were already read (e.g. for a dedup lookup).
+        """
+        if raw is None:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+
+        reader = pypdf.PdfReader(io.BytesIO(raw))
+        pages = [(page.extract_text() or "") for page in reader.pages]
+        text = "".join(page + "\n" for page in pages)
+
+        return ParsedResume(
+            file_path=file_path,
+            text=text,
+            pages=pages,
+            sha256=hashlib.sha256(raw).hexdigest()
+        )
+
     @staticmethod
     def extract_text_from_pdf(file_path):
-        text = ""
-        with open(file_path, 'rb') as f:
-            reader = pypdf.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        return RAGService.parse_resume(file_path).text
+
+    @staticmethod
+    def hash_jd(jd_text):
+        """
+        Content hash of a JD, insensitive to case and whitespace layout.
+        """
+        normalized = " ".join(jd_text.lower().split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
 
     @staticmethod
     def extract_candidate_info(text, filename=""):
-        info = {
-            "name": "Unknown Candidate",
-            "email": None
-        }
-        
         print(f"DEBUG: --- Starting Extraction for {filename} ---")
         print(f"DEBUG: Text Length: {len(text)}")
-
-        # 1. Regex Email
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        email_match = re.search(email_pattern, text)
-        if email_match:
-            info["email"] = email_match.group(0)
-            print(f"DEBUG: Email found: {info['email']}")
-
-        # 2. Heuristic Name
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        for i in range(min(5, len(lines))):
-            potential_name = lines[i]
-            if (1 <= len(potential_name.split()) <= 4 and 
-                len(potential_name) < 50 and 
-                "@" not in potential_name and
-                not any(char.isdigit() for char in potential_name)):
-                
-                info["name"] = potential_name.title()
-                print(f"DEBUG: Heuristic Name found: {info['name']}")
-                break
+        info = RAGService._heuristic_contact(text)
 
         # 3. AI Fallback
-        if not info["email"] or info["name"] == "Unknown Candidate":
+        if RAGService._needs_llm_contact(info):
             print("DEBUG: Triggering AI Extraction...")
             try:
-                header_text = text[:3000]
-                ai_extracted = RAGService.extract_with_llm(header_text)
-                
-                if ai_extracted.get("name") and ai_extracted["name"] not in ["Unknown", "Null", None]:
-                    info["name"] = ai_extracted["name"]
-                    print(f"DEBUG: AI Name found: {info['name']}")
-                if ai_extracted.get("email") and not info["email"]:
-                    info["email"] = ai_extracted["email"]
-                    print(f"DEBUG: AI Email found: {info['email']}")
+                header_text = text[:CONTACT_HEADER_CHARS]
+                RAGService._merge_llm_contact(info, RAGService.extract_with_llm(header_text))
             except Exception as e:
                 print(f"DEBUG: AI Failed: {e}")
 
+        return RAGService._finish_contact(info, filename)
+
+    @staticmethod
+    def extract_candidate_info_batch(items):
+        """
+        items: [(key, text, filename)] -> {key: info}.
+        Same steps as extract_candidate_info, but every resume the regex/heuristic
+        pass misses is sent to Groq together: header snippets are packed
+        CONTACT_BATCH_SIZE per request and answered as a keyed JSON array.
+        Items missing from (or unusable in) a packed answer fall back to the
+        single-resume call.
+        """
+        infos, fallback = {}, {}
+        for key, text, filename in items:
+            print(f"DEBUG: --- Starting Extraction for {filename} ---")
+            infos[key] = RAGService._heuristic_contact(text)
+            if RAGService._needs_llm_contact(infos[key]):
+                fallback[key] = text[:CONTACT_HEADER_CHARS]
+
+        if fallback:
+            print(f"DEBUG: Triggering batched AI Extraction for {len(fallback)} resumes...")
+            extracted = RAGService.extract_with_llm_batch(fallback)
+            for key, header_text in fallback.items():
+                if key not in extracted:
+                    print(f"DEBUG: No usable batched answer for {key}, retrying alone")
+                    extracted[key] = RAGService.extract_with_llm(header_text)
+                try:
+                    RAGService._merge_llm_contact(infos[key], extracted[key])
+                except Exception as e:
+                    print(f"DEBUG: AI Failed: {e}")
+
+        return {key: RAGService._finish_contact(infos[key], filename) for key, _, filename in items}
+
+    @staticmethod
+    def _heuristic_contact(text):
+        # 1-2. Local extraction: email, phone, profile URLs, name, experience dates
+        info = profile_extractor.extract(text)
+        for key in ("email", "name", "phone", "linkedin", "github"):
+            if key in info["sources"]:
+                print(f"DEBUG: {key.title()} found ({info['sources'][key]}): {info[key]}")
+        return info
+
+    @staticmethod
+    def _needs_llm_contact(info):
+        return not info["email"] or info["name"] == "Unknown Candidate"
+
+    @staticmethod
+    def _merge_llm_contact(info, ai_extracted):
+        if ai_extracted.get("name") and ai_extracted["name"] not in ["Unknown", "Null", None]:
+            info["name"] = ai_extracted["name"]
+            info.setdefault("sources", {})["name"] = "llm"
+            print(f"DEBUG: AI Name found: {info['name']}")
+        if ai_extracted.get("email") and not info["email"]:
+            info["email"] = ai_extracted["email"]
+            info.setdefault("sources", {})["email"] = "llm"
+            print(f"DEBUG: AI Email found: {info['email']}")
+
+    @staticmethod
+    def _finish_contact(info, filename):
         # 4. Filename Fallback
         print(f"DEBUG: Name before fallback: {info['name']}")
         if info["name"] in ["Unknown Candidate", "Resume", "Cv", "Curriculum Vitae"] and filename:
@@ -98,6 +186,7 @@ class RAGService:
             clean_name = re.sub(r'\bresume\b|\bcv\b|\bprofile\b', '', clean_name, flags=re.IGNORECASE).strip()
             if clean_name:
                 info["name"] = clean_name
+                info.setdefault("sources", {})["name"] = "filename"
                 print(f"DEBUG: Filename Fallback used. Name: {info['name']}")
             else:
                 print("DEBUG: Filename cleaned to empty string.")
@@ -115,18 +204,13 @@ class RAGService:
             return {}
 
         try:
-            return RAGService._inner_extract_with_llm(text_chunk, api_key)
+            return RAGService._inner_extract_with_llm(text_chunk)
         except Exception as e:
             print(f"DEBUG: Groq Extraction Exception after retries: {e}")
             return {}
 
     @staticmethod
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=2, max=10),
-        retry=retry_if_exception_type(requests.exceptions.HTTPError)
-    )
-    def _inner_extract_with_llm(text_chunk, api_key):
+    def _inner_extract_with_llm(text_chunk):
         prompt = f"""
         Extract the **Candidate Name** and **Email Address** from the text below.
         If email is not found, return null.
@@ -142,38 +226,156 @@ class RAGService:
         }}
         """
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        url = "https://api.groq.com/openai/v1/chat/completions" 
-        payload = {
-            "messages": [
-                {"role": "system", "content": "You are a data extraction assistant. Output valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            "model": "llama-3.1-8b-instant",
-            "temperature": 0.1,
-            "response_format": {"type": "json_object"}
-        }
-        
         # DEBUG
         print(f"DEBUG: Calling Groq for extraction on {len(text_chunk)} chars...")
-        
-        # Increased timeout to 15s
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
-        response.raise_for_status() # Trigger tenacity retry
-        
-        if response.status_code == 200:
-            content = response.json()['choices'][0]['message']['content']
-            print(f"DEBUG: Groq Response: {content}")
-            return json.loads(content)
-        
-        return {}
+        data = llm_client.chat_json("contact_extraction", [
+            {"role": "system", "content": "You are a data extraction assistant. Output valid JSON only."},
+            {"role": "user", "content": prompt}
+        ], read_timeout=15)
+        print(f"DEBUG: Groq Response: {data}")
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def extract_with_llm_batch(headers_by_key):
+        """
+        {key: header_text} -> {key: {"name", "email"}} for the keys Groq answered
+        usably. A failed request or a malformed item simply leaves keys out.
+        """
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key or not headers_by_key:
+            return {}
+
+        keys = list(headers_by_key)
+        extracted = {}
+        for start in range(0, len(keys), CONTACT_BATCH_SIZE):
+            # Short positional ids in the prompt; mapped back to keys here
+            group = {f"r{i}": key for i, key in enumerate(keys[start:start + CONTACT_BATCH_SIZE])}
+            snippets = {item_id: headers_by_key[key] for item_id, key in group.items()}
+            try:
+                data = RAGService._inner_extract_with_llm_batch(snippets)
+            except Exception as e:
+                print(f"DEBUG: Groq Batch Extraction Exception after retries: {e}")
+                continue
+
+            items = data.get("candidates") if isinstance(data, dict) else None
+            for item in items if isinstance(items, list) else []:
+                if not isinstance(item, dict) or item.get("id") not in group:
+                    continue
+                item_id = item["id"]
+                contact = RAGService._validated_contact(item, snippets[item_id])
+                if contact is not None:
+                    extracted[group[item_id]] = contact
+        return extracted
+
+    @staticmethod
+    def _validated_contact(item, header_text):
+        # Guards against answers attached to the wrong id: a returned email must
+        # appear in that item's own snippet. Returns None if unusable.
+        name, email = item.get("name"), item.get("email")
+        if name is not None and not isinstance(name, str):
+            return None
+        if email is not None:
+            if not isinstance(email, str) or not EMAIL_RE.fullmatch(email.strip()):
+                return None
+            if email.strip().lower() not in header_text.lower():
+                return None
+            email = email.strip()
+        return {"name": name, "email": email}
+
+    @staticmethod
+    def _inner_extract_with_llm_batch(snippets):
+        blocks = "\n\n".join(f"=== RESUME {item_id} ===\n{text}" for item_id, text in snippets.items())
+        prompt = f"""
+        Each block below is the top of a different resume, marked with its id.
+        For EVERY block, extract the **Candidate Name** and **Email Address**.
+        If email is not found, return null.
+        If name is not found, return null.
+        Never copy details from one block into another.
+
+        {blocks}
+
+        OUTPUT JSON ONLY:
+        {{
+            "candidates": [
+                {{"id": "r0", "name": "Full Name", "email": "email"}}
+            ]
+        }}
+        """
+
+        print(f"DEBUG: Calling Groq for batched extraction of {len(snippets)} resumes...")
+        return llm_client.chat_json("contact_extraction", [
+            {"role": "system", "content": "You are a data extraction assistant. Output valid JSON only."},
+            {"role": "user", "content": prompt}
+        ])
+
+    @staticmethod
+    def extract_jd_skills(jd_text):
+        """
+        Uses Groq once per JD to split its skills into required vs preferred.
+        """
+        empty = {"required_skills": [], "preferred_skills": []}
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            return empty
+
+        try:
+            data = RAGService._inner_extract_jd_skills(jd_text)
+        except Exception as e:
+            print(f"DEBUG: Groq JD Skill Extraction Exception after retries: {e}")
+            return empty
+        return {
+            "required_skills": [str(x) for x in data.get("required_skills") or []],
+            "preferred_skills": [str(x) for x in data.get("preferred_skills") or []]
+        }
+
+    @staticmethod
+    def _inner_extract_jd_skills(jd_text):
+        prompt = f"""
+        List the skills requested by the Job Description below.
+        "required_skills": must-have skills, tools and qualifications.
+        "preferred_skills": nice-to-have / bonus skills.
+        Use short canonical names (e.g. "Python", "Kubernetes", "REST APIs").
+
+        JOB DESCRIPTION:
+        {jd_text[:8000]}
+
+        OUTPUT JSON ONLY:
+        {{
+            "required_skills": ["Skill A"],
+            "preferred_skills": ["Skill B"]
+        }}
+        """
+
+        return llm_client.chat_json("jd_skills", [
+            {"role": "system", "content": "You are a data extraction assistant. Output valid JSON only."},
+            {"role": "user", "content": prompt}
+        ])
+
+    @staticmethod
+    def build_jd_brief(jd):
+        """
+        Compact JD block for the screening prompt, built from registry artifacts
+        (normalized title + extracted skills + description capped at JD_PROMPT_CHARS).
+        """
+        lines = [f"ROLE: {jd.get('title') or 'N/A'}"]
+        if jd.get("required_skills"):
+            lines.append(f"REQUIRED SKILLS: {', '.join(jd['required_skills'])}")
+        if jd.get("preferred_skills"):
+            lines.append(f"PREFERRED SKILLS: {', '.join(jd['preferred_skills'])}")
+        lines.append("DESCRIPTION:")
+        lines.append(jd["description"][:JD_PROMPT_CHARS])
+        return "\n".join(lines)
+
+    @staticmethod
+    def iter_chunks(text, token_budget=chunking.CHUNK_TOKEN_BUDGET):
+        # Section-aware chunks used for ingest (see services/chunking.py)
+        return chunking.iter_chunks(text, token_budget)
 
     @staticmethod
     def chunk_text(text, chunk_size=500, overlap=50):
+        # Legacy fixed-size windows (kept for benchmarks/comparison)
+        if overlap >= chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
         chunks = []
         start = 0
         while start < len(text):
@@ -183,47 +385,170 @@ class RAGService:
         return chunks
 
     @staticmethod
-    def ingest_resume(user_id, resume_id, file_path):
+    def ingest_resume(user_id, resume_id, file_path, parsed=None):
         """
-        1. Extract Text
+        1. Extract Text (skipped when an already ParsedResume is passed)
         2. Chunk & Embed -> Store in ChromaDB
         """
-        full_text = RAGService.extract_text_from_pdf(file_path)
-        
-        # Chunking
-        chunks = RAGService.chunk_text(full_text)
-        ids = [f"{resume_id}_{i}" for i in range(len(chunks))]
-        metadatas = [{"resume_id": str(resume_id), "chunk_index": i} for i in range(len(chunks))]
-
-        # Add to Chroma
-        collection.add(
-            documents=chunks,
-            ids=ids,
-            metadatas=metadatas
-        )
-        
+        if parsed is None:
+            parsed = RAGService.parse_resume(file_path)
+        RAGService.ingest_batch([(resume_id, parsed)])
         return resume_id
 
     @staticmethod
-    def screen_resume(jd_text, resume_id, resume_context=""):
+    def embed_texts(texts, batch_size=EMBED_BATCH_SIZE):
+        return embeddings.encode(texts, batch_size=batch_size)
+
+    @staticmethod
+    def ingest_batch(items, batch_size=EMBED_BATCH_SIZE):
+        """
+        Chunks every (resume_id, ParsedResume) in a screening batch, encodes all
+        chunks together in batch_size batches and writes them with one bulk upsert.
+        Returns {resume_id: chunk_count}.
+        """
+        documents, ids, metadatas = [], [], []
+        counts = {}
+        now = int(time.time())
+        embedder = embeddings.embedder_tag()
+        for resume_id, parsed in items:
+            if resume_id in counts:
+                continue # Same file twice in one batch: Chroma rejects duplicate ids
+            chunks = list(RAGService.iter_chunks(parsed.text))
+            counts[resume_id] = len(chunks)
+            documents.extend(chunks)
+            ids.extend(f"{resume_id}_{i}" for i in range(len(chunks)))
+            metadatas.extend(
+                {"resume_id": str(resume_id), "chunk_index": i, "last_seen_at": now,
+                 "embedder": embedder, "chunker": chunking.CHUNKER_VERSION}
+                for i in range(len(chunks))
+            )
+
+        if not documents:
+            return counts
+
+        vectors = RAGService.embed_texts(documents, batch_size=batch_size)
+
+        # Re-ingest replaces: drop the previous chunk set first so a shorter
+        # text does not leave stale tail chunks behind.
+        RAGService.delete_resume_chunks(list(counts))
+
+        # Upsert to Chroma (ids are stable per resume_id, so re-ingest replaces instead of colliding).
+        # One call per batch; only split if Chroma's own max batch size is exceeded.
+        max_batch = get_chroma_client().get_max_batch_size()
+        for start in range(0, len(ids), max_batch):
+            end = start + max_batch
+            get_collection().upsert(
+                ids=ids[start:end],
+                embeddings=vectors[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+        return counts
+
+    @staticmethod
+    def resume_vectors(resume_ids):
+        """
+        Mean-pooled, L2-normalized chunk embedding per resume_id, read back from
+        Chroma with one query. Resumes without chunks are omitted.
+        """
+        if not resume_ids:
+            return {}
+        stored = get_collection().get(
+            where={"resume_id": {"$in": [str(r) for r in resume_ids]}},
+            include=["embeddings", "metadatas"]
+        )
+        return RAGService.pool_by(stored["embeddings"], stored["metadatas"], "resume_id")
+
+    @staticmethod
+    def pool_by(chunk_embeddings, metadatas, key):
+        # Mean-pool + L2-normalize chunk embeddings grouped by a metadata key
+        grouped = {}
+        for emb, meta in zip(chunk_embeddings, metadatas):
+            grouped.setdefault(meta[key], []).append(emb)
+
+        vectors = {}
+        for group, embs in grouped.items():
+            mean = np.asarray(embs, dtype=np.float32).mean(axis=0)
+            norm = np.linalg.norm(mean)
+            vectors[group] = mean / norm if norm else mean
+        return vectors
+
+    @staticmethod
+    def has_chunks(resume_id):
+        # Chunks from a different backend or chunker version count as missing (rebuilt on ingest)
+        existing = get_collection().get(
+            where={"$and": [
+                {"resume_id": str(resume_id)},
+                {"embedder": embeddings.embedder_tag()},
+                {"chunker": chunking.CHUNKER_VERSION}
+            ]},
+            limit=1, include=[]
+        )
+        return bool(existing["ids"])
+
+    @staticmethod
+    def delete_resume_chunks(resume_ids):
+        if resume_ids:
+            get_collection().delete(where={"resume_id": {"$in": [str(r) for r in resume_ids]}})
+
+    @staticmethod
+    def link_candidates(links):
+        """
+        Tags the chunks of each resume with the candidate it was saved to
+        ({resume_id: candidate_id}) and refreshes last_seen_at for retention.
+        Chunks from a candidate's previous resume are dropped.
+        """
+        if not links:
+            return
+        links = {str(r): int(c) for r, c in links.items()}
+        now = int(time.time())
+
+        stale = get_collection().get(
+            where={"candidate_id": {"$in": list(set(links.values()))}},
+            include=["metadatas"]
+        )
+        old_ids = [cid for cid, meta in zip(stale["ids"], stale["metadatas"]) if meta["resume_id"] not in links]
+        if old_ids:
+            get_collection().delete(ids=old_ids)
+
+        current = get_collection().get(where={"resume_id": {"$in": list(links)}}, include=["metadatas", "embeddings"])
+        if not current["ids"]:
+            return
+        metadatas = [
+            {**meta, "candidate_id": links[meta["resume_id"]], "last_seen_at": now}
+            for meta in current["metadatas"]
+        ]
+        max_batch = get_chroma_client().get_max_batch_size()
+        for start in range(0, len(metadatas), max_batch):
+            end = start + max_batch
+            get_collection().update(ids=current["ids"][start:end], metadatas=metadatas[start:end])
+
+        # Keep the whole-pool index in step with the candidate's current resume
+        candidate_index.get_index().upsert(RAGService.pool_by(current["embeddings"], metadatas, "candidate_id"))
+
+    @staticmethod
+    def delete_candidate_chunks(candidate_ids):
+        if candidate_ids:
+            get_collection().delete(where={"candidate_id": {"$in": [int(c) for c in candidate_ids]}})
+            candidate_index.get_index().remove(candidate_ids)
+
+    @staticmethod
+    def screen_resume(jd, resume_id, resume_context="", cache_info=None):
         """
         Ingests strict context and scores.
+        jd is a registry artifact dict (see services.jd_registry.to_artifacts);
+        it was validated once at creation.
+        Consults the screening cache first; pass cache_info={} to learn whether it hit.
         """
-        # 0. Validate JD
-        clean_jd = jd_text.strip()
-        if len(clean_jd) < 15 or len(clean_jd.split()) < 3:
-             return {
-                "score": 0, 
-                "reasoning": "Job Description is too vague or invalid (Text too short). Please provide a detailed description.", 
-                "key_skills_match": [],
-                "missing_skills": []
-            }
+        jd_text = jd["description"]
 
         # 1. Fallback to Chroma if context is empty
         if not resume_context:
             print("Fallback to Chroma Chunks...")
-            results = collection.query(
-                query_texts=[jd_text],
+            # Reuse the JD embedding computed at registry creation
+            query = {"query_embeddings": [jd["embedding"]]} if jd.get("embedding") else {"query_texts": [jd_text]}
+            results = get_collection().query(
+                **query,
                 n_results=10, # Increase chunks to get more context
                 where={"resume_id": str(resume_id)}
             )
@@ -231,20 +556,32 @@ class RAGService:
                 return {"score": 0, "reasoning": "No context found", "key_skills_match": [], "missing_skills": []}
             matched_chunks = results['documents'][0]
             resume_context = "\n".join(matched_chunks)
+        else:
+            # Full resume text: keep the header/education + most JD-relevant chunks under the token budget
+            resume_context, context_stats = screening_context.build_context(resume_context, jd.get("embedding"))
+            if context_stats["kept"] is not None:
+                print(f"DEBUG: Screening context for {resume_id}: {context_stats['kept']}/{context_stats['chunks']} chunks, "
+                      f"~{context_stats['tokens']}/{context_stats['full_tokens']} tokens")
+
+        # 2. Screening cache (same resume text + JD + model + rubric => same score)
+        resume_hash = screening_cache.hash_text(resume_context)
+        jd_hash = jd["content_hash"]
+        cached = screening_cache.get(resume_hash, jd_hash, SCREENING_MODEL, SCREENING_PROMPT_VERSION)
+        if cache_info is not None:
+            cache_info["hit"] = cached is not None
+        if cached is not None:
+            return cached
         
         # 3. Call Groq API with context
         api_key = os.getenv("GROQ_API_KEY")
-        return RAGService.call_groq_api(jd_text, resume_context, api_key)
+        analysis = RAGService.call_groq_api(RAGService.build_jd_brief(jd), resume_context, api_key)
+        screening_cache.put(resume_hash, jd_hash, SCREENING_MODEL, SCREENING_PROMPT_VERSION, analysis)
+        return analysis
 
     @staticmethod
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=2, max=10),
-        retry=retry_if_exception_type(requests.exceptions.HTTPError)
-    )
     def call_groq_api(jd, resume_context, api_key):
         if not api_key:
-            return {"score": 0, "reasoning": "Missing API Key", "key_skills_match": [], "missing_skills": []}
+            return {"score": 0, "reasoning": "Missing API Key", "key_skills_match": [], "missing_skills": [], "ai_failed": True}
             
         prompt = f"""
         Act as a Senior Technical Recruiter evaluation engine.
@@ -259,7 +596,7 @@ class RAGService:
         Evaluate the candidate against the Job Description using the EXACT scoring rubric below.
         
         SCORING LOGIC (Total 100%):
-        1. Skills Matching (40%): Extract required skills from JD and compare with resume (semantic + keyword). Score = (matched/total) * 40.
+        1. Skills Matching (40%): Use the REQUIRED SKILLS listed above (or extract them from the description if absent) and compare with resume (semantic + keyword). Score = (matched/total) * 40.
         2. Experience Relevance (25%): Compare years of experience and role relevance. Full match = 25. Partial = proportional. No match = 0.
         3. Project / Role Alignment (20%): Analyze project complexity and impact vs JD responsibilities.
         4. Education Match (10%): Full match (meets req) = 10. Related degree = 6-8. Unrelated/Missing = 0-4.
@@ -289,34 +626,12 @@ class RAGService:
         }}
         """
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         try:
-            url = "https://api.groq.com/openai/v1/chat/completions" 
-            payload = {
-                "messages": [
-                    {"role": "system", "content": "You are a helpful and accurate recruitment assistant. You only output valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "model": "llama-3.1-8b-instant",
-                "temperature": 0.1,
-                "response_format": {"type": "json_object"}
-            }
-            
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status() 
-            
-            data = response.json()
-            content = data['choices'][0]['message']['content']
-            
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                content = content.replace("```json", "").replace("```", "").strip()
-                return json.loads(content)
+            # Latency / token usage are logged and counted by llm_client
+            return llm_client.chat_json("screening", [
+                {"role": "system", "content": "You are a helpful and accurate recruitment assistant. You only output valid JSON."},
+                {"role": "user", "content": prompt}
+            ])
             
         except Exception as e:
             print(f"Groq API Error: {e}")
@@ -324,5 +639,6 @@ class RAGService:
                 "score": 0, 
                 "reasoning": f"AI Analysis Failed: {str(e)}",
                 "key_skills_match": [],
-                "missing_skills": []
+                "missing_skills": [],
+                "ai_failed": True # Never cached
             }
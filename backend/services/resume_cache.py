@@ -0,0 +1,66 @@
+import database
+import models
+from sqlalchemy.exc import IntegrityError
+
+# Content-addressed resume cache (ResumeDocument rows keyed by SHA-256 of the file bytes).
+# Called from screening worker threads, so every call opens its own short-lived session.
+
+def _to_dict(doc):
+    return {
+        "sha256": doc.sha256,
+        "filename": doc.filename,
+        "full_text": doc.full_text or "",
+        "page_count": doc.page_count or 0,
+        "contact_info": doc.contact_info or {}
+    }
+
+def lookup(sha256: str):
+    """
+    Returns the cached document as a dict (and bumps its hit counter), or None.
+    """
+    db = database.SessionLocal()
+    try:
+        doc = db.query(models.ResumeDocument).filter(models.ResumeDocument.sha256 == sha256).first()
+        if not doc:
+            return None
+        doc.hit_count = (doc.hit_count or 0) + 1
+        data = _to_dict(doc)
+        db.commit()
+        return data
+    finally:
+        db.close()
+
+def store(parsed, filename: str, contact_info: dict):
+    """
+    Saves text + contact info for a freshly parsed resume.
+    Concurrent duplicates are ignored. Scores live in screening_cache.
+    """
+    db = database.SessionLocal()
+    try:
+        doc = models.ResumeDocument(
+            sha256=parsed.sha256,
+            filename=filename,
+            full_text=parsed.text,
+            page_count=len(parsed.pages),
+            contact_info=contact_info
+        )
+        db.add(doc)
+        db.commit()
+    except IntegrityError:
+        # Same bytes uploaded twice in one batch: the other worker already stored it
+        db.rollback()
+    finally:
+        db.close()
+
+def update_contact(sha256: str, contact_info: dict):
+    """
+    Replaces the cached contact info (a later extraction found what the first missed).
+    """
+    db = database.SessionLocal()
+    try:
+        db.query(models.ResumeDocument).filter(
+            models.ResumeDocument.sha256 == sha256
+        ).update({"contact_info": contact_info}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+import os
+import hashlib
+import database
+import models
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+# Persistent LRU cache of Groq screening results.
+# Key = (resume text hash, normalized JD hash, model name, prompt version), so a
+# rubric change (new prompt version) can never serve a stale score.
+SCREENING_CACHE_MAX_ENTRIES = int(os.getenv("SCREENING_CACHE_MAX_ENTRIES", 5000))
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def make_key(resume_hash: str, jd_hash: str, model: str, prompt_version: str) -> str:
+    return hash_text("|".join([resume_hash, jd_hash, model, prompt_version]))
+
+def get(resume_hash: str, jd_hash: str, model: str, prompt_version: str):
+    """
+    Returns the cached analysis dict (refreshing its LRU position), or None.
+    """
+    db = database.SessionLocal()
+    try:
+        key = make_key(resume_hash, jd_hash, model, prompt_version)
+        entry = db.query(models.ScreeningCacheEntry).filter(models.ScreeningCacheEntry.cache_key == key).first()
+        if not entry:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = func.now()
+        analysis = dict(entry.analysis)
+        db.commit()
+        return analysis
+    finally:
+        db.close()
+
+def put(resume_hash: str, jd_hash: str, model: str, prompt_version: str, analysis: dict):
+    """
+    Stores a successful analysis, then evicts least-recently-used entries over the cap.
+    """
+    if not analysis or analysis.get("ai_failed"):
+        return
+    db = database.SessionLocal()
+    try:
+        db.add(models.ScreeningCacheEntry(
+            cache_key=make_key(resume_hash, jd_hash, model, prompt_version),
+            resume_hash=resume_hash,
+            jd_hash=jd_hash,
+            model=model,
+            prompt_version=prompt_version,
+            analysis=analysis
+        ))
+        db.commit()
+        _evict(db)
+    except IntegrityError:
+        # Another worker screened the same pair concurrently
+        db.rollback()
+    finally:
+        db.close()
+
+def _evict(db):
+    overflow = db.query(models.ScreeningCacheEntry).count() - SCREENING_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return
+    oldest = db.query(models.ScreeningCacheEntry.cache_key)\
+        .order_by(models.ScreeningCacheEntry.last_used_at.asc())\
+        .limit(overflow).all()
+    keys = [k[0] for k in oldest]
+    db.query(models.ScreeningCacheEntry)\
+        .filter(models.ScreeningCacheEntry.cache_key.in_(keys))\
+        .delete(synchronize_session=False)
+    db.commit()
+    print(f"Screening cache: evicted {len(keys)} LRU entries")
+
+def invalidate(keep_prompt_version: str = None):
+    """
+    Drops cached results. With keep_prompt_version, only entries produced by
+    other (older) rubric versions are removed. Returns the number deleted.
+    """
+    db = database.SessionLocal()
+    try:
+        query = db.query(models.ScreeningCacheEntry)
+        if keep_prompt_version:
+            query = query.filter(models.ScreeningCacheEntry.prompt_version != keep_prompt_version)
+        deleted = query.delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+def stats():
+    db = database.SessionLocal()
+    try:
+        entries, hits = db.query(
+            func.count(models.ScreeningCacheEntry.cache_key),
+            func.coalesce(func.sum(models.ScreeningCacheEntry.hit_count), 0)
+        ).one()
+        versions = db.query(
+            models.ScreeningCacheEntry.prompt_version,
+            func.count(models.ScreeningCacheEntry.cache_key)
+        ).group_by(models.ScreeningCacheEntry.prompt_version).all()
+        return {
+            "entries": entries,
+            "max_entries": SCREENING_CACHE_MAX_ENTRIES,
+            "total_hits": int(hits),
+            "by_prompt_version": {v: c for v, c in versions}
+        }
+    finally:
+        db.close()
@@ -0,0 +1,72 @@
+import os
+import re
+import numpy as np
+from services import chunking, embeddings
+
+# Resume context for the screening prompt, built under a token budget.
+# Resumes that fit are sent whole. Longer ones are cut down to the contact
+# header and education section (always kept) plus the section-aware chunks
+# most similar to the JD embedding, re-assembled in resume order, instead of
+# blindly truncating the tail. Chunk vectors come from the embedding cache
+# (they were computed at ingest), so this adds no model work on the hot path.
+SCREENING_CONTEXT_TOKENS = int(os.getenv("SCREENING_CONTEXT_TOKENS", 1800)) # 0 = send the whole resume
+PINNED_SECTIONS = ("education", "academic", "qualification")
+LABEL_RE = re.compile(r"^([A-Za-z][A-Za-z &/]{1,38}):\s")
+
+def _is_pinned(index: int, chunk: str) -> bool:
+    # First chunk = name/contact header; education chunks carry an "EDUCATION: " label
+    if index == 0:
+        return True
+    for line in chunk.splitlines():
+        match = LABEL_RE.match(line)
+        if match and match.group(1).strip().lower().startswith(PINNED_SECTIONS):
+            return True
+    return False
+
+def _head(chunks, token_budget: int):
+    # No JD vector: keep chunks in order until the budget runs out
+    picked, used = [], 0
+    for i, chunk in enumerate(chunks):
+        cost = chunking.estimate_tokens(chunk)
+        if used + cost > token_budget:
+            break
+        picked.append(i)
+        used += cost
+    return picked
+
+def build_context(text: str, jd_embedding=None, token_budget: int = SCREENING_CONTEXT_TOKENS):
+    """
+    -> (context, stats). stats = {"tokens", "full_tokens", "chunks", "kept"}.
+    """
+    full_tokens = chunking.estimate_tokens(text)
+    if token_budget <= 0 or full_tokens <= token_budget:
+        return text, {"tokens": full_tokens, "full_tokens": full_tokens, "chunks": None, "kept": None}
+
+    chunks = list(chunking.iter_chunks(text))
+    costs = [chunking.estimate_tokens(c) for c in chunks]
+
+    if jd_embedding is None:
+        picked = _head(chunks, token_budget)
+    else:
+        jd_vec = np.asarray(jd_embedding, dtype=np.float32)
+        jd_vec = jd_vec / (np.linalg.norm(jd_vec) or 1.0)
+        vectors = np.asarray(embeddings.encode(chunks), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        scores = vectors @ jd_vec
+
+        pinned = [i for i, c in enumerate(chunks) if _is_pinned(i, c)]
+        rest = sorted(set(range(len(chunks))) - set(pinned), key=lambda i: -scores[i])
+        picked, used = [], 0
+        for i in pinned + rest:
+            if used + costs[i] <= token_budget:
+                picked.append(i)
+                used += costs[i]
+
+    picked.sort()
+    context = "\n".join(chunks[i] for i in picked)
+    return context, {
+        "tokens": sum(costs[i] for i in picked),
+        "full_tokens": full_tokens,
+        "chunks": len(chunks),
+        "kept": len(picked)
+    }
@@ -0,0 +1,174 @@
+import os
+import uuid
+import time
+import database
+import models
+from datetime import datetime, timedelta
+from services import screening_service
+
+# Jobs run in-process (BackgroundTasks), so a restart kills them mid-run. A
+# queued/running job whose heartbeat (refreshed on every progress write) is
+# older than this is marked failed, at startup and when it is polled.
+SCREENING_JOB_STALE_SECONDS = int(os.getenv("SCREENING_JOB_STALE_SECONDS", 600))
+ACTIVE_STATUSES = (models.ScreeningJobStatus.queued, models.ScreeningJobStatus.running)
+
+# Keys stripped from per-file results before they are stored on the job row.
+# full_text already lives on the Candidate record.
+_HEAVY_KEYS = ("full_text",)
+
+def _slim(data: dict) -> dict:
+    return {k: v for k, v in data.items() if k not in _HEAVY_KEYS}
+
+def create_job(db, saved_files, jd, rejected=None):
+    """
+    Registers a screening job with one 'queued' progress entry per saved file
+    (files[i] is saved_files[i]). Files rejected at upload time are recorded
+    as already failed, after them.
+    """
+    rejected = rejected or []
+    files = [{"file": name, "status": "queued"} for _, name in saved_files]
+    files += [{"file": r["file"], "status": "failed", "error": r.get("error")} for r in rejected]
+
+    job = models.ScreeningJob(
+        id=str(uuid.uuid4()),
+        status=models.ScreeningJobStatus.queued,
+        role=jd.normalized_title,
+        job_description_id=jd.id,
+        job_description=jd.description,
+        total_files=len(files),
+        processed_files=len(rejected),
+        failed_files=len(rejected),
+        files=files,
+        heartbeat_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def run_job(job_id: str, saved_files, jd: dict, shortlist_size: int = None, min_similarity: float = None):
+    """
+    Background runner: fans files out to the shared screening pool, records
+    per-file progress as each one finishes, then persists candidates.
+    jd is the registry artifact dict (services.jd_registry.to_artifacts).
+    Uses its own DB session since it outlives the request.
+    """
+    db = database.SessionLocal()
+    start_total = time.time()
+    try:
+        job = db.query(models.ScreeningJob).filter(models.ScreeningJob.id == job_id).first()
+        if not job:
+            print(f"Screening job {job_id} vanished before start.")
+            return
+
+        job.status = models.ScreeningJobStatus.running
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        db.commit()
+
+        print(f"--- START SCREENING JOB {job_id}: {len(saved_files)} files ---")
+        processed_data = []
+        for data in screening_service.iter_screening_results(
+            saved_files, jd, shortlist_size=shortlist_size, min_similarity=min_similarity,
+            on_stage=lambda stage, rows: _record_stage(db, job, stage, rows)
+        ):
+            processed_data.append(data)
+            _record_progress(db, job, data)
+
+        rows = screening_service.persist_screening_results(db, processed_data, jd["title"])
+
+        # Final per-file outcome (persist may fail rows, e.g. missing email)
+        files = [dict(f) for f in job.files]
+        for row in rows:
+            entry = _find_entry(files, row)
+            if entry is not None:
+                entry["status"] = row["status"]
+                entry["error"] = row.get("error")
+                if row.get("candidate"):
+                    entry["candidate_id"] = row["candidate"]["id"]
+
+        job.files = files
+        job.results = [_slim(r) for r in rows]
+        job.failed_files = sum(1 for f in files if f["status"] == "failed")
+        job.status = models.ScreeningJobStatus.completed
+        job.finished_at = job.heartbeat_at = datetime.utcnow()
+        db.commit()
+        print(f"--- SCREENING JOB {job_id} COMPLETE in {time.time() - start_total:.2f}s ---")
+
+    except Exception as e:
+        print(f"Screening job {job_id} failed: {e}")
+        db.rollback()
+        job = db.query(models.ScreeningJob).filter(models.ScreeningJob.id == job_id).first()
+        if job:
+            job.status = models.ScreeningJobStatus.failed
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
+def _find_entry(files, data):
+    # Entries are positional (create_job), so same-named uploads stay apart
+    index = data.get("upload_index")
+    return files[index] if index is not None and 0 <= index < len(files) else None
+
+def _record_stage(db, job, stage, rows):
+    # Files still in the pipeline move through the batch stages; failures are recorded when yielded
+    files = [dict(f) for f in job.files]
+    for data in rows:
+        entry = _find_entry(files, data)
+        if entry is not None and data["status"] == "prepared":
+            entry["status"] = stage
+            if data.get("similarity") is not None:
+                entry["similarity"] = data["similarity"]
+    job.files = files
+    job.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+def _record_progress(db, job, data):
+    # Reassign the JSON column so SQLAlchemy sees the change
+    files = [dict(f) for f in job.files]
+    entry = _find_entry(files, data)
+    if entry is not None:
+        entry["status"] = data["status"]
+        entry["score"] = data.get("score", 0)
+        entry["shortlisted"] = data.get("shortlisted")
+        entry["similarity"] = data.get("similarity")
+        entry["error"] = data.get("error")
+        entry["total_time"] = data.get("total_time")
+
+    job.files = files
+    job.processed_files = (job.processed_files or 0) + 1
+    if data["status"] == "failed":
+        job.failed_files = (job.failed_files or 0) + 1
+    job.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+def _is_stale(job, cutoff) -> bool:
+    return job.status in ACTIVE_STATUSES and (job.heartbeat_at is None or job.heartbeat_at < cutoff)
+
+def _mark_interrupted(job):
+    job.status = models.ScreeningJobStatus.failed
+    job.error = f"Interrupted: no progress for {SCREENING_JOB_STALE_SECONDS}s (server restarted?)"
+    job.finished_at = datetime.utcnow()
+
+def fail_stale_jobs(db):
+    """
+    Marks queued/running jobs with no recent heartbeat as failed (their
+    worker died with the process). Returns how many were marked.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=SCREENING_JOB_STALE_SECONDS)
+    active = db.query(models.ScreeningJob).filter(models.ScreeningJob.status.in_([s.value for s in ACTIVE_STATUSES])).all()
+    stale = [job for job in active if _is_stale(job, cutoff)]
+    for job in stale:
+        _mark_interrupted(job)
+    db.commit()
+    if stale:
+        print(f"Marked {len(stale)} interrupted screening job(s) as failed")
+    return len(stale)
+
+def get_job(db, job_id: str):
+    job = db.query(models.ScreeningJob).filter(models.ScreeningJob.id == job_id).first()
+    if job and _is_stale(job, datetime.utcnow() - timedelta(seconds=SCREENING_JOB_STALE_SECONDS)):
+        _mark_interrupted(job)
+        db.commit()
+    return job
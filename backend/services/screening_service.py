@@ -0,0 +1,612 @@
+import os
+import time
+import shutil
+import hashlib
+import concurrent.futures
+import numpy as np
+from sqlalchemy import func
+import database
+import models
+from services.rag_service import RAGService, ParsedResume
+from services import resume_cache
+
+# Shared worker pool for resume processing (Parse + Extract + Groq).
+# Sized by SCREENING_WORKERS so throughput is a config decision, not a request timeout.
+SCREENING_WORKERS = int(os.getenv("SCREENING_WORKERS", 4))
+# Uploads run through the batch stages (ingest, pre-rank, extraction) together; 0 = whole batch.
+SCREENING_CHUNK_FILES = int(os.getenv("SCREENING_CHUNK_FILES", 16))
+UPLOAD_DIR = "media/resumes"
+MAX_CANDIDATES = 50
+
+_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=SCREENING_WORKERS,
+    thread_name_prefix="screening"
+)
+
+def check_candidate_capacity(db, incoming: int):
+    """
+    Returns an error payload if the upload would exceed MAX_CANDIDATES, else None.
+    """
+    candidate_count = db.query(models.Candidate).count()
+
+    if candidate_count >= MAX_CANDIDATES:
+        return {"message": f"Candidate limit ({MAX_CANDIDATES}) reached.", "status": "limit_exceeded"}
+
+    if candidate_count + incoming > MAX_CANDIDATES:
+        allowed = MAX_CANDIDATES - candidate_count
+        return {"message": f"Upload exceeds limit. Allow {allowed} more.", "status": "limit_exceeded"}
+    return None
+
+def save_uploads(files, upload_dir: str = UPLOAD_DIR):
+    """
+    Writes uploaded files to disk (Fast IO).
+    Returns (saved_files, rejected) where saved_files is [(path, filename)].
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    saved_files = []
+    rejected = []
+
+    for file in files:
+        if not file.filename.lower().endswith(('.pdf', '.docx', '.doc')):
+            rejected.append({"file": file.filename, "error": "Unsupported format.", "status": "failed"})
+            continue
+
+        file_location = f"{upload_dir}/{file.filename}"
+        with open(file_location, "wb+") as file_object:
+            shutil.copyfileobj(file.file, file_object)
+
+        saved_files.append((file_location, file.filename))
+    return saved_files, rejected
+
+def _new_result(filename: str):
+    return {
+        "file": filename,
+        "status": "failed",
+        "error": None,
+        "score": 0,
+        "reasoning": "N/A",
+        "analysis": {},
+        "candidate_info": {},
+        "timings": {},
+        "cache": {"document": False, "score": False}
+    }
+
+def _cached_contact(cached):
+    """
+    Contact info from a resume cache hit, or None when it has no email (the
+    first extraction missed it): such resumes are extracted again.
+    """
+    contact = (cached or {}).get("contact_info") or {}
+    return dict(contact) if contact.get("email") else None
+
+def prepare_resume(file_path: str, filename: str):
+    """
+    Stage 1 (worker): hash bytes -> dedup cache lookup -> parse on a miss.
+    Leaves working state under result["_work"] for the later stages.
+    Does NOT touch shared DB sessions (the cache opens its own).
+    """
+    result = _new_result(filename)
+    work = {"started": time.time(), "file_path": file_path, "parsed": None, "cached": None, "needs_ingest": False}
+    result["_work"] = work
+
+    try:
+        # 0. Content-addressed lookup
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        file_hash = hashlib.sha256(raw).hexdigest()
+        result["file_hash"] = file_hash
+
+        cached = resume_cache.lookup(file_hash)
+        if cached:
+            result["cache"]["document"] = True
+            work["cached"] = cached
+            work["parsed"] = ParsedResume(file_path=file_path, text=cached["full_text"], sha256=file_hash)
+            # Chunks live in Chroma under the same hash; re-embed only if they were purged
+            work["needs_ingest"] = not RAGService.has_chunks(file_hash)
+        else:
+            # 1. Parse once (pypdf is the CPU-heavy step)
+            t0 = time.time()
+            work["parsed"] = RAGService.parse_resume(file_path, raw=raw)
+            result["timings"]["parse"] = time.time() - t0
+            work["needs_ingest"] = True
+        result["status"] = "prepared"
+
+    except Exception as e:
+        print(f"Error preparing {filename}: {e}")
+        result["error"] = str(e)
+    return result
+
+def ingest_prepared(prepared):
+    """
+    Stage 2 (coordinator): embeds the chunks of every prepared resume that needs
+    ingest in cross-resume batches and bulk-upserts them into Chroma.
+    Byte-identical uploads share a file_hash and are ingested once. If the batch
+    fails, each resume is retried on its own so one bad file fails alone.
+    Elapsed time is apportioned to each file by its chunk count.
+    """
+    pending = [r for r in prepared if r["status"] == "prepared" and r["_work"]["needs_ingest"]]
+    if not pending:
+        return
+
+    unique = {}
+    for r in pending:
+        unique.setdefault(r["file_hash"], r["_work"]["parsed"])
+
+    t0 = time.time()
+    try:
+        counts = RAGService.ingest_batch(list(unique.items()))
+    except Exception as e:
+        print(f"Batch ingest failed ({e}); ingesting resumes one by one")
+        counts, errors = {}, {}
+        for file_hash, parsed in unique.items():
+            try:
+                counts.update(RAGService.ingest_batch([(file_hash, parsed)]))
+            except Exception as single_error:
+                errors[file_hash] = single_error
+        for r in pending:
+            if r["file_hash"] in errors:
+                r["status"] = "failed"
+                r["error"] = f"Ingest failed: {errors[r['file_hash']]}"
+    elapsed = time.time() - t0
+
+    total_chunks = sum(counts.values()) or 1
+    for r in pending:
+        r["timings"]["ingest"] = elapsed * counts.get(r["file_hash"], 0) / total_chunks
+    print(f"Ingested {total_chunks} chunks from {len(unique)} resumes in {elapsed:.2f}s")
+
+def prerank_prepared(prepared, jd: dict, shortlist_size: int = None, min_similarity: float = None):
+    """
+    Stage 2.5 (coordinator): cosine similarity of every prepared resume's mean
+    chunk embedding to the JD embedding. Only the top shortlist_size and/or
+    those >= min_similarity go on to the Groq stage; with neither set, all do.
+    """
+    ready = [r for r in prepared if r["status"] == "prepared"]
+    for r in ready:
+        r["_work"]["shortlisted"] = True
+    if not ready or not jd.get("embedding") or (shortlist_size is None and min_similarity is None):
+        return
+
+    vectors = RAGService.resume_vectors([r["file_hash"] for r in ready])
+    jd_vec = np.asarray(jd["embedding"], dtype=np.float32)
+    jd_vec = jd_vec / (np.linalg.norm(jd_vec) or 1.0)
+
+    for r in ready:
+        vec = vectors.get(r["file_hash"])
+        r["similarity"] = round(float(vec @ jd_vec), 4) if vec is not None else 0.0
+
+    ranked = sorted(ready, key=lambda r: r["similarity"], reverse=True)
+    if min_similarity is not None:
+        ranked = [r for r in ranked if r["similarity"] >= min_similarity]
+    if shortlist_size is not None:
+        ranked = ranked[:max(shortlist_size, 0)]
+
+    keep = {id(r) for r in ranked}
+    for r in ready:
+        r["_work"]["shortlisted"] = id(r) in keep
+    print(f"Pre-ranking: {len(keep)}/{len(ready)} resumes shortlisted for AI screening")
+
+def extract_prepared(prepared):
+    """
+    Stage 2.75 (coordinator): contact extraction for every prepared resume
+    without a cached contact, batched so the resumes that need the Groq
+    fallback share one or a few packed requests instead of one call each.
+    Elapsed time is split evenly across the extracted files.
+    """
+    pending = [r for r in prepared if r["status"] == "prepared" and not _cached_contact(r["_work"]["cached"])]
+    if not pending:
+        return
+
+    t0 = time.time()
+    try:
+        infos = RAGService.extract_candidate_info_batch(
+            [(r["file_hash"], r["_work"]["parsed"].text, r["file"]) for r in pending]
+        )
+    except Exception as e:
+        # finish_resume extracts per resume when no batched result is present
+        print(f"Batch extraction failed: {e}")
+        return
+    elapsed = time.time() - t0
+
+    for r in pending:
+        r["_work"]["candidate_info"] = infos[r["file_hash"]]
+        r["timings"]["extract"] = elapsed / len(pending)
+
+def _not_shortlisted_analysis(similarity: float):
+    return {
+        "score": 0,
+        "reasoning": f"Not shortlisted: JD similarity {similarity:.2f} was outside the shortlist for AI screening.",
+        "key_skills_match": [],
+        "missing_skills": [],
+        "shortlisted": False,
+        "similarity": similarity
+    }
+
+def finish_resume(result, jd: dict):
+    """
+    Stage 3 (worker):
+    2. Extract Info -- skipped on a cache hit with an email or when extract_prepared already ran
+    3. AI Screen (Groq) -- skipped on a screening cache hit, or when the
+       resume was not shortlisted by pre-ranking
+    """
+    work = result.pop("_work")
+    filename = result["file"]
+    parsed = work["parsed"]
+    cached = work["cached"]
+    resume_id = result["file_hash"]
+
+    try:
+        # 2. Extract
+        if _cached_contact(cached):
+            candidate_info = _cached_contact(cached)
+        elif work.get("candidate_info") is not None:
+            candidate_info = work["candidate_info"]
+        else:
+            t0 = time.time()
+            candidate_info = RAGService.extract_candidate_info(parsed.text, filename)
+            result["timings"]["extract"] = time.time() - t0
+
+        result["candidate_info"] = candidate_info
+        result["full_text"] = parsed.text
+
+        # 3. Screen (Pass full_text directly); screen_resume consults the screening cache first
+        result["shortlisted"] = work.get("shortlisted", True)
+        if result["shortlisted"]:
+            t0 = time.time()
+            cache_info = {}
+            analysis = RAGService.screen_resume(jd, resume_id, parsed.text, cache_info=cache_info)
+            result["cache"]["score"] = cache_info.get("hit", False)
+            result["timings"]["ai"] = time.time() - t0
+        else:
+            analysis = _not_shortlisted_analysis(result.get("similarity", 0.0))
+
+        # Contact info is only cached once it has an email, so a miss is retried on the next upload
+        contact_to_cache = candidate_info if candidate_info.get("email") else {}
+        if not cached:
+            resume_cache.store(parsed, filename, contact_to_cache)
+        elif contact_to_cache and not _cached_contact(cached):
+            resume_cache.update_contact(resume_id, contact_to_cache)
+
+        result["analysis"] = analysis
+        result["score"] = analysis.get('score', 0)
+        result["role"] = analysis.get('extracted_role') # Capture AI extracted role
+        result["reasoning"] = analysis.get('reasoning', "N/A")
+        result["status"] = "success"
+
+    except Exception as e:
+        print(f"Error in worker for {filename}: {e}")
+        result["status"] = "failed"
+        result["error"] = str(e)
+
+    result["total_time"] = time.time() - work["started"]
+    return result
+
+def _log_result(data):
+    # Print logs immediately as they finish
+    if data["status"] == "success":
+        print(f"Finished {data['file']} in {data['total_time']:.2f}s "
+              f"(Parse: {data['timings'].get('parse',0):.2f}s, Ingest: {data['timings'].get('ingest',0):.2f}s, "
+              f"Extract: {data['timings'].get('extract',0):.2f}s, AI: {data['timings'].get('ai',0):.2f}s)")
+    else:
+        print(f"Failed {data['file']}: {data['error']}")
+
+def iter_screening_results(saved_files, jd: dict, shortlist_size: int = None, min_similarity: float = None,
+                           chunk_files: int = None, on_stage=None):
+    """
+    Runs the staged pipeline on the shared worker pool, chunk_files uploads at
+    a time (default SCREENING_CHUNK_FILES):
+    prepare (parallel) -> batched ingest -> embedding pre-rank
+    -> batched contact extraction -> screen (parallel, Groq only for the shortlist).
+    Each chunk's results are yielded as they finish (completion order, not
+    upload order) before the next chunk's batch stages run, so the first
+    results arrive early and only one chunk of parsed text is held at a time;
+    the next chunk is parsed while the current one is screened.
+    A shortlist_size ranks the whole batch, so it makes the batch one chunk.
+    jd is a registry artifact dict shared by every resume in the batch.
+    Every result carries upload_index (its position in saved_files).
+    on_stage(stage, results), if given, is called with a chunk's results after
+    each batch stage: "prepared", "ingested", "ranked", "screening".
+    """
+    def stage_done(stage, prepared):
+        if on_stage:
+            on_stage(stage, prepared)
+
+    chunk_files = SCREENING_CHUNK_FILES if chunk_files is None else chunk_files
+    if shortlist_size is not None or chunk_files <= 0:
+        chunk_files = len(saved_files) or 1
+    chunks = [saved_files[start:start + chunk_files] for start in range(0, len(saved_files), chunk_files)]
+
+    def submit_prepare(chunk):
+        return [_executor.submit(prepare_resume, loc, name) for loc, name in chunk]
+
+    next_prepare = submit_prepare(chunks[0]) if chunks else []
+    for index in range(len(chunks)):
+        prepared = [f.result() for f in next_prepare]
+        for offset, data in enumerate(prepared):
+            data["upload_index"] = index * chunk_files + offset
+        stage_done("prepared", prepared)
+
+        ingest_prepared(prepared)
+        stage_done("ingested", prepared)
+        prerank_prepared(prepared, jd, shortlist_size, min_similarity)
+        stage_done("ranked", prepared)
+        extract_prepared(prepared)
+        stage_done("screening", prepared)
+
+        finish_futures, failed = [], []
+        for data in prepared:
+            if data["status"] == "prepared":
+                finish_futures.append(_executor.submit(finish_resume, data, jd))
+            else:
+                failed.append(data)
+        # Parse the next chunk while this one is screened
+        next_prepare = submit_prepare(chunks[index + 1]) if index + 1 < len(chunks) else []
+
+        for data in failed:
+            data["total_time"] = time.time() - data.pop("_work")["started"]
+            _log_result(data)
+            yield data
+
+        for future in concurrent.futures.as_completed(finish_futures):
+            data = future.result()
+            _log_result(data)
+            yield data
+
+def summarize_cache_hits(processed_data):
+    """
+    Cache hit rates for a batch (document = text/contact/chunks reused,
+    score = Groq skipped via the screening cache).
+    """
+    files = len(processed_data)
+    document_hits = sum(1 for d in processed_data if d.get("cache", {}).get("document"))
+    score_hits = sum(1 for d in processed_data if d.get("cache", {}).get("score"))
+    return {
+        "files": files,
+        "document_hits": document_hits,
+        "score_hits": score_hits,
+        "document_hit_rate": round(document_hits / files, 3) if files else 0.0,
+        "score_hit_rate": round(score_hits / files, 3) if files else 0.0
+    }
+
+def summarize_shortlist(processed_data):
+    screened = [d for d in processed_data if d["status"] == "success"]
+    shortlisted = sum(1 for d in screened if d.get("shortlisted", True))
+    return {
+        "screened": len(screened),
+        "shortlisted": shortlisted,
+        "not_shortlisted": len(screened) - shortlisted
+    }
+
+# Rows per transaction in the write phase; 0 commits the whole batch at once.
+PERSIST_CHUNK_SIZE = int(os.getenv("PERSIST_CHUNK_SIZE", 0))
+PLACEHOLDER_NAMES = ["Unknown", "Unknown Candidate", "Candidate", "Resume", "CV"]
+
+def _email_key(email: str) -> str:
+    # MySQL's default collation compares emails case-insensitively
+    return email.strip().lower()
+
+def _prefetch_candidates(db, rows):
+    """
+    One IN query for every email in the batch -> {email_key: Candidate}.
+    """
+    keys = list({_email_key(row["candidate_info"]["email"]) for row in rows})
+    if not keys:
+        return {}
+    # Compare normalized on both sides, whatever the column's collation or the stored case
+    found = db.query(models.Candidate).filter(func.lower(func.trim(models.Candidate.email)).in_(keys)).all()
+    return {_email_key(c.email): c for c in found}
+
+def _scored(data) -> bool:
+    # False when this run produced no real score (pre-ranking skipped the AI, or it failed)
+    return data.get("shortlisted", True) and not data["analysis"].get("ai_failed")
+
+def _apply_row(db, data, existing: dict, jd_title: str):
+    """
+    Stages the insert/update + ActivityLog for one result (no flush, no commit).
+    Returns the Candidate; new ones are registered in existing so a duplicate
+    email later in the same batch is treated as a re-screen. An existing
+    candidate keeps its score, analysis and role when this run did not score it.
+    """
+    info = data["candidate_info"]
+    email = info["email"]
+    score = data["score"]
+    key = _email_key(email)
+    candidate = existing.get(key)
+
+    # STRICT ROLE ENFORCEMENT: Always use the Normalized JD Title
+    target_role = jd_title
+
+    if candidate is None:
+        print(f"DEBUG: Creating NEW candidate for {email}")
+        candidate = models.Candidate(
+            name=info.get('name', 'Unknown'),
+            email=email,
+            role=target_role, # STRICT: Use normalized JD Title
+            status=models.CandidateStatus.Applied,
+            stage=models.CandidateStage.Resume_Screening,
+            resume_file=data["file"],
+            full_text=data["full_text"], # Save to SQL
+            score=score,
+            analysis_data=data["analysis"]
+        )
+        db.add(candidate)
+        existing[key] = candidate
+        action = "screened"
+    else:
+        print(f"DEBUG: Found EXISTING candidate: {candidate.name}")
+        # FIX: Aggressively update metadata if we found better info
+        # This fixes "Unknown Candidate" persistence
+        new_name = info.get('name', 'Unknown')
+        if new_name and new_name not in PLACEHOLDER_NAMES:
+            print(f"DEBUG: Updating Name to: {new_name}")
+            candidate.name = new_name
+            info["name"] = new_name # Update response data too
+        else:
+            print(f"DEBUG: Skipping name update. New Name: '{new_name}'")
+
+        candidate.full_text = data["full_text"] # Update text too
+        if _scored(data):
+            # STRICT ROLE UPDATE: Enforce the current batch's role
+            # This ensures if we re-screen for a NEW role, they get updated.
+            if candidate.role != target_role:
+                print(f"DEBUG: Updating Role from '{candidate.role}' to '{target_role}'")
+                candidate.role = target_role
+
+            candidate.score = score
+            candidate.analysis_data = data["analysis"] # Save full breakdown
+            candidate.status = models.CandidateStatus.Applied # Reset to valid status
+            candidate.stage = models.CandidateStage.Resume_Screening
+            action = "re-screened"
+        else:
+            # Not shortlisted / AI failed this run: the 0 is a placeholder, keep the real screening
+            print(f"DEBUG: Not scored this run, keeping existing score {candidate.score}")
+            score = candidate.score
+            action = "re-uploaded"
+
+    db.add(models.ActivityLog(user_id=1, action=action, target=candidate.name, details=f"Score: {score}/100"))
+    return candidate
+
+def _candidate_payload(candidate):
+    # FINAL FIX: Inject the structure the Frontend expects!
+    # Frontend looks for: res.candidate.name
+    # Read before commit: expire_on_commit would otherwise cost a SELECT per row.
+    return {
+        "name": candidate.name,
+        "email": candidate.email,
+        "id": candidate.id,
+        "role": candidate.role
+    }
+
+def _fail_row(data, error):
+    data["status"] = "failed"
+    data["error"] = error
+    data.pop("candidate", None)
+
+def _persist_chunk(db, chunk, existing: dict, jd_title: str):
+    """
+    Fast path: stage every row, one flush, one commit.
+    """
+    staged = [(data, _apply_row(db, data, existing, jd_title)) for data in chunk]
+    db.flush()
+    for data, candidate in staged:
+        data["candidate"] = _candidate_payload(candidate)
+    db.commit()
+
+def _persist_chunk_isolated(db, chunk, existing: dict, jd_title: str):
+    """
+    Slow path after a chunk failed: one SAVEPOINT per row so a bad row is
+    reported as failed without losing its neighbours. Still a single commit.
+    """
+    for data in chunk:
+        key = _email_key(data["candidate_info"]["email"])
+        is_new = key not in existing
+        try:
+            with db.begin_nested():
+                candidate = _apply_row(db, data, existing, jd_title)
+                db.flush()
+            data["candidate"] = _candidate_payload(candidate)
+        except Exception as e:
+            if is_new:
+                existing.pop(key, None)
+            print(f"DEBUG: Failed to save {data['file']}: {e}")
+            _fail_row(data, f"Database error: {e}")
+    db.commit()
+
+def persist_screening_results(db, processed_data, jd_title: str, chunk_size: int = None, isolate_failures: bool = True):
+    """
+    Set-based write phase (Caller's thread - Safe).
+    Prefetches existing candidates with one IN query, then upserts candidates
+    and activity logs with one flush + commit per chunk (chunk_size rows,
+    default PERSIST_CHUNK_SIZE; 0 = whole batch).
+    With isolate_failures, a chunk that fails is rolled back and replayed row
+    by row so only the offending rows are reported as failed; otherwise the
+    error propagates. Returns the response rows.
+    """
+    chunk_size = PERSIST_CHUNK_SIZE if chunk_size is None else chunk_size
+    writable = []
+    for data in processed_data:
+        if data["status"] == "failed":
+            continue
+        if not data["candidate_info"].get('email'):
+            _fail_row(data, "Could not extract email.")
+            continue
+        writable.append(data)
+
+    if writable:
+        existing = _prefetch_candidates(db, writable)
+        size = chunk_size if chunk_size and chunk_size > 0 else len(writable)
+        for start in range(0, len(writable), size):
+            chunk = writable[start:start + size]
+            known = set(existing)
+            try:
+                _persist_chunk(db, chunk, existing, jd_title)
+                print(f"DEBUG: DB Commit Successful ({len(chunk)} rows)")
+            except Exception as e:
+                db.rollback()
+                # Candidates created by the rolled-back chunk no longer exist
+                for key in set(existing) - known:
+                    existing.pop(key)
+                for data in chunk:
+                    data.pop("candidate", None)
+                if not isolate_failures:
+                    raise
+                print(f"DEBUG: Chunk commit failed ({e}); retrying row by row")
+                _persist_chunk_isolated(db, chunk, existing, jd_title)
+
+        _link_chunks(writable)
+
+    return list(processed_data)
+
+def _link_chunks(rows):
+    # Tie Chroma chunks to the saved candidates so deletes/retention can find them.
+    # Best effort: the candidate rows are already committed.
+    links = {d["file_hash"]: d["candidate"]["id"] for d in rows if d.get("candidate") and d.get("file_hash")}
+    try:
+        RAGService.link_candidates(links)
+    except Exception as e:
+        print(f"Failed to link chunks to candidates: {e}")
+
+def stream_screening_events(saved_files, jd: dict, rejected=None, shortlist_size: int = None, min_similarity: float = None):
+    """
+    Streaming variant of the /screen/ pipeline. Yields one event dict per resume
+    as soon as it is screened AND upserted, then a final summary event.
+    Each result is persisted on its own (one short transaction per resume) and
+    its full_text is dropped once written, so memory stays flat with batch size.
+    Uses its own DB session since it runs after the request handler returns.
+    """
+    files = 0
+    cache_hits = {"document": 0, "score": 0}
+    shortlist = {"screened": 0, "shortlisted": 0}
+    for row in rejected or []:
+        files += 1
+        yield {"event": "result", **row}
+
+    db = database.SessionLocal()
+    try:
+        for data in iter_screening_results(saved_files, jd, shortlist_size=shortlist_size, min_similarity=min_similarity):
+            try:
+                persist_screening_results(db, [data], jd["title"])
+            except Exception as e:
+                db.rollback()
+                _fail_row(data, f"Database error: {e}")
+
+            files += 1
+            cache_hits["document"] += bool(data["cache"]["document"])
+            cache_hits["score"] += bool(data["cache"]["score"])
+            if data["status"] == "success":
+                shortlist["screened"] += 1
+                shortlist["shortlisted"] += bool(data.get("shortlisted", True))
+            data.pop("full_text", None)
+            yield {"event": "result", **data}
+    finally:
+        db.close()
+
+    yield {
+        "event": "summary",
+        "files": files,
+        "cache": {
+            "document_hits": cache_hits["document"],
+            "score_hits": cache_hits["score"]
+        },
+        "shortlist": {**shortlist, "not_shortlisted": shortlist["screened"] - shortlist["shortlisted"]},
+        "status": "completed"
+    }
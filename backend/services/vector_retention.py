@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+import database
+import models
+from services.rag_service import get_collection, chroma_path
+from services import candidate_index
+
+# Retention for the resume_chunks collection.
+# Chunks are purged when their candidate no longer exists, when they predate
+# candidate linking (legacy temp_* ids), or when they have not been ingested
+# or re-screened for CHUNK_RETENTION_DAYS. 0 disables the TTL (orphans are
+# still removed).
+CHUNK_RETENTION_DAYS = float(os.getenv("CHUNK_RETENTION_DAYS", 180))
+CHUNK_RETENTION_INTERVAL_HOURS = float(os.getenv("CHUNK_RETENTION_INTERVAL_HOURS", 24))
+SCAN_PAGE_SIZE = 5000
+
+_worker = None
+_stop = threading.Event()
+
+def _scan():
+    # Paged metadata scan (no documents/embeddings) -> [(id, metadata)]
+    offset = 0
+    while True:
+        page = get_collection().get(include=["metadatas"], limit=SCAN_PAGE_SIZE, offset=offset)
+        if not page["ids"]:
+            return
+        yield from zip(page["ids"], page["metadatas"])
+        offset += len(page["ids"])
+
+def _live_candidate_ids():
+    db = database.SessionLocal()
+    try:
+        return {row[0] for row in db.query(models.Candidate.id).all()}
+    finally:
+        db.close()
+
+def purge(retention_days: float = None):
+    """
+    One retention pass. Returns counts of removed chunks by reason.
+    """
+    retention_days = CHUNK_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = time.time() - retention_days * 86400 if retention_days > 0 else None
+    live = _live_candidate_ids()
+
+    expired, orphaned, legacy = [], [], []
+    for chunk_id, meta in _scan():
+        meta = meta or {}
+        if "last_seen_at" not in meta:
+            legacy.append(chunk_id)
+        elif "candidate_id" in meta and meta["candidate_id"] not in live:
+            orphaned.append(chunk_id)
+        elif cutoff is not None and meta["last_seen_at"] < cutoff:
+            expired.append(chunk_id)
+
+    doomed = expired + orphaned + legacy
+    # Delete after the scan so offsets stay valid while paging
+    for start in range(0, len(doomed), SCAN_PAGE_SIZE):
+        get_collection().delete(ids=doomed[start:start + SCAN_PAGE_SIZE])
+
+    # Same pass for the whole-pool candidate index
+    index = candidate_index.get_index()
+    index_removed = index.retain(live)
+    index_reclaimed = index.compact()
+
+    summary = {
+        "expired": len(expired), "orphaned": len(orphaned), "legacy": len(legacy), "deleted": len(doomed),
+        "index_removed": index_removed, "index_rows_reclaimed": index_reclaimed
+    }
+    print(f"Chunk retention: {summary}")
+    return summary
+
+def _disk_bytes(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def stats():
+    chunks = 0
+    resumes, candidates = set(), set()
+    oldest = newest = None
+    for _, meta in _scan():
+        meta = meta or {}
+        chunks += 1
+        resumes.add(meta.get("resume_id"))
+        if "candidate_id" in meta:
+            candidates.add(meta["candidate_id"])
+        seen = meta.get("last_seen_at")
+        if seen is not None:
+            oldest = seen if oldest is None else min(oldest, seen)
+            newest = seen if newest is None else max(newest, seen)
+    return {
+        "collection": get_collection().name,
+        "chunks": chunks,
+        "resumes": len(resumes),
+        "linked_candidates": len(candidates),
+        "oldest_last_seen_at": oldest,
+        "newest_last_seen_at": newest,
+        "disk_bytes": _disk_bytes(chroma_path),
+        "candidate_index": candidate_index.get_index().stats(),
+        "retention_days": CHUNK_RETENTION_DAYS,
+        "retention_interval_hours": CHUNK_RETENTION_INTERVAL_HOURS
+    }
+
+def _run():
+    interval = CHUNK_RETENTION_INTERVAL_HOURS * 3600
+    while not _stop.wait(interval):
+        try:
+            purge()
+        except Exception as e:
+            print(f"Chunk retention pass failed: {e}")
+
+def start_worker():
+    """
+    Starts the periodic retention thread (idempotent per process).
+    Passes are idempotent, so one thread per gunicorn worker is harmless.
+    """
+    global _worker
+    if CHUNK_RETENTION_INTERVAL_HOURS <= 0 or (_worker and _worker.is_alive()):
+        return
+    _stop.clear()
+    _worker = threading.Thread(target=_run, name="chunk-retention", daemon=True)
+    _worker.start()
+
+def stop_worker():
+    _stop.set()
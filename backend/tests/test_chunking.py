@@ -0,0 +1,28 @@
+from services import chunking
+
+def test_name_line_above_first_section_is_kept():
+    text = "JOHN DOE\nEXPERIENCE\n- Built payment APIs in FastAPI"
+    assert list(chunking._iter_blocks(text)) == [
+        ("", "JOHN DOE"),
+        ("EXPERIENCE", "- Built payment APIs in FastAPI"),
+    ]
+    chunks = list(chunking.iter_chunks(text))
+    assert "JOHN DOE" in chunks[0]
+
+def test_empty_heading_between_sections_stays_in_previous_section():
+    text = "EXPERIENCE\n- Built payment APIs\nSKILLS\nEDUCATION\nB.Tech, 2016"
+    assert list(chunking._iter_blocks(text)) == [
+        ("EXPERIENCE", "- Built payment APIs"),
+        ("EXPERIENCE", "SKILLS"),
+        ("EDUCATION", "B.Tech, 2016"),
+    ]
+
+def test_trailing_heading_without_body_is_kept():
+    assert list(chunking._iter_blocks("Worked on search.\n\nREFERENCES")) == [
+        ("", "Worked on search."),
+        ("", "REFERENCES"),
+    ]
+
+def test_heading_labels_its_blocks():
+    text = "SKILLS\nPython, SQL\n\nPROJECTS\n- Fraud detection engine"
+    assert list(chunking.iter_chunks(text)) == ["SKILLS: Python, SQL\nPROJECTS: - Fraud detection engine"]
@@ -0,0 +1,31 @@
+from services import profile_extractor
+
+RESUME = """JOHN DOE
+john.doe@example.com | +1 555 010 2030
+
+EXPERIENCE
+Backend Engineer, Acme Corp
+Jan 2020 - Dec 2022
+- Built payment APIs
+
+EDUCATION
+B.Tech Computer Science, 2012-2016
+"""
+
+def test_education_date_ranges_are_not_experience():
+    profile = profile_extractor.extract(RESUME)
+    assert profile["experience_ranges"] == ["2020-01/2022-12"]
+    assert profile["experience_years"] == 3.0
+
+def test_inline_education_heading_is_skipped():
+    text = "Work Experience: Analyst, Jun 2018 - May 2019\nEducation: MBA 2016-2018"
+    assert profile_extractor.experience_ranges(text) == [((2018, 6), (2019, 5))]
+
+def test_experience_after_education_is_counted():
+    text = "Education\nB.Sc 2010 - 2013\n\nProfessional Experience\nDeveloper, Mar 2014 - Feb 2016"
+    assert profile_extractor.experience_ranges(text) == [((2014, 3), (2016, 2))]
+
+def test_contact_fields():
+    profile = profile_extractor.extract(RESUME)
+    assert profile["name"] == "John Doe"
+    assert profile["email"] == "john.doe@example.com"
@@ -15,15 +15,27 @@ const CandidateLogin = () => {
     // User must manually enter credentials.
     // ---------------------------------------------
 
-    const handleMagicLogin = async (token) => {
-        setIsLoading(true);
-        try {
-            // Validate Token by fetching Status
+    // my-status answers 202 (questions_status "generating") while another request (another tab,
+    // a double click) is still generating this assessment's questions: poll
+    // until they are ready instead of starting a second generation.
+    const fetchAssessmentStatus = async (token) => {
+        for (let attempt = 0; attempt < 20; attempt++) {
             const asmResponse = await fetch(`${API_URL}/api/assessments/my-status/`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
             });
+            if (asmResponse.status !== 202) return asmResponse;
+            await new Promise(resolve => setTimeout(resolve, 3000));
+        }
+        throw new Error("Assessment questions are still being prepared. Please try again shortly.");
+    };
+
+    const handleMagicLogin = async (token) => {
+        setIsLoading(true);
+        try {
+            // Validate Token by fetching Status
+            const asmResponse = await fetchAssessmentStatus(token);
 
             if (!asmResponse.ok) throw new Error("Invalid or Expired Magic Link");
 
@@ -93,11 +105,7 @@ const CandidateLogin = () => {
 
             // 2. Fetch Latest Assessment Status
             // We use the token to authorize this request
-            const asmResponse = await fetch(`${API_URL}/api/assessments/my-status/`, {
-                headers: {
-                    'Authorization': `Bearer ${token}`
-                }
-            });
+            const asmResponse = await fetchAssessmentStatus(token);
 
             if (!asmResponse.ok) throw new Error("Failed to fetch assessment status");
 